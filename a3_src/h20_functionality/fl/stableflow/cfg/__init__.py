@@ -163,30 +163,36 @@ def merge_dicts(first, second):
     """
     Merge two dictionaries. second takes priority.
 
+    The result is a new dict, but subtrees
+    are shared by reference with the inputs
+    wherever only one of them has a value,
+    so only dicts present in both inputs are
+    copied. Treat the result as copy-on-write:
+    modify it with fl.stableflow.cfg.util
+    .apply_shared, or freeze it with
+    fl.stableflow.cfg.util.freeze.
+
     """
 
-    return dict(_merge_dicts(first, second))
+    merged = dict(first)
+    for (key, value) in second.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_shared(merged[key], value)
+        else:
+            # second overwrites first if both are present.
+            merged[key] = value
+    return merged
 
 
 # -----------------------------------------------------------------------------
-def _merge_dicts(first, second):
+def _merge_shared(first, second):
     """
-    Merge two dictionaries (recursive function). second takes priority.
+    Merge two nested dictionaries, sharing either one if the other is empty.
 
     """
 
-    for key in set(first.keys()).union(second.keys()):
-        _in_first  = key in first
-        _in_second = key in second
-        if _in_first and _in_second:
-            _isdict_first  = isinstance(first[key], dict)
-            _isdict_second = isinstance(second[key], dict)
-            if _isdict_first and _isdict_second:
-                yield (key, dict(_merge_dicts(first[key], second[key])))
-            else:
-                # second overwrites first if both are present.
-                yield (key, second[key])
-        elif _in_first:
-            yield (key, first[key])
-        else:
-            yield (key, second[key])
+    if first is second or not second:
+        return first
+    if not first:
+        return second
+    return merge_dicts(first, second)
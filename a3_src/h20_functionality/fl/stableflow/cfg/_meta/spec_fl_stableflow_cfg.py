@@ -3,3 +3,51 @@
 Functional specification for the fl.stableflow.cfg package.
 
 """
+
+
+import pytest
+
+
+# =============================================================================
+class SpecifyMergeDicts:
+    """
+    Spec for the fl.stableflow.cfg.merge_dicts function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_merges_recursively_with_second_taking_priority(self):
+        """
+        Nested dicts are merged, and other values in second overwrite first.
+
+        """
+        import fl.stableflow.cfg  # pylint: disable=C0415
+
+        first  = {'a': {'b': 1, 'c': 2}, 'd': [1], 'e': 'x'}
+        second = {'a': {'c': 3},         'd': [2], 'f': {'g': 4}}
+        merged = fl.stableflow.cfg.merge_dicts(first, second)
+        assert merged == {'a': {'b': 1, 'c': 3},
+                          'd': [2],
+                          'e': 'x',
+                          'f': {'g': 4}}
+        assert first['a'] == {'b': 1, 'c': 2}
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_shares_subtrees_present_in_only_one_input(self):
+        """
+        Only dicts present in both inputs are copied.
+
+        """
+        import fl.stableflow.cfg  # pylint: disable=C0415
+
+        first  = {'a': {'b': {'c': 1}}, 'd': {'e': 2}, 'f': {}}
+        second = {'a': {'x': 1},        'g': {'h': 3}, 'f': {'i': 4}}
+        merged = fl.stableflow.cfg.merge_dicts(first, second)
+        assert merged is not first
+        assert merged['a'] is not first['a']
+        assert merged['a']['b'] is first['a']['b']
+        assert merged['d'] is first['d']
+        assert merged['g'] is second['g']
+        assert merged['f'] is second['f']
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Functional specification for the fl.stableflow.cfg.analyze module.
+
+"""
+
+
+import pytest
+
+
+# =============================================================================
+class SpecifyAnalyze:
+    """
+    Spec for the fl.stableflow.cfg.analyze.analyze function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_sizes_messages_from_the_data_dictionary(self):
+        """
+        Message sizes follow from dtype and shape, estimated for objects.
+
+        """
+        import fl.stableflow.cfg.analyze  # pylint: disable=C0415
+
+        map_size = fl.stableflow.cfg.analyze.type_sizes(_cfg()['data'])
+        assert map_size['image'].num_bytes   == 480 * 640 * 3 + 8 + 64
+        assert map_size['image'].num_field   == 3
+        assert map_size['image'].is_estimate
+        assert map_size['point'].num_bytes   == 3 * 4
+        assert not map_size['point'].is_estimate
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_totals_traffic_across_each_boundary(self):
+        """
+        Only inter-process and inter-host edges count at boundaries.
+
+        """
+        import fl.stableflow.cfg.analyze  # pylint: disable=C0415
+
+        analysis  = fl.stableflow.cfg.analyze.analyze(_cfg())
+        num_image = 480 * 640 * 3 + 8 + 64
+        assert analysis.map_bytes_process == {'p1': num_image,
+                                              'p2': num_image + 12,
+                                              'p3': 12}
+        assert analysis.map_bytes_host    == {'h1': 12, 'h2': 12}
+        assert [cost.id_edge for cost in analysis.list_edge_cost] == [
+                                    'a.outputs.img:b.inputs.img',
+                                    'a.outputs.own:a.inputs.own',
+                                    'b.outputs.pt:c.inputs.pt']
+        assert analysis.list_edge_cost[0].secs_serialize > 0.0
+        assert analysis.list_edge_cost[1].secs_serialize == 0.0
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_flags_edges_over_the_limit_for_their_transport(self):
+        """
+        Limits apply per IPC type, and can be overridden.
+
+        """
+        import fl.stableflow.cfg.analyze  # pylint: disable=C0415
+
+        analyze  = fl.stableflow.cfg.analyze.analyze
+        analysis = analyze(_cfg())
+        assert not any(cost.is_over_limit for cost in analysis.list_edge_cost)
+
+        analysis = analyze(_cfg(), map_limit_bytes = {'inter_process': 1024,
+                                                      'inter_host':    8})
+        list_over = [cost.id_edge for cost in analysis.list_edge_cost
+                                                    if cost.is_over_limit]
+        assert list_over == ['a.outputs.img:b.inputs.img',
+                             'b.outputs.pt:c.inputs.pt']
+
+        list_line = fl.stableflow.cfg.analyze.format_report(analysis)
+        assert list_line[-1] == '2 edge(s) over limit.'
+        assert list_line[1].split()[:3] == ['OVER', 'inter_process', '~900.1']
+
+
+# -----------------------------------------------------------------------------
+def _cfg():
+    """
+    Return a denormalized config with three processes on two hosts.
+
+    """
+    import fl.stableflow.cfg  # pylint: disable=C0415
+
+    return fl.stableflow.cfg.denormalize({
+        'system':  {'id_system': 'some_system'},
+        'host':    {'h1': {'hostname': '127.0.0.1'},
+                    'h2': {'hostname': '127.0.0.2'}},
+        'process': {'p1': {'host': 'h1'},
+                    'p2': {'host': 'h1'},
+                    'p3': {'host': 'h2'}},
+        'node':    {'a': {'process': 'p1'},
+                    'b': {'process': 'p2'},
+                    'c': {'process': 'p3'}},
+        'edge':    [_cfg_edge('a.outputs.img', 'b.inputs.img', 'image'),
+                    _cfg_edge('b.outputs.pt',  'c.inputs.pt',  'point'),
+                    _cfg_edge('a.outputs.own', 'a.inputs.own', 'image')],
+        'data':    {'image': [{'pixels': {'type':  'uint8',
+                                          'shape': [480, 640, 3]}},
+                              {'stamp':  'float64'},
+                              {'meta':   'py_dict'}],
+                    'point': [{'xyz':    {'type':  'float32',
+                                          'shape': 3}}]}})
+
+
+# -----------------------------------------------------------------------------
+def _cfg_edge(src, dst, data):
+    """
+    Return a normalized edge config, owned by the source node.
+
+    """
+    return {'owner': src.split('.')[0], 'data': data, 'src': src, 'dst': dst}
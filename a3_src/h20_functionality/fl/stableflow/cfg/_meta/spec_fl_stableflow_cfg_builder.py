@@ -280,3 +280,123 @@ class SpecifyRemoveData:
                                             cfg     = valid_normalized_config,
                                             id_data = 'new_type_alias')
         fl.stableflow.cfg.validate.normalized(valid_normalized_config)
+
+
+# =============================================================================
+class SpecifyBuilder:
+    """
+    Spec for the builder.Builder class.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_returns_valid_configuration(self, valid_normalized_config):
+        """
+        Check Builder.get_config returns valid configuration.
+
+        """
+        import fl.stableflow.cfg.builder   # pylint: disable=C0415
+        import fl.stableflow.cfg.validate  # pylint: disable=C0415
+
+        builder = fl.stableflow.cfg.builder.Builder(valid_normalized_config)
+        builder.add_host('new_host_id')
+        builder.add_processes(('p1', 'p2'), id_host = 'new_host_id')
+        builder.add_nodes((id_node, {'id_process': 'p1',
+                                     'py_module':  'some.module'})
+                                                for id_node in ('a', 'b'))
+        builder.add_edges(
+            (('a', 'outputs.x', 'b',         'inputs.x', 'some_data_type'),
+             ('a', 'outputs.y', 'some_node', 'inputs.y', 'some_data_type')))
+        cfg = builder.get_config()
+        assert len(cfg['edge']) == 3
+        fl.stableflow.cfg.validate.normalized(cfg)
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_removes_contained_processes_nodes_and_edges(self):
+        """
+        Removing a host also removes its processes, nodes and their edges.
+
+        """
+        import fl.stableflow.cfg.builder  # pylint: disable=C0415
+
+        builder = fl.stableflow.cfg.builder.Builder()
+        builder.add_hosts(('h1', 'h2'))
+        builder.add_processes(('p1',), id_host = 'h1')
+        builder.add_processes(('p2',), id_host = 'h2')
+        builder.add_nodes((('a', {'id_process': 'p1'}),
+                           ('b', {'id_process': 'p2'}),
+                           ('c', {'id_process': 'p2'})))
+        builder.add_edges((('a', 'outputs.x', 'b', 'inputs.x', 'float'),
+                           ('b', 'outputs.x', 'c', 'inputs.x', 'float'),
+                           ('c', 'outputs.x', 'c', 'inputs.y', 'float')))
+        builder.remove_edge('b.outputs.x', 'c.inputs.x')
+        assert len(builder.get_config()['edge']) == 2
+
+        builder.remove_host('h1')
+        cfg = builder.get_config()
+        assert set(cfg['host'])    == {'h2'}
+        assert set(cfg['process']) == {'p2'}
+        assert set(cfg['node'])    == {'b', 'c'}
+        assert [cfg_edge['src'] for cfg_edge in cfg['edge']] == [
+                                                                'c.outputs.x']
+
+        builder.remove_processes(('p2',))
+        assert builder.get_config()['edge'] == []
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_leaves_the_config_passed_in_intact(self, valid_normalized_config):
+        """
+        A Builder works on a copy, and accepts a config without edges.
+
+        """
+        import copy                       # pylint: disable=C0415
+        import fl.stableflow.cfg.builder  # pylint: disable=C0415
+
+        cfg     = copy.deepcopy(valid_normalized_config)
+        builder = fl.stableflow.cfg.builder.Builder(cfg)
+        builder.add_hosts(('other_host',))
+        assert cfg == valid_normalized_config
+
+        del cfg['edge']
+        builder = fl.stableflow.cfg.builder.Builder(cfg)
+        assert builder.get_config()['edge'] == []
+        assert 'edge' not in cfg
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_builds_large_graphs_in_linear_time(self):
+        """
+        Benchmark: build a 50,000 node graph, then remove half of it.
+
+        """
+        import time                       # pylint: disable=C0415
+        import fl.stableflow.cfg.builder  # pylint: disable=C0415
+
+        num_node    = 50000
+        num_process = 100
+        time_start  = time.perf_counter()
+        builder     = fl.stableflow.cfg.builder.Builder()
+        builder.add_hosts(('h0', 'h1'))
+        for idx_host in range(2):
+            builder.add_processes(
+                    ('p{idx}'.format(idx = idx)
+                            for idx in range(idx_host, num_process, 2)),
+                    id_host = 'h{idx}'.format(idx = idx_host))
+        builder.add_nodes(('n{idx}'.format(idx = idx),
+                           {'id_process': 'p{idx}'.format(
+                                                idx = idx % num_process)})
+                                                for idx in range(num_node))
+        builder.add_edges(('n{idx}'.format(idx = idx - 1), 'outputs.x',
+                           'n{idx}'.format(idx = idx),     'inputs.x',
+                           'float')
+                                                for idx in range(1, num_node))
+        builder.remove_host('h1')
+        cfg  = builder.get_config()
+        secs = time.perf_counter() - time_start
+
+        assert len(cfg['node']) == num_node // 2
+        assert cfg['edge'] == []
+        assert secs < 30.0
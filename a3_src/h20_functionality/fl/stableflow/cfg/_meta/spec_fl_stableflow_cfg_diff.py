@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Functional specification for the fl.stableflow.cfg.diff module.
+
+"""
+
+
+import copy
+
+import pytest
+
+
+# =============================================================================
+class SpecifyPlan:
+    """
+    Spec for the fl.stableflow.cfg.diff.plan function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_restarts_nothing_when_nothing_changed(self):
+        """
+        Identical configurations give an empty plan.
+
+        """
+        import fl.stableflow.cfg.diff  # pylint: disable=C0415
+
+        cfg_new = _cfg()
+        cfg_new['runtime'] = {'id': {'id_run': 'different'}}
+        plan    = fl.stableflow.cfg.diff.plan(_cfg(), cfg_new)
+        assert not plan.is_full_restart
+        assert plan.set_id_process_stop  == set()
+        assert plan.set_id_process_start == set()
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_restarts_only_the_processes_that_changed(self):
+        """
+        A node change restarts its process and any inter-process peers.
+
+        """
+        import fl.stableflow.cfg.diff  # pylint: disable=C0415
+
+        plan_for = fl.stableflow.cfg.diff.plan
+
+        # d is alone in p4, and c's only edge is inter-host.
+        cfg_new = _cfg()
+        cfg_new['node']['d']['functionality']['py_module'] = 'pkg.other'
+        assert plan_for(_cfg(), cfg_new).set_id_process_start == {'p4'}
+
+        cfg_new = _cfg()
+        cfg_new['node']['c']['functionality']['py_module'] = 'pkg.other'
+        assert plan_for(_cfg(), cfg_new).set_id_process_start == {'p3'}
+
+        # a and b share an inter-process queue.
+        cfg_new = _cfg()
+        cfg_new['node']['a']['functionality']['py_module'] = 'pkg.other'
+        assert plan_for(_cfg(), cfg_new).set_id_process_start == {'p1', 'p2'}
+
+        # Moving d to a new process on another host.
+        cfg_new = _cfg()
+        cfg_new['process']['p5'] = {'host': 'h2'}
+        cfg_new['node']['d']['process'] = 'p5'
+        plan = plan_for(_cfg(), cfg_new)
+        assert plan.set_id_process_stop  == {'p4'}
+        assert plan.set_id_process_start == {'p4', 'p5'}
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_restarts_users_of_a_changed_data_type(self):
+        """
+        A change to a nested data type restarts each process that uses it.
+
+        """
+        import fl.stableflow.cfg.diff  # pylint: disable=C0415
+
+        cfg_new = _cfg()
+        cfg_new['data']['inner'] = [{'x': 'float64'}]
+        plan    = fl.stableflow.cfg.diff.plan(_cfg(), cfg_new)
+        assert plan.set_id_process_stop == {'p2', 'p3', 'p1'}
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_restarts_everything_on_a_global_change(self):
+        """
+        A change outside the per entity sections restarts the whole system.
+
+        """
+        import fl.stableflow.cfg.diff  # pylint: disable=C0415
+
+        cfg_new = _cfg()
+        cfg_new['queue']['inter_host_server'] = 'pl.stableflow.queue.other'
+        plan    = fl.stableflow.cfg.diff.plan(_cfg(), cfg_new)
+        assert plan.is_full_restart
+        assert plan.set_id_process_start == {'p1', 'p2', 'p3', 'p4'}
+
+
+# -----------------------------------------------------------------------------
+def _cfg():
+    """
+    Return a normalized config with four processes on two hosts.
+
+    """
+    return copy.deepcopy({
+        'system':  {'id_system': 'some_system'},
+        'queue':   {'inter_host_server': 'pl.stableflow.queue.zmq_server'},
+        'host':    {'h1': {'hostname': '127.0.0.1'},
+                    'h2': {'hostname': '127.0.0.2'}},
+        'process': {'p1': {'host': 'h1'},
+                    'p2': {'host': 'h1'},
+                    'p3': {'host': 'h2'},
+                    'p4': {'host': 'h1'}},
+        'node':    dict((id_node, {'process':       id_process,
+                                   'functionality': {'py_module': 'pkg.mod'}})
+                            for (id_node, id_process) in (('a', 'p1'),
+                                                          ('b', 'p2'),
+                                                          ('c', 'p3'),
+                                                          ('d', 'p4'))),
+        'edge':    [{'owner': 'a',
+                     'data':  'outer',
+                     'src':   'a.outputs.x',
+                     'dst':   'b.inputs.x'},
+                    {'owner': 'b',
+                     'data':  'outer',
+                     'src':   'b.outputs.y',
+                     'dst':   'c.inputs.y'}],
+        'data':    {'inner': [{'x': 'float32'}],
+                    'outer': [{'y': 'inner'}]}})
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Functional specification for the fl.stableflow.cfg.graph module.
+
+"""
+
+
+import pytest
+
+
+# =============================================================================
+class SpecifyGraphIndex:
+    """
+    Spec for the GraphIndex class.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_orders_nodes_by_rank_then_id(self):
+        """
+        Local nodes run in topological order, and unlinked nodes run last.
+
+        """
+        import fl.stableflow.cfg.graph  # pylint: disable=C0415
+
+        graph = fl.stableflow.cfg.graph.GraphIndex(
+                    map_cfg_node  = _map_cfg_node('a b c d e', 'p1')
+                                        | _map_cfg_node('x y', 'p2'),
+                    iter_cfg_edge = [_cfg_edge('c', 'b'),
+                                     _cfg_edge('a', 'b'),
+                                     _cfg_edge('b', 'd'),
+                                     _cfg_edge('d', 'a', dirn = 'feedback'),
+                                     _cfg_edge('x', 'e', 'inter_process')])
+
+        assert graph.list_id_node_in_runorder('p1') == ['a', 'c', 'b', 'd',
+                                                        'e']
+        assert len(graph.list_cfg_edge('p1')) == 5
+        assert len(graph.list_cfg_edge('p2')) == 1
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_updates_the_run_order_incrementally(self):
+        """
+        Adding and removing edges and nodes matches a rebuild from scratch.
+
+        """
+        import random                   # pylint: disable=C0415
+        import fl.stableflow.cfg.graph  # pylint: disable=C0415
+
+        GraphIndex   = fl.stableflow.cfg.graph.GraphIndex
+        rng          = random.Random(0)
+        map_cfg_node = _map_cfg_node(
+                            ' '.join('n{idx:02}'.format(idx = idx)
+                                                    for idx in range(40)),
+                            'p1')
+        list_id_node = sorted(map_cfg_node)
+        graph        = GraphIndex(map_cfg_node = map_cfg_node)
+        list_edge    = list()
+        for idx_step in range(400):
+            if list_edge and rng.random() < 0.3:
+                cfg_edge = list_edge.pop(rng.randrange(len(list_edge)))
+                graph.remove_edge(cfg_edge)
+            else:
+                (src, dst) = sorted(rng.sample(list_id_node, 2))
+                cfg_edge   = _cfg_edge(src, dst, idx = idx_step)
+                list_edge.append(cfg_edge)
+                graph.add_edge(cfg_edge)
+            rebuilt = GraphIndex(map_cfg_node, list_edge)
+            assert graph.map_rank == rebuilt.map_rank
+
+        graph.remove_node('n00')
+        del map_cfg_node['n00']
+        list_edge = [cfg_edge for cfg_edge in list_edge
+                        if 'n00' not in (cfg_edge['id_node_src'],
+                                         cfg_edge['id_node_dst'])]
+        assert (graph.list_id_node_in_runorder('p1')
+                == GraphIndex(map_cfg_node, list_edge)
+                                            .list_id_node_in_runorder('p1'))
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_runs_nodes_on_a_feedforward_cycle_last(self):
+        """
+        Nodes on a cycle cannot be ranked, so run last in order of id.
+
+        """
+        import fl.stableflow.cfg.graph  # pylint: disable=C0415
+
+        graph = fl.stableflow.cfg.graph.GraphIndex(
+                    map_cfg_node  = _map_cfg_node('a b c z', 'p1'),
+                    iter_cfg_edge = [_cfg_edge('z', 'a')])
+        graph.add_edge(_cfg_edge('a', 'b'))
+        graph.add_edge(_cfg_edge('b', 'a'))
+        assert graph.list_id_node_in_runorder('p1') == ['z', 'a', 'b', 'c']
+
+        graph.remove_edge(_cfg_edge('b', 'a'))
+        assert graph.list_id_node_in_runorder('p1') == ['z', 'a', 'b', 'c']
+        assert graph.map_rank == {'a': 1, 'b': 2, 'c': 0, 'z': 0}
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_indexes_large_graphs_in_linear_time(self):
+        """
+        Benchmark: index and order a 20,000 node graph over 10 processes.
+
+        """
+        import time                     # pylint: disable=C0415
+        import fl.stableflow.cfg.graph  # pylint: disable=C0415
+
+        num_node     = 20000
+        num_process  = 10
+        map_cfg_node = dict()
+        list_edge    = list()
+        for idx in range(num_node):
+            id_process = 'p{idx}'.format(idx = idx % num_process)
+            id_node    = 'n{idx}'.format(idx = idx)
+            map_cfg_node[id_node] = {'process': id_process}
+            for idx_src in (idx - num_process, idx - 2 * num_process):
+                if idx_src >= 0:
+                    list_edge.append(_cfg_edge(
+                            'n{idx}'.format(idx = idx_src), id_node,
+                            list_id_process = [id_process, id_process]))
+
+        time_start = time.perf_counter()
+        graph      = fl.stableflow.cfg.graph.GraphIndex(map_cfg_node,
+                                                        list_edge)
+        list_order = [graph.list_id_node_in_runorder('p{idx}'.format(
+                                    idx = idx)) for idx in range(num_process)]
+        secs       = time.perf_counter() - time_start
+
+        assert list_order[3][:3] == ['n3', 'n13', 'n23']
+        assert graph.map_rank['n{idx}'.format(idx = num_node - 1)] == (
+                                                num_node // num_process - 1)
+        assert secs < 30.0
+
+
+# -----------------------------------------------------------------------------
+def _map_cfg_node(str_id_node, id_process):
+    """
+    Return a map from each space separated node id to a node config.
+
+    """
+    return dict((id_node, {'process': id_process})
+                                        for id_node in str_id_node.split())
+
+
+# -----------------------------------------------------------------------------
+def _cfg_edge(src,
+              dst,
+              ipc_type        = 'intra_process',
+              dirn            = 'feedforward',
+              idx             = 0,
+              list_id_process = None):
+    """
+    Return a minimal denormalized edge config.
+
+    """
+    if list_id_process is None:
+        list_id_process = ['p1', 'p1'] if ipc_type == 'intra_process' else [
+                                                                'p2', 'p1']
+    return {'id_edge':         '{src}->{dst}:{idx}'.format(src = src,
+                                                          dst = dst,
+                                                          idx = idx),
+            'id_node_src':     src,
+            'id_node_dst':     dst,
+            'ipc_type':        ipc_type,
+            'dirn':            dirn,
+            'list_id_process': list_id_process}
@@ -64,3 +64,138 @@ class SpecifyFlStableflowCfgLayout_acyclincDataFlow:
         assert dict(map_backward) == {'b': {'a',},
                                       'c': {'a',},
                                       'd': {'a',}}
+
+
+# =============================================================================
+class SpecifyFlStableflowCfgLayoutLayeredLayout:
+    """
+    Spec for the fl.stableflow.cfg.layout.LayeredLayout class.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_positions_every_node_and_swimlane(self, valid_normalized_config):
+        """
+        fl.stableflow.cfg.layout.horizontal places all nodes and processes.
+
+        """
+        import fl.stableflow.cfg         # pylint: disable=C0415
+        import fl.stableflow.cfg.layout  # pylint: disable=C0415
+
+        cfg = fl.stableflow.cfg.layout.horizontal(
+                    fl.stableflow.cfg.denormalize(valid_normalized_config))
+        for cfg_node in cfg['node'].values():
+            assert 'pos_x' in cfg_node and 'pos_y' in cfg_node
+        for cfg_process in cfg['process'].values():
+            assert 'pos_x' in cfg_process
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_orders_nodes_to_remove_crossings(self):
+        """
+        Barycentric sweeps uncross a pair of crossed edges.
+
+        """
+        import fl.stableflow.cfg.layout  # pylint: disable=C0415
+
+        cfg = _cfg_layered('a b c d', [('a', 'd'), ('b', 'c')])
+        (map_idx_node, map_idx_proc, count_layer) = (
+                        fl.stableflow.cfg.layout.LayeredLayout().update(cfg))
+
+        assert count_layer == 2
+        assert map_idx_proc == {'p1': (0, 2)}
+        assert map_idx_node['a'] == (0, 0)
+        assert map_idx_node['d'] == (0, 1)
+        assert map_idx_node['c'] == (1, 1)
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_only_moves_nodes_near_an_edit(self):
+        """
+        Relayout keeps the position of nodes away from the edit.
+
+        """
+        import fl.stableflow.cfg.layout  # pylint: disable=C0415
+
+        cfg    = _cfg_random(num_node = 500, num_process = 4)
+        layout = fl.stableflow.cfg.layout.LayeredLayout()
+        (map_idx_before, _, _) = layout.update(cfg)
+
+        cfg['node']['added'] = {'process': 'p0'}
+        cfg['edge'].append(_cfg_edge_layered('n100', 'added'))
+        (map_idx_after, _, _) = layout.update(cfg)
+
+        list_moved = [id_node for id_node in map_idx_before
+                        if map_idx_before[id_node] != map_idx_after[id_node]]
+        assert 'added' in map_idx_after
+        assert len(list_moved) < 10
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_lays_out_large_graphs_quickly(self):
+        """
+        Benchmark: lay out a 2,000 node graph in ten swimlanes.
+
+        """
+        import time                      # pylint: disable=C0415
+        import fl.stableflow.cfg.layout  # pylint: disable=C0415
+
+        cfg        = _cfg_random(num_node = 2000, num_process = 10)
+        time_start = time.perf_counter()
+        (map_idx_node, _, _) = fl.stableflow.cfg.layout.LayeredLayout().update(
+                                                                        cfg)
+        secs       = time.perf_counter() - time_start
+
+        assert len(map_idx_node) == 2000
+        assert secs < 5.0
+
+
+# -----------------------------------------------------------------------------
+def _cfg_layered(str_id_node, list_link, id_process = 'p1'):
+    """
+    Return a minimal denormalized config for the layout engine.
+
+    """
+    return {'process': {id_process: {'host': 'h1'}},
+            'node':    dict((id_node, {'process': id_process})
+                                        for id_node in str_id_node.split()),
+            'edge':    [_cfg_edge_layered(src, dst)
+                                        for (src, dst) in list_link]}
+
+
+# -----------------------------------------------------------------------------
+def _cfg_random(num_node, num_process):
+    """
+    Return a random layered config with two inbound edges per node.
+
+    """
+    import random  # pylint: disable=C0415
+
+    rng = random.Random(0)
+    cfg = {'process': dict(('p{idx}'.format(idx = idx), {'host': 'h1'})
+                                            for idx in range(num_process)),
+           'node':    dict(),
+           'edge':    list()}
+    for idx in range(num_node):
+        cfg['node']['n{idx}'.format(idx = idx)] = {
+                'process': 'p{idx}'.format(idx = rng.randrange(num_process))}
+        for _ in range(2 if idx else 0):
+            idx_src = rng.randrange(max(0, idx - 50), idx)
+            cfg['edge'].append(_cfg_edge_layered(
+                                            'n{idx}'.format(idx = idx_src),
+                                            'n{idx}'.format(idx = idx)))
+    return cfg
+
+
+# -----------------------------------------------------------------------------
+def _cfg_edge_layered(src, dst):
+    """
+    Return a minimal denormalized edge config for the layout engine.
+
+    """
+    return {'ipc_type':        'intra_process',
+            'list_id_process': (),
+            'id_node_src':     src,
+            'id_node_dst':     dst,
+            'dirn':            'feedforward'}
@@ -222,6 +222,80 @@ class SpecifyLoad:
                     dict_of_strings)
 
 
+# =============================================================================
+class SpecifyLoadCache:
+    """
+    Spec for the parse cache used by fl.stableflow.cfg.load.from_dirpath.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_reuses_unchanged_files_and_reparses_edits(self,
+                                                     tmp_path,
+                                                     monkeypatch):
+        """
+        Unchanged files come from the cache; edited files are re-parsed.
+
+        """
+        import fl.stableflow.cfg.load  # pylint: disable=C0415
+
+        dirpath_cfg   = tmp_path / 'cfg'
+        dirpath_cache = str(tmp_path / 'cache')
+        dirpath_cfg.mkdir()
+        (dirpath_cfg / 'a.cfg.yaml').write_text('b: {c: 1, d: 2}\n')
+        (dirpath_cfg / 'a.b.cfg.json').write_text('{"c": 3}\n')
+
+        cfg_expected = {'a': {'b': {'c': 3}}}
+        assert fl.stableflow.cfg.load.from_dirpath(
+                                str(dirpath_cfg), dirpath_cache = None) == (
+                                                                cfg_expected)
+        assert fl.stableflow.cfg.load.from_dirpath(
+                        str(dirpath_cfg), dirpath_cache = dirpath_cache) == (
+                                                                cfg_expected)
+
+        def fail(filepath_cfg, bytes_cfg = None):
+            raise AssertionError('Unexpected parse: ' + filepath_cfg)
+
+        monkeypatch.setattr(fl.stableflow.cfg.load, 'from_filepath', fail)
+        assert fl.stableflow.cfg.load.from_dirpath(
+                        str(dirpath_cfg), dirpath_cache = dirpath_cache) == (
+                                                                cfg_expected)
+        monkeypatch.undo()
+
+        (dirpath_cfg / 'a.b.cfg.json').write_text('{"c": 55}\n')
+        assert fl.stableflow.cfg.load.from_dirpath(
+                        str(dirpath_cfg), dirpath_cache = dirpath_cache) == {
+                                                    'a': {'b': {'c': 55}}}
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_only_uses_a_cache_directory_private_to_the_user(self, tmp_path):
+        """
+        Nothing is read from or written to a directory others can access.
+
+        """
+        import os                      # pylint: disable=C0415
+        import fl.stableflow.cfg.load  # pylint: disable=C0415
+
+        dirpath_cfg   = tmp_path / 'cfg'
+        dirpath_cache = tmp_path / 'cache'
+        dirpath_cfg.mkdir()
+        dirpath_cache.mkdir()
+        os.chmod(dirpath_cache, 0o777)
+        (dirpath_cfg / 'a.cfg.yaml').write_text('b: 1\n')
+
+        assert fl.stableflow.cfg.load.from_dirpath(
+                        str(dirpath_cfg), dirpath_cache = str(dirpath_cache)
+                                                        ) == {'a': {'b': 1}}
+        assert not os.listdir(dirpath_cache)
+
+        os.chmod(dirpath_cache, 0o700)
+        fl.stableflow.cfg.load.from_dirpath(
+                        str(dirpath_cfg), dirpath_cache = str(dirpath_cache))
+        assert len(os.listdir(dirpath_cache)) == 1
+
+
 # ------------------------------------------------------------------------------
 def check_match(loaded, true):
     """
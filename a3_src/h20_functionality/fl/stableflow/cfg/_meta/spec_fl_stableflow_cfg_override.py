@@ -43,12 +43,13 @@ class SpecifyApply:
         cfg         = valid_normalized_config
         id_sys_orig = copy.deepcopy(cfg['system']['id_system'])
 
-        fl.stableflow.cfg.override.apply(
+        cfg_mod     = fl.stableflow.cfg.override.apply(
                                 cfg, ('system.id_system', 'some_other_name'))
 
-        id_sys_mod  = cfg['system']['id_system']
+        id_sys_mod  = cfg_mod['system']['id_system']
         assert id_sys_orig != id_sys_mod
         assert id_sys_mod  == 'some_other_name'
+        assert cfg['system']['id_system'] == id_sys_orig
 
     # -------------------------------------------------------------------------
     @pytest.mark.e002_general_research
@@ -63,16 +64,35 @@ class SpecifyApply:
         id_sys_orig   = copy.deepcopy(cfg['system']['id_system'])
         hostname_orig = copy.deepcopy(cfg['host']['some_host']['hostname'])
 
-        fl.stableflow.cfg.override.apply(
+        cfg_mod       = fl.stableflow.cfg.override.apply(
                             cfg,
                             ('system:id_system', 'some_other_name',
                              'host:some_host:hostname', '111.111.111.111'),
                             delim_cfg_addr = ':')
 
-        id_sys_mod           = cfg['system']['id_system']
+        id_sys_mod           = cfg_mod['system']['id_system']
         assert id_sys_orig   != id_sys_mod
         assert id_sys_mod    == 'some_other_name'
 
-        hostname_mod         = cfg['host']['some_host']['hostname']
+        hostname_mod         = cfg_mod['host']['some_host']['hostname']
         assert hostname_orig != hostname_mod
         assert hostname_mod  == '111.111.111.111'
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_shares_subtrees_that_are_not_overridden(
+                                                self, valid_normalized_config):
+        """
+        Check apply copies only the dicts along the overridden path.
+
+        """
+        import fl.stableflow.cfg.override  # pylint: disable=C0415
+
+        cfg     = valid_normalized_config
+        cfg_mod = fl.stableflow.cfg.override.apply(
+                        cfg, ('host.some_host.hostname', '111.111.111.111'))
+
+        assert cfg_mod is not cfg
+        assert cfg_mod['host'] is not cfg['host']
+        assert cfg_mod['system'] is cfg['system']
+        assert cfg_mod['node'] is cfg['node']
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Functional specification for the fl.stableflow.cfg.slice module.
+
+"""
+
+
+import pytest
+
+
+# =============================================================================
+class SpecifyForProcess:
+    """
+    Spec for the fl.stableflow.cfg.slice.for_process function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_keeps_only_what_the_process_needs(self):
+        """
+        The slice holds local nodes, touching edges and the types they use.
+
+        """
+        import fl.stableflow.cfg.slice  # pylint: disable=C0415
+
+        cfg       = _cfg()
+        cfg_slice = fl.stableflow.cfg.slice.for_process(cfg, 'p3')
+        assert sorted(cfg_slice['node'])    == ['b', 'c']
+        assert sorted(cfg_slice['process']) == ['p2', 'p3']
+        assert sorted(cfg_slice['host'])    == ['h1', 'h2']
+        assert sorted(cfg_slice['data'])    == ['point']
+        assert [cfg_edge['id_edge'] for cfg_edge in cfg_slice['edge']] == [
+                                                'b.outputs.pt:c.inputs.pt']
+        assert cfg_slice['system'] is cfg['system']
+
+        cfg_slice = fl.stableflow.cfg.slice.for_process(cfg, 'p4')
+        assert sorted(cfg_slice['node']) == ['d']
+        assert sorted(cfg_slice['host']) == ['h2']
+        assert sorted(cfg_slice['data']) == ['state']
+        assert cfg_slice['edge']         == []
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_gives_the_slice_its_own_graph_index(self):
+        """
+        The run order and edges of the process are the same in the slice.
+
+        """
+        import fl.stableflow.cfg.graph  # pylint: disable=C0415
+        import fl.stableflow.cfg.slice  # pylint: disable=C0415
+
+        cfg   = _cfg()
+        graph = fl.stableflow.cfg.graph.GraphIndex.from_cfg(cfg)
+        cfg['runtime'] = {'id': {'id_host': 'h1'}, 'proc': {'graph': graph}}
+
+        cfg_slice   = fl.stableflow.cfg.slice.for_process(cfg, 'p1')
+        graph_slice = cfg_slice['runtime']['proc']['graph']
+        assert graph_slice is not graph
+        assert cfg['runtime']['proc']['graph'] is graph
+        assert (graph_slice.list_id_node_in_runorder('p1')
+                            == graph.list_id_node_in_runorder('p1')
+                            == ['a', 'e'])
+        assert (sorted(graph_slice.map_id_edge_by_process['p1'])
+                            == sorted(graph.map_id_edge_by_process['p1']))
+
+
+# -----------------------------------------------------------------------------
+def _cfg():
+    """
+    Return a denormalized config with four processes on two hosts.
+
+    """
+    import fl.stableflow.cfg  # pylint: disable=C0415
+
+    return fl.stableflow.cfg.denormalize({
+        'system':  {'id_system': 'some_system'},
+        'host':    {'h1': {'hostname': '127.0.0.1'},
+                    'h2': {'hostname': '127.0.0.2'}},
+        'process': {'p1': {'host': 'h1'},
+                    'p2': {'host': 'h1'},
+                    'p3': {'host': 'h2'},
+                    'p4': {'host': 'h2'}},
+        'node':    {'a': {'process': 'p1'},
+                    'b': {'process': 'p2'},
+                    'c': {'process': 'p3'},
+                    'd': {'process': 'p4', 'state_type': 'state'},
+                    'e': {'process': 'p1'}},
+        'edge':    [_cfg_edge('a.outputs.img', 'b.inputs.img', 'image'),
+                    _cfg_edge('b.outputs.pt',  'c.inputs.pt',  'point'),
+                    _cfg_edge('a.outputs.own', 'e.inputs.own', 'image')],
+        'data':    {'image': [{'pixels': {'type':  'uint8',
+                                          'shape': [4, 4, 3]}}],
+                    'point': [{'xyz':    {'type':  'float32',
+                                          'shape': 3}}],
+                    'state': [{'count':  'int64'}]}})
+
+
+# -----------------------------------------------------------------------------
+def _cfg_edge(src, dst, data):
+    """
+    Return a normalized edge config, owned by the source node.
+
+    """
+    return {'owner': src.split('.')[0], 'data': data, 'src': src, 'dst': dst}
@@ -41,3 +41,66 @@ class SpecifyApply:
         data = fl.stableflow.cfg.util.apply(
                                         data, 'a:b', 2, delim_cfg_addr=':')
         assert data['a']['b'] == 2
+
+
+# =============================================================================
+class SpecifyApplyShared:
+    """
+    Spec for the fl.stableflow.cfg.util.apply_shared() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_copies_only_along_the_overridden_path(self):
+        """
+        Check apply_shared leaves the original unchanged and shares the rest.
+
+        """
+        import fl.stableflow.cfg.util  # pylint: disable=C0415
+
+        data     = {'a': {'b': 1, 'c': {'d': 2}}, 'e': {'f': 3}}
+        data_mod = fl.stableflow.cfg.util.apply_shared(data, 'a.b', 2)
+        assert data_mod['a']['b'] == 2
+        assert data['a']['b']     == 1
+        assert data_mod['a']['c'] is data['a']['c']
+        assert data_mod['e']      is data['e']
+
+        data_mod = fl.stableflow.cfg.util.apply_shared(data, 'x:y', 4,
+                                                       delim_cfg_addr = ':')
+        assert data_mod['x'] == {'y': 4}
+        assert 'x' not in data
+
+
+# =============================================================================
+class SpecifyFreeze:
+    """
+    Spec for the fl.stableflow.cfg.util.freeze() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_returns_a_read_only_copy(self):
+        """
+        Check freeze prevents modification, and can still be overridden.
+
+        """
+        import copy                    # pylint: disable=C0415
+        import pickle                  # pylint: disable=C0415
+        import fl.stableflow.cfg.util  # pylint: disable=C0415
+
+        util   = fl.stableflow.cfg.util
+        frozen = util.freeze({'a': {'b': [1, {'c': 2}]}, 'd': {'e': 3}})
+        assert frozen == {'a': {'b': (1, {'c': 2})}, 'd': {'e': 3}}
+        with pytest.raises(TypeError):
+            frozen['a']['x'] = 1
+        with pytest.raises(TypeError):
+            frozen['a']['b'][1].update(c = 3)
+        assert util.freeze(frozen) is frozen
+        assert copy.deepcopy(frozen) == frozen
+        assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+        variant = util.freeze(util.apply_shared(frozen, 'd.e', 4))
+        assert variant['d']['e'] == 4
+        assert variant['a'] is frozen['a']
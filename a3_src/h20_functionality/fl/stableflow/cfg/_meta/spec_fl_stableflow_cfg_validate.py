@@ -73,3 +73,180 @@ class SpecifyDenormalized:
 
         with pytest.raises(fl.stableflow.cfg.exception.CfgError):
             fl.stableflow.cfg.validate.denormalized(invalid_config)
+
+
+# =============================================================================
+class SpecifyIncrementalValidator:
+    """
+    Spec for the IncrementalValidator class.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_only_revalidates_changed_entries(self, valid_normalized_config):
+        """
+        Unchanged entries are skipped, and changed ones are rechecked.
+
+        """
+        import copy                         # pylint: disable=C0415
+        import fl.stableflow.cfg.exception  # pylint: disable=C0415
+        import fl.stableflow.cfg.validate   # pylint: disable=C0415
+
+        validator = fl.stableflow.cfg.validate.IncrementalValidator()
+        validator.validate(valid_normalized_config)
+        set_digest = validator._set_digest  # pylint: disable=W0212
+        validator.validate(valid_normalized_config)
+        assert validator._set_digest == set_digest  # pylint: disable=W0212
+
+        cfg_invalid = copy.deepcopy(valid_normalized_config)
+        cfg_invalid['host']['some_host']['hostname'] = 123
+        with pytest.raises(fl.stableflow.cfg.exception.CfgError):
+            validator.validate(cfg_invalid)
+
+        cfg_invalid = copy.deepcopy(valid_normalized_config)
+        cfg_invalid['edge'][0]['src'] = 'missing_node.outputs.output'
+        with pytest.raises(fl.stableflow.cfg.exception.CfgError):
+            validator.validate(cfg_invalid)
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_rejects_invalid_data(self, invalid_config):
+        """
+        Check validate raises an exception when given invalid data.
+
+        """
+        import fl.stableflow.cfg.exception  # pylint: disable=C0415
+        import fl.stableflow.cfg.validate   # pylint: disable=C0415
+
+        validator = fl.stableflow.cfg.validate.IncrementalValidator()
+        with pytest.raises(fl.stableflow.cfg.exception.CfgError):
+            validator.validate(invalid_config)
+
+
+# =============================================================================
+class SpecifyBatchedEdges:
+    """
+    Spec for the checks on batched edges.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_rejects_multi_tick_batches_on_any_cycle(self,
+                                                   valid_normalized_config):
+        """
+        A batched edge whose destination can reach its source is rejected.
+
+        """
+        import copy                         # pylint: disable=C0415
+        import fl.stableflow.cfg.exception  # pylint: disable=C0415
+        import fl.stableflow.cfg.validate   # pylint: disable=C0415
+
+        cfg = copy.deepcopy(valid_normalized_config)
+        cfg['node']['other_node'] = dict(cfg['node']['some_node'])
+        cfg['edge'] = [_cfg_edge('some_node',  'other_node', 'x',
+                                 batch = {'ticks': 4}),
+                       _cfg_edge('other_node', 'other_node', 'y')]
+        fl.stableflow.cfg.validate.normalized(cfg)
+
+        # A feedback path from the destination
+        # back to the source, via a third node.
+        #
+        cfg['node']['third_node'] = dict(cfg['node']['some_node'])
+        cfg['edge'].extend([_cfg_edge('other_node', 'third_node', 'z'),
+                            _cfg_edge('third_node', 'some_node',  'w',
+                                      dirn = 'feedback')])
+        with pytest.raises(fl.stableflow.cfg.exception.CfgError):
+            fl.stableflow.cfg.validate.normalized(cfg)
+
+        cfg['edge'][0]['batch'] = {'ticks': 1}
+        fl.stableflow.cfg.validate.normalized(cfg)
+
+        cfg['edge'][-1]['batch'] = {'ticks': 1}
+        with pytest.raises(fl.stableflow.cfg.exception.CfgError):
+            fl.stableflow.cfg.validate.normalized(cfg)
+
+
+# =============================================================================
+class SpecifyInputActivation:
+    """
+    Spec for the checks on input activated nodes.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_only_accepts_triggers_that_name_inputs(self,
+                                                  valid_normalized_config):
+        """
+        Trigger names must be inputs of the node, which must have inputs.
+
+        """
+        import copy                         # pylint: disable=C0415
+        import fl.stableflow.cfg.exception  # pylint: disable=C0415
+        import fl.stableflow.cfg.validate   # pylint: disable=C0415
+
+        cfg = copy.deepcopy(valid_normalized_config)
+        cfg['node']['other_node'] = dict(cfg['node']['some_node'])
+        cfg['edge'] = [_cfg_edge('some_node', 'other_node', 'x')]
+
+        cfg['node']['other_node']['activation'] = ['x']
+        fl.stableflow.cfg.validate.normalized(cfg)
+
+        cfg['node']['other_node']['activation'] = ['y']
+        with pytest.raises(fl.stableflow.cfg.exception.CfgError):
+            fl.stableflow.cfg.validate.normalized(cfg)
+
+        del cfg['node']['other_node']['activation']
+        cfg['node']['some_node']['activation'] = 'on_input'
+        with pytest.raises(fl.stableflow.cfg.exception.CfgError):
+            fl.stableflow.cfg.validate.normalized(cfg)
+
+
+# =============================================================================
+class SpecifyCompressedEdges:
+    """
+    Spec for the checks on compressed edges.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_rejects_compression_on_edges_within_a_host(self,
+                                                      valid_normalized_config):
+        """
+        Only edges between nodes on different hosts can be compressed.
+
+        """
+        import copy                         # pylint: disable=C0415
+        import fl.stableflow.cfg.exception  # pylint: disable=C0415
+        import fl.stableflow.cfg.validate   # pylint: disable=C0415
+
+        cfg = copy.deepcopy(valid_normalized_config)
+        cfg['host']['other_host']       = dict(cfg['host']['some_host'])
+        cfg['process']['other_process'] = {'host': 'other_host'}
+        cfg['node']['other_node']       = dict(cfg['node']['some_node'],
+                                               process = 'other_process')
+        cfg['edge'] = [_cfg_edge('some_node', 'other_node', 'x',
+                                 compress = {'codec': 'zlib'})]
+        fl.stableflow.cfg.validate.normalized(cfg)
+
+        cfg['process']['other_process']['host'] = 'some_host'
+        with pytest.raises(fl.stableflow.cfg.exception.CfgError):
+            fl.stableflow.cfg.validate.normalized(cfg)
+
+
+# -----------------------------------------------------------------------------
+def _cfg_edge(id_node_src, id_node_dst, name, **kwargs):
+    """
+    Return a normalized edge config between two nodes.
+
+    """
+    return dict(owner = id_node_src,
+                data  = 'some_data_type',
+                src   = '{id}.outputs.{name}'.format(id = id_node_src,
+                                                     name = name),
+                dst   = '{id}.inputs.{name}'.format(id = id_node_dst,
+                                                    name = name),
+                **kwargs)
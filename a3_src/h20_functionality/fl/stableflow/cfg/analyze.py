@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Module of functions for the static analysis of communication costs.
+
+The size of each message is worked out from
+the data dictionary: the numpy dtype and
+shape of each field. Fields that hold Python
+objects have no fixed size, so an estimate is
+used for them instead, and any total that
+includes them is marked as an estimate.
+
+Each edge is assumed to carry one message per
+tick. Totals are given for each edge, and for
+the traffic crossing each process and host
+boundary, together with an estimate of the
+time spent pickling messages on those edges
+whose transport serializes them.
+
+Edges whose volume exceeds the limit for
+their transport are flagged, so that poor
+placement of nodes can be found before the
+system is deployed.
+
+"""
+
+
+import collections
+import math
+
+import numpy
+
+import fl.stableflow.cfg.data.atomic_types
+
+
+MAP_LIMIT_BYTES_DEFAULT = {
+    'intra_process': None,
+    'inter_thread':  None,
+    'inter_process': 16 * 1024 * 1024,
+    'inter_host':    1024 * 1024
+}
+SET_IPC_TYPE_SERIALIZED  = frozenset(('inter_process', 'inter_host'))
+BYTES_PY_OBJECT_ESTIMATE = 64
+BYTES_PER_SEC_SERIALIZE  = 1.0e9
+SECS_PER_FIELD_SERIALIZE = 1.0e-6
+
+
+TypeSize = collections.namedtuple(
+                            'TypeSize',
+                            ['num_bytes', 'num_field', 'is_estimate'])
+
+EdgeCost = collections.namedtuple(
+                            'EdgeCost',
+                            ['id_edge',
+                             'ipc_type',
+                             'data',
+                             'size',
+                             'secs_serialize',
+                             'limit_bytes',
+                             'is_over_limit'])
+
+Analysis = collections.namedtuple(
+                            'Analysis',
+                            ['list_edge_cost',
+                             'map_bytes_process',
+                             'map_bytes_host'])
+
+
+# -----------------------------------------------------------------------------
+def analyze(cfg, map_limit_bytes = None):
+    """
+    Return an Analysis of the communication costs of a denormalized config.
+
+    map_limit_bytes maps ipc_type to the largest
+    number of bytes per tick allowed on edges of
+    that type, or None for no limit. It updates
+    MAP_LIMIT_BYTES_DEFAULT.
+
+    """
+    map_limit = dict(MAP_LIMIT_BYTES_DEFAULT)
+    map_limit.update(map_limit_bytes or dict())
+
+    map_size          = type_sizes(cfg['data'])
+    map_typeinfo      = fl.stableflow.cfg.data.atomic_types.as_dict()
+    list_edge_cost    = list()
+    map_bytes_process = collections.Counter()
+    map_bytes_host    = collections.Counter()
+
+    for cfg_edge in cfg['edge']:
+        ipc_type = cfg_edge['ipc_type']
+        size     = map_size.get(cfg_edge['data'], None)
+        if size is None:
+            size = _atomic_size(map_typeinfo.get(cfg_edge['data'], None), None)
+        limit_bytes = map_limit.get(ipc_type, None)
+        list_edge_cost.append(EdgeCost(
+                id_edge        = cfg_edge['id_edge'],
+                ipc_type       = ipc_type,
+                data           = cfg_edge['data'],
+                size           = size,
+                secs_serialize = _secs_serialize(size, ipc_type),
+                limit_bytes    = limit_bytes,
+                is_over_limit  = (limit_bytes is not None
+                                        and size.num_bytes > limit_bytes)))
+
+        if ipc_type in ('inter_process', 'inter_host'):
+            for id_process in set(cfg_edge['list_id_process']):
+                map_bytes_process[id_process] += size.num_bytes
+        if ipc_type == 'inter_host':
+            for id_host in set(cfg_edge['list_id_host']):
+                map_bytes_host[id_host] += size.num_bytes
+
+    list_edge_cost.sort(key = lambda cost: (-cost.size.num_bytes,
+                                            cost.id_edge))
+    return Analysis(list_edge_cost    = list_edge_cost,
+                    map_bytes_process = dict(map_bytes_process),
+                    map_bytes_host    = dict(map_bytes_host))
+
+
+# -----------------------------------------------------------------------------
+def type_sizes(cfg_data):
+    """
+    Return a map from type name to TypeSize, for a denormalized data section.
+
+    """
+    map_size = dict()
+    for (id_type, list_node) in cfg_data.items():
+        num_bytes   = 0
+        num_field   = 0
+        is_estimate = False
+        for node in list_node:
+            if 'typeinfo' not in node:
+                continue
+            size         = _atomic_size(node['typeinfo'], node.get('shape'))
+            num_bytes   += size.num_bytes
+            num_field   += size.num_field
+            is_estimate |= size.is_estimate
+        map_size[id_type] = TypeSize(num_bytes   = num_bytes,
+                                     num_field   = num_field,
+                                     is_estimate = is_estimate)
+    return map_size
+
+
+# -----------------------------------------------------------------------------
+def format_report(analysis):
+    """
+    Return a list of lines reporting the specified Analysis.
+
+    """
+    list_line = ['Edges (bytes per tick):']
+    for cost in analysis.list_edge_cost:
+        list_line.append(
+            '  {flag:4} {ipc_type:13} {size:>11} {limit:>13} '
+            '{ser:>12}  {id_edge} [{data}]'.format(
+                flag     = 'OVER' if cost.is_over_limit else '',
+                ipc_type = cost.ipc_type,
+                size     = _format_size(cost.size),
+                limit    = ('' if cost.limit_bytes is None else
+                            '(max {max})'.format(
+                                    max = _format_bytes(cost.limit_bytes))),
+                ser      = ('' if not cost.secs_serialize else
+                            '{usec:.1f}us ser'.format(
+                                    usec = cost.secs_serialize * 1.0e6)),
+                id_edge  = cost.id_edge,
+                data     = cost.data))
+
+    for (title, map_bytes) in (
+                ('Process boundaries', analysis.map_bytes_process),
+                ('Host boundaries',    analysis.map_bytes_host)):
+        list_line.append('{title} (bytes per tick in + out):'.format(
+                                                            title = title))
+        for (id_entity, num_bytes) in sorted(map_bytes.items(),
+                                             key = lambda item: (-item[1],
+                                                                 item[0])):
+            list_line.append('  {num_bytes:>11}  {id_entity}'.format(
+                                    num_bytes = _format_bytes(num_bytes),
+                                    id_entity = id_entity))
+
+    count_over = sum(cost.is_over_limit for cost in analysis.list_edge_cost)
+    list_line.append('{count} edge(s) over limit.'.format(count = count_over))
+    return list_line
+
+
+# -----------------------------------------------------------------------------
+def _atomic_size(typeinfo, shape):
+    """
+    Return the TypeSize of a single field with the specified shape.
+
+    """
+    if typeinfo is None:
+        return TypeSize(num_bytes = 0, num_field = 0, is_estimate = True)
+
+    if isinstance(shape, int):
+        shape = (shape,)
+    num_item = math.prod(shape) if shape else 1
+
+    if typeinfo['np'] is None:
+        return TypeSize(num_bytes   = BYTES_PY_OBJECT_ESTIMATE * num_item,
+                        num_field   = 1,
+                        is_estimate = True)
+    return TypeSize(num_bytes   = numpy.dtype(typeinfo['np']).itemsize
+                                                                * num_item,
+                    num_field   = 1,
+                    is_estimate = False)
+
+
+# -----------------------------------------------------------------------------
+def _secs_serialize(size, ipc_type):
+    """
+    Return the estimated time to pickle and unpickle one message.
+
+    """
+    if ipc_type not in SET_IPC_TYPE_SERIALIZED:
+        return 0.0
+    return 2.0 * (size.num_field * SECS_PER_FIELD_SERIALIZE
+                            + size.num_bytes / BYTES_PER_SEC_SERIALIZE)
+
+
+# -----------------------------------------------------------------------------
+def _format_size(size):
+    """
+    Return a TypeSize formatted for display, with "~" if it is an estimate.
+
+    """
+    return '{approx}{num}'.format(approx = '~' if size.is_estimate else '',
+                                  num    = _format_bytes(size.num_bytes))
+
+
+# -----------------------------------------------------------------------------
+def _format_bytes(num_bytes):
+    """
+    Return a number of bytes formatted for display.
+
+    """
+    if num_bytes < 1024:
+        return '{num} B'.format(num = num_bytes)
+    for unit in ('KiB', 'MiB', 'GiB'):
+        num_bytes /= 1024
+        if num_bytes < 1024 or unit == 'GiB':
+            return '{num:.1f} {unit}'.format(num = num_bytes, unit = unit)
@@ -2,6 +2,19 @@
 """
 Package of functions that mutate configuration data.
 
+Each function works directly on a config dict,
+which is convenient for small edits, but must
+scan the config to find the processes, nodes
+or edges that belong to a host, process or
+node.
+
+To generate large graphs programmatically, use
+a Builder instead. It keeps reverse indexes
+from each host to its processes, from each
+process to its nodes and from each node to its
+edges, so that every operation takes time in
+proportion to the elements that it touches.
+
 ---
 type:
     python_extension
@@ -13,6 +26,11 @@ name_extension:
 """
 
 
+import collections
+import copy
+import itertools
+
+
 # -----------------------------------------------------------------------------
 def get_skeleton_config():
     """
@@ -76,11 +94,10 @@ def add_process(cfg, id_process, id_host = None, **kwargs):
     Mutate the config structure to add a new process.
 
     """
-    tup_hosts = tuple(cfg['host'].keys())
     if id_host is None:
-        id_host = tup_hosts[0]
+        id_host = next(iter(cfg['host']))
 
-    assert id_host in tup_hosts
+    assert id_host in cfg['host']
 
     cfg['process'][id_process] = dict(kwargs.items())
     cfg['process'][id_process]['host'] = id_host
@@ -125,7 +142,7 @@ def add_node(cfg,  # pylint: disable=R0913
     if id_process is not None:
         cfg_node['process'] = id_process
     else:
-        cfg_node['process'] = tuple(cfg['process'].keys())[0]
+        cfg_node['process'] = next(iter(cfg['process']))
 
     if req_host_cfg is not None:
         cfg_node['req_host_cfg'] = req_host_cfg
@@ -285,6 +302,292 @@ def add_pipeline(cfg,  # pylint: disable=R0913
                      data    = edge_data_type)
 
 
+# =============================================================================
+class Builder():
+    """
+    Indexed builder for large configurations.
+
+    Hosts, processes, nodes and edges are added
+    and removed individually or in batches, and
+    the plain config dict is returned by
+    get_config once the graph is complete.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, cfg = None):
+        """
+        Return a Builder for a new skeleton config, or for the specified one.
+
+        A config that is passed in is copied, so
+        that the caller's config is left intact,
+        and the copy is indexed in linear time.
+
+        """
+        if cfg is None:
+            cfg = get_skeleton_config()
+        else:
+            cfg = copy.deepcopy(cfg)
+
+        ddict              = collections.defaultdict
+        self._cfg          = cfg
+        self._map_cfg_edge = dict()             # key_edge   -> cfg_edge
+        self._map_id_proc  = ddict(dict)        # id_host    -> {id_process}
+        self._map_id_node  = ddict(dict)        # id_process -> {id_node}
+        self._map_key_node = ddict(dict)        # id_node    -> {key_edge}
+        self._map_key_path = ddict(dict)        # (src, dst) -> {key_edge}
+        self._iter_key     = itertools.count()
+
+        for (id_process, cfg_process) in cfg['process'].items():
+            self._map_id_proc[cfg_process['host']][id_process] = None
+        for (id_node, cfg_node) in cfg['node'].items():
+            self._map_id_node[cfg_node['process']][id_node] = None
+        for cfg_edge in cfg.pop('edge', ()):
+            self._index_edge(cfg_edge)
+
+    # -------------------------------------------------------------------------
+    def get_config(self):
+        """
+        Return the plain config dict.
+
+        """
+        cfg         = dict(self._cfg)
+        cfg['edge'] = list(self._map_cfg_edge.values())
+        return cfg
+
+    # -------------------------------------------------------------------------
+    def set_system_id(self, id_system):
+        """
+        Set the system id.
+
+        """
+        set_system_id(self._cfg, id_system)
+
+    # -------------------------------------------------------------------------
+    def add_host(self, id_host, **kwargs):
+        """
+        Add a new process host.
+
+        """
+        add_host(self._cfg, id_host, **kwargs)
+
+    # -------------------------------------------------------------------------
+    def add_hosts(self, iter_id_host):
+        """
+        Add a new process host for each specified id.
+
+        """
+        for id_host in iter_id_host:
+            self.add_host(id_host)
+
+    # -------------------------------------------------------------------------
+    def remove_host(self, id_host):
+        """
+        Remove a process host, with all of its processes, nodes and edges.
+
+        """
+        self.remove_processes(tuple(self._map_id_proc.get(id_host, ())))
+        self._map_id_proc.pop(id_host, None)
+        del self._cfg['host'][id_host]
+
+    # -------------------------------------------------------------------------
+    def remove_hosts(self, iter_id_host):
+        """
+        Remove each specified process host.
+
+        """
+        for id_host in tuple(iter_id_host):
+            self.remove_host(id_host)
+
+    # -------------------------------------------------------------------------
+    def add_process(self, id_process, id_host = None, **kwargs):
+        """
+        Add a new process.
+
+        """
+        self._unindex_process(id_process)
+        add_process(self._cfg, id_process, id_host, **kwargs)
+        id_host = self._cfg['process'][id_process]['host']
+        self._map_id_proc[id_host][id_process] = None
+
+    # -------------------------------------------------------------------------
+    def add_processes(self, iter_id_process, id_host = None):
+        """
+        Add a new process for each specified id, all on the same host.
+
+        """
+        for id_process in iter_id_process:
+            self.add_process(id_process, id_host)
+
+    # -------------------------------------------------------------------------
+    def remove_process(self, id_process):
+        """
+        Remove a process, with all of its nodes and edges.
+
+        """
+        self.remove_nodes(tuple(self._map_id_node.get(id_process, ())))
+        self._map_id_node.pop(id_process, None)
+        self._unindex_process(id_process)
+        del self._cfg['process'][id_process]
+
+    # -------------------------------------------------------------------------
+    def remove_processes(self, iter_id_process):
+        """
+        Remove each specified process.
+
+        """
+        for id_process in tuple(iter_id_process):
+            self.remove_process(id_process)
+
+    # -------------------------------------------------------------------------
+    def add_node(self, id_node, **kwargs):
+        """
+        Add a new node. Keyword arguments are as for add_node.
+
+        """
+        self._unindex_node(id_node)
+        add_node(self._cfg, id_node, **kwargs)
+        id_process = self._cfg['node'][id_node]['process']
+        self._map_id_node[id_process][id_node] = None
+
+    # -------------------------------------------------------------------------
+    def add_nodes(self, iter_node):
+        """
+        Add a new node for each (id_node, map_kwargs) pair.
+
+        """
+        for (id_node, map_kwargs) in iter_node:
+            self.add_node(id_node, **map_kwargs)
+
+    # -------------------------------------------------------------------------
+    def remove_node(self, id_node):
+        """
+        Remove a node, with all edges starting or ending at it.
+
+        """
+        for key_edge in tuple(self._map_key_node.pop(id_node, ())):
+            self._unindex_edge(key_edge)
+        self._unindex_node(id_node)
+        del self._cfg['node'][id_node]
+
+    # -------------------------------------------------------------------------
+    def remove_nodes(self, iter_id_node):
+        """
+        Remove each specified node.
+
+        """
+        for id_node in tuple(iter_id_node):
+            self.remove_node(id_node)
+
+    # -------------------------------------------------------------------------
+    def add_edge(self,  # pylint: disable=R0913
+                 id_src,
+                 src_ref,
+                 id_dst,
+                 dst_ref,
+                 data):
+        """
+        Add a new edge.
+
+        """
+        self._index_edge({'owner': id_src,
+                          'data':  data,
+                          'src':   id_src + '.' + src_ref,
+                          'dst':   id_dst + '.' + dst_ref})
+
+    # -------------------------------------------------------------------------
+    def add_edges(self, iter_edge):
+        """
+        Add a new edge for each (id_src, src_ref, id_dst, dst_ref, data).
+
+        """
+        for (id_src, src_ref, id_dst, dst_ref, data) in iter_edge:
+            self.add_edge(id_src, src_ref, id_dst, dst_ref, data)
+
+    # -------------------------------------------------------------------------
+    def remove_edge(self, src, dst):
+        """
+        Remove all edges from the src path to the dst path.
+
+        """
+        for key_edge in tuple(self._map_key_path.get((src, dst), ())):
+            self._unindex_edge(key_edge)
+
+    # -------------------------------------------------------------------------
+    def remove_edges(self, iter_path):
+        """
+        Remove all edges for each specified (src, dst) pair of paths.
+
+        """
+        for (src, dst) in tuple(iter_path):
+            self.remove_edge(src, dst)
+
+    # -------------------------------------------------------------------------
+    def add_data(self, id_data, spec_data):
+        """
+        Add a new data type.
+
+        """
+        add_data(self._cfg, id_data, spec_data)
+
+    # -------------------------------------------------------------------------
+    def remove_data(self, id_data):
+        """
+        Remove the specified data type.
+
+        """
+        remove_data(self._cfg, id_data)
+
+    # -------------------------------------------------------------------------
+    def _unindex_process(self, id_process):
+        """
+        Remove an existing process from the host index, if it exists.
+
+        """
+        cfg_process = self._cfg['process'].get(id_process, None)
+        if cfg_process is not None:
+            self._map_id_proc[cfg_process['host']].pop(id_process, None)
+
+    # -------------------------------------------------------------------------
+    def _unindex_node(self, id_node):
+        """
+        Remove an existing node from the process index, if it exists.
+
+        """
+        cfg_node = self._cfg['node'].get(id_node, None)
+        if cfg_node is not None:
+            self._map_id_node[cfg_node['process']].pop(id_node, None)
+
+    # -------------------------------------------------------------------------
+    def _index_edge(self, cfg_edge):
+        """
+        Add an edge and index it by node and by path.
+
+        """
+        key_edge = next(self._iter_key)
+        self._map_cfg_edge[key_edge] = cfg_edge
+        self._map_key_path[(cfg_edge['src'],
+                                    cfg_edge['dst'])][key_edge] = None
+        for path in (cfg_edge['src'], cfg_edge['dst']):
+            self._map_key_node[path.split('.')[0]][key_edge] = None
+
+    # -------------------------------------------------------------------------
+    def _unindex_edge(self, key_edge):
+        """
+        Remove an edge, and remove it from each index.
+
+        """
+        cfg_edge = self._map_cfg_edge.pop(key_edge)
+        path     = (cfg_edge['src'], cfg_edge['dst'])
+        self._map_key_path[path].pop(key_edge, None)
+        if not self._map_key_path[path]:
+            del self._map_key_path[path]
+        for path in (cfg_edge['src'], cfg_edge['dst']):
+            id_node = path.split('.')[0]
+            if id_node in self._map_key_node:
+                self._map_key_node[id_node].pop(key_edge, None)
+
+
 # -----------------------------------------------------------------------------
 def _make_list(data, type, count):
     """
@@ -6,12 +6,11 @@ Package of functions that support the configuration of data types.
 
 
 import collections
-import copy
 import enum
 import itertools
 
 import fl.stableflow.cfg.data.atomic_types
-import fl.stableflow.cfg.data.gap_table
+import fl.stableflow.cfg.exception
 import fl.stableflow.cfg.util
 import pl.stableflow.util
 
@@ -25,45 +24,36 @@ def denormalize(cfg):
     data dictionary with nodes that have been
     expanded/denormalised and flattened.
 
+    Types are expanded in a topological order of
+    the graph of references between user defined
+    types, so each type is expanded only once,
+    after all of the types that it references.
+    Each reference to a user defined type shares
+    the memoized expansion of that type, which is
+    only copied when it is flattened.
+
     """
     cfg_data   = cfg['data']
     parameters = dict()
     subs       = fl.stableflow.cfg.util.SubstitutionTable(parameters)
     typeinfo   = fl.stableflow.cfg.data.atomic_types.as_dict()
-    gap_table  = fl.stableflow.cfg.data.gap_table.GapTable()
-    stack      = _init_stack(map = cfg_data)
-    expanded   = pl.stableflow.util.PathDict()
-
-    for (idx, node) in enumerate(_iter_depth_first(stack)):
-
-        try:
-
-            expanded[node.path][node.name] = _expand_node(
-                                                node, subs, typeinfo, idx)
-
-        except TypeError:
+    map_node   = _nodes_by_type(_iter_depth_first(_init_stack(map = cfg_data)))
+    map_dep    = dict()
+    expanded   = dict()
 
-            if node.category != FieldCategory.named_type:
-                raise
+    for (type_name, list_node) in map_node.items():
+        map_dep[type_name] = _dependencies(list_node, map_node, subs, typeinfo)
 
-            gap_table.add(incomplete_type = node.path[0],
-                          missing_type    = node.spec,
-                          gap_parent_path = node.path,
-                          gap_field       = node.name)
-
-    # So far, we have only added fundamental types
-    # to our expanded data structure.
-    #
-    # There are still gaps: One each time a user
-    # defined data type was referenced. These are
-    # now filled using the information recorded in
-    # the gap table.
-    #
-    gap_table.fill_all(expanded)
+    for type_name in _topological_order(map_dep):
+        expanded[type_name] = _expand_type(type_name,
+                                           map_node[type_name],
+                                           expanded,
+                                           subs,
+                                           typeinfo)
 
     std_form = dict()
-    for (type_name, type_definition) in expanded.data.items():
-        std_form[type_name] = list(_iter_expanded(type_definition))
+    for type_name in map_node:
+        std_form[type_name] = list(_iter_expanded(expanded[type_name]))
     cfg['data'] = std_form
 
     return cfg
@@ -179,6 +169,121 @@ def _iter_depth_first(stack):
                    category = field_category)
 
 
+# -----------------------------------------------------------------------------
+def _nodes_by_type(iter_node):
+    """
+    Return a map from each top level type name to its (idx, node) tuples.
+
+    """
+    map_node = dict()
+    for (idx, node) in enumerate(iter_node):
+        type_name = node.path[0] if node.path else node.name
+        map_node.setdefault(type_name, list()).append((idx, node))
+    return map_node
+
+
+# -----------------------------------------------------------------------------
+def _dependencies(list_node, map_node, subs, typeinfo):
+    """
+    Return the set of user defined types referenced by a type definition.
+
+    """
+    set_dep = set()
+    for (_, node) in list_node:
+        if node.category != FieldCategory.named_type:
+            continue
+        name_ref = subs[node.spec]
+        if name_ref in typeinfo:
+            continue
+        if name_ref not in map_node:
+            raise fl.stableflow.cfg.exception.CfgError(
+                'Undefined data type "{name}" referenced by "{path}".'.format(
+                                name = name_ref,
+                                path = '.'.join(node.path + [node.name])))
+        set_dep.add(name_ref)
+    return set_dep
+
+
+# -----------------------------------------------------------------------------
+def _topological_order(map_dep):
+    """
+    Return type names ordered so that each follows all of its dependencies.
+
+    This is Kahn's algorithm, with ties broken
+    by name so that the order is deterministic.
+    Any types left over are part of (or depend
+    on) a cycle, which is reported as an error.
+
+    """
+    map_num_dep   = dict()
+    map_dependent = collections.defaultdict(list)
+    for (type_name, set_dep) in sorted(map_dep.items()):
+        map_num_dep[type_name] = len(set_dep)
+        for name_dep in set_dep:
+            map_dependent[name_dep].append(type_name)
+
+    ready      = collections.deque(
+                    name for (name, num) in map_num_dep.items() if not num)
+    list_order = list()
+    while ready:
+        type_name = ready.popleft()
+        list_order.append(type_name)
+        for name_dependent in map_dependent[type_name]:
+            map_num_dep[name_dependent] -= 1
+            if not map_num_dep[name_dependent]:
+                ready.append(name_dependent)
+
+    if len(list_order) < len(map_dep):
+        list_cycle = _find_cycle(map_dep, set(map_dep) - set(list_order))
+        raise fl.stableflow.cfg.exception.CfgError(
+                    'Cyclic data type reference: {cycle}.'.format(
+                                            cycle = ' -> '.join(list_cycle)))
+
+    return list_order
+
+
+# -----------------------------------------------------------------------------
+def _find_cycle(map_dep, set_remaining):
+    """
+    Return a list of type names tracing a cycle within set_remaining.
+
+    Every remaining type has at least one
+    dependency that is also remaining, so
+    following those dependencies must
+    eventually revisit a type.
+
+    """
+    type_name = min(set_remaining)
+    map_idx   = dict()
+    list_path = list()
+    while type_name not in map_idx:
+        map_idx[type_name] = len(list_path)
+        list_path.append(type_name)
+        type_name = min(map_dep[type_name] & set_remaining)
+    return list_path[map_idx[type_name]:] + [type_name]
+
+
+# -----------------------------------------------------------------------------
+def _expand_type(type_name, list_node, expanded, subs, typeinfo):
+    """
+    Return the expanded definition of a single top level type.
+
+    References to user defined types are filled
+    with the already expanded (and shared)
+    definition of the referenced type.
+
+    """
+    tree = pl.stableflow.util.PathDict()
+    for (idx, node) in list_node:
+        if node.category == FieldCategory.named_type:
+            name_ref = subs[node.spec]
+            if name_ref not in typeinfo:
+                tree[node.path][node.name] = expanded[name_ref]
+                continue
+        tree[node.path][node.name] = _expand_node(node, subs, typeinfo, idx)
+    return tree.data[type_name]
+
+
 # -----------------------------------------------------------------------------
 def _expand_node(node, subs, typeinfo, idx):
     """
@@ -249,7 +354,7 @@ def _iter_expanded(expanded_def):
         except IndexError:
             return
 
-        node_info               = node['_node_info']
+        node_info               = dict(node['_node_info'])
         node_info['dst_seqnum'] = idx
         node_info['dst_path']   = path
         node_info['dst_level']  = len(path)
@@ -260,7 +365,7 @@ def _iter_expanded(expanded_def):
             continue
 
         # Close the scope of a compound type with a 'scope-closer' message.
-        scope_closer             = copy.deepcopy(node_info)
+        scope_closer             = dict(node_info)
         scope_closer['category'] = 'compound_type_scope_closer'
         stack.append(({'_node_info':  scope_closer}, path))
 
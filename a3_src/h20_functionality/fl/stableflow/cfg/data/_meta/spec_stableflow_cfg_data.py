@@ -24,6 +24,77 @@ class SpecifyDenormalize:
                                             valid_partly_denormalized_config)
         fl.stableflow.cfg.validate.denormalized(denormalized_config)
 
+    # -------------------------------------------------------------------------
+    def it_fills_references_to_user_defined_types(self):
+        """
+        A reference to a user defined type is replaced by its definition.
+
+        """
+        import fl.stableflow.cfg.data  # pylint: disable=C0415
+
+        cfg_data = fl.stableflow.cfg.data.denormalize({'data': {
+                        'inner': [{'x': 'float32'}],
+                        'outer': [{'y': 'inner'}, {'z': 'int8'}],
+                        'alias': 'outer'}})['data']
+
+        list_path = [node['dst_path'] for node in cfg_data['outer']
+                        if node['category'] != 'compound_type_scope_closer']
+        assert list_path == [[], ['y'], ['y', 'x'], ['z']]
+        assert [node['dst_seqnum'] for node in cfg_data['outer']] == [
+                                                            0, 1, 2, 3, 4, 5]
+        assert len(cfg_data['alias']) == len(cfg_data['outer'])
+
+    # -------------------------------------------------------------------------
+    def it_reports_cyclic_and_undefined_references(self):
+        """
+        Cycles and undefined types raise a CfgError naming the types.
+
+        """
+        import pytest                       # pylint: disable=C0415
+        import fl.stableflow.cfg.data       # pylint: disable=C0415
+        import fl.stableflow.cfg.exception  # pylint: disable=C0415
+
+        CfgError = fl.stableflow.cfg.exception.CfgError
+        with pytest.raises(CfgError, match = 'a -> b -> c -> a'):
+            fl.stableflow.cfg.data.denormalize({'data': {
+                                                'a': [{'x': 'b'}],
+                                                'b': [{'y': 'c'}],
+                                                'c': [{'z': 'a'}],
+                                                'd': [{'w': 'a'}]}})
+        with pytest.raises(CfgError, match = '"missing" referenced by "a.x"'):
+            fl.stableflow.cfg.data.denormalize({'data': {
+                                                'a': [{'x': 'missing'}]}})
+
+    # -------------------------------------------------------------------------
+    def it_resolves_large_and_deeply_nested_type_libraries(self):
+        """
+        Benchmark: thousands of types, and reference chains hundreds deep.
+
+        """
+        import time                    # pylint: disable=C0415
+        import fl.stableflow.cfg.data  # pylint: disable=C0415
+
+        num_type = 4000
+        cfg_data = {'t0': [{'value': 'float64'}]}
+        for idx in range(1, num_type):
+            cfg_data['t{idx}'.format(idx = idx)] = [
+                    {'parent': 't{idx}'.format(idx = (idx - 1) // 2)},
+                    {'count':  'int32'},
+                    {'vector': {'type': 'float32', 'shape': [4]}}]
+        for idx in range(1, 100):
+            cfg_data['c{idx}'.format(idx = idx)] = [
+                    {'next': 'c{idx}'.format(idx = idx - 1) if idx > 1
+                                                            else 't0'}]
+
+        time_start = time.perf_counter()
+        cfg_data   = fl.stableflow.cfg.data.denormalize(
+                                                {'data': cfg_data})['data']
+        secs       = time.perf_counter() - time_start
+
+        assert len(cfg_data) == num_type + 99
+        assert cfg_data['c99'][100]['dst_level'] == 100
+        assert secs < 30.0
+
 
 # =============================================================================
 class Specify_ExpandNode:
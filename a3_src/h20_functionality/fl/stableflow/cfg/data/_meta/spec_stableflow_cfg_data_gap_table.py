@@ -1,5 +0,0 @@
-# -*- coding: utf-8 -*-
-"""
-Functional specification for the fl.stableflow.cfg.data.gap_table module.
-
-"""
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Module of functions for comparing two versions of a configuration.
+
+Each host, process, node and edge is given a
+digest of its configuration. Node and edge
+digests also cover the definition of their
+data types, including any user defined types
+that those definitions refer to, so that a
+change to a type is seen by everything that
+uses it.
+
+Two versions of a configuration are compared
+by digest to find the minimal set of processes
+that must be restarted for a running system to
+pick up the new version. Inter-process queues
+are created by the host before its processes
+are forked, so they cannot be re-wired in a
+running process: both ends of any such queue
+are restarted together. Inter-host queues
+reconnect, so only the changed end restarts.
+
+Changes to any other section (system, queue,
+etc.) require the whole system to restart.
+
+"""
+
+
+import collections
+import hashlib
+import json
+
+
+SECTIONS_PER_ENTITY = ('host', 'process', 'node', 'edge', 'data', 'runtime')
+
+
+UpdatePlan = collections.namedtuple(
+                            'UpdatePlan',
+                            ['is_full_restart',
+                             'set_id_process_stop',
+                             'set_id_process_start'])
+
+
+# -----------------------------------------------------------------------------
+def digests(cfg):
+    """
+    Return a map from section to a map from id to digest for each entity.
+
+    The 'global' entry is a single digest of all
+    sections that are not broken down by entity.
+
+    """
+    map_digest_data = _data_digests(cfg.get('data', dict()))
+    return {
+        'global':  _digest(dict((key, value) for (key, value) in cfg.items()
+                                    if key not in SECTIONS_PER_ENTITY)),
+        'host':    dict((id_host, _digest(cfg_host))
+                            for (id_host, cfg_host) in cfg['host'].items()),
+        'process': dict((id_process, _digest(cfg_process))
+                            for (id_process, cfg_process)
+                                            in cfg['process'].items()),
+        'node':    dict((id_node, _digest((cfg_node, map_digest_data.get(
+                                                cfg_node.get('state_type')))))
+                            for (id_node, cfg_node) in cfg['node'].items()),
+        'edge':    dict((_id_edge(cfg_edge), _digest((cfg_edge,
+                                map_digest_data.get(cfg_edge.get('data')))))
+                            for cfg_edge in cfg['edge'])}
+
+
+# -----------------------------------------------------------------------------
+def plan(cfg_old, cfg_new):
+    """
+    Return an UpdatePlan that takes a system from cfg_old to cfg_new.
+
+    Processes in set_id_process_stop are
+    identified by cfg_old, and processes in
+    set_id_process_start by cfg_new. Both
+    configurations should be normalized.
+
+    """
+    map_digest_old = digests(cfg_old)
+    map_digest_new = digests(cfg_new)
+
+    if map_digest_old['global'] != map_digest_new['global']:
+        return UpdatePlan(is_full_restart      = True,
+                          set_id_process_stop  = set(cfg_old['process']),
+                          set_id_process_start = set(cfg_new['process']))
+
+    set_id_process = set()
+    map_link       = collections.defaultdict(set)
+    for (cfg, map_digest, map_digest_other) in (
+                                    (cfg_old, map_digest_old, map_digest_new),
+                                    (cfg_new, map_digest_new, map_digest_old)):
+        set_id_process.update(_changed_processes(cfg,
+                                                 map_digest,
+                                                 map_digest_other))
+        for (id_process_src, id_process_dst) in _inter_process_links(cfg):
+            map_link[id_process_src].add(id_process_dst)
+            map_link[id_process_dst].add(id_process_src)
+
+    set_id_process = _closure(set_id_process, map_link)
+    return UpdatePlan(
+            is_full_restart      = False,
+            set_id_process_stop  = set_id_process & set(cfg_old['process']),
+            set_id_process_start = set_id_process & set(cfg_new['process']))
+
+
+# -----------------------------------------------------------------------------
+def _changed_processes(cfg, map_digest, map_digest_other):
+    """
+    Yield the id of each process in cfg affected by a changed entity.
+
+    """
+    for (id_process, cfg_process) in cfg['process'].items():
+        if (_is_changed(map_digest, map_digest_other, 'process', id_process)
+                or _is_changed(map_digest, map_digest_other,
+                               'host', cfg_process['host'])):
+            yield id_process
+
+    for (id_node, cfg_node) in cfg['node'].items():
+        if _is_changed(map_digest, map_digest_other, 'node', id_node):
+            yield cfg_node['process']
+
+    for cfg_edge in cfg['edge']:
+        if _is_changed(map_digest, map_digest_other,
+                       'edge', _id_edge(cfg_edge)):
+            yield from _list_id_process(cfg, cfg_edge)
+
+
+# -----------------------------------------------------------------------------
+def _is_changed(map_digest, map_digest_other, section, id_entity):
+    """
+    Return true if the entity is missing from, or differs in, the other map.
+
+    """
+    return (map_digest[section][id_entity]
+                        != map_digest_other[section].get(id_entity, None))
+
+
+# -----------------------------------------------------------------------------
+def _inter_process_links(cfg):
+    """
+    Yield each pair of processes on one host that are joined by an edge.
+
+    """
+    for cfg_edge in cfg['edge']:
+        list_id_process = _list_id_process(cfg, cfg_edge)
+        if len(list_id_process) != 2:
+            continue
+        (id_process_src, id_process_dst) = list_id_process
+        if id_process_src == id_process_dst:
+            continue
+        id_host_src = cfg['process'][id_process_src]['host']
+        id_host_dst = cfg['process'][id_process_dst]['host']
+        if id_host_src == id_host_dst:
+            yield (id_process_src, id_process_dst)
+
+
+# -----------------------------------------------------------------------------
+def _list_id_process(cfg, cfg_edge):
+    """
+    Return a list of the processes at the known ends of a normalized edge.
+
+    """
+    list_id_process = list()
+    for path in (cfg_edge['src'], cfg_edge['dst']):
+        cfg_node = cfg['node'].get(path.split('.')[0], None)
+        if cfg_node is not None and cfg_node['process'] in cfg['process']:
+            list_id_process.append(cfg_node['process'])
+    return list_id_process
+
+
+# -----------------------------------------------------------------------------
+def _closure(set_id_process, map_link):
+    """
+    Return set_id_process with all processes linked to it, transitively.
+
+    """
+    set_closed = set(set_id_process)
+    stack      = list(set_id_process)
+    while stack:
+        for id_process in map_link.get(stack.pop(), ()):
+            if id_process not in set_closed:
+                set_closed.add(id_process)
+                stack.append(id_process)
+    return set_closed
+
+
+# -----------------------------------------------------------------------------
+def _data_digests(cfg_data):
+    """
+    Return a map from data type name to a digest of its full definition.
+
+    The digest of a type covers the digests of
+    any user defined types that it refers to.
+
+    """
+    map_digest = dict()
+    for id_type in cfg_data:
+        _data_digest(id_type, cfg_data, map_digest, frozenset())
+    return map_digest
+
+
+# -----------------------------------------------------------------------------
+def _data_digest(id_type, cfg_data, map_digest, set_id_visiting):
+    """
+    Return the digest of a single data type, memoized in map_digest.
+
+    References back to a type that is already
+    being visited are skipped, so a cyclic
+    definition does not recurse forever.
+
+    """
+    if id_type in map_digest:
+        return map_digest[id_type]
+    set_id_visiting = set_id_visiting | {id_type}
+    list_digest_ref = [
+            _data_digest(id_ref, cfg_data, map_digest, set_id_visiting)
+                for id_ref in sorted(set(_iter_refs(cfg_data[id_type],
+                                                    cfg_data)))
+                    if id_ref not in set_id_visiting]
+    map_digest[id_type] = _digest((cfg_data[id_type], list_digest_ref))
+    return map_digest[id_type]
+
+
+# -----------------------------------------------------------------------------
+def _iter_refs(spec, cfg_data):
+    """
+    Yield each user defined type name found in a data type definition.
+
+    """
+    if isinstance(spec, str):
+        if spec in cfg_data:
+            yield spec
+    elif isinstance(spec, dict):
+        for value in spec.values():
+            yield from _iter_refs(value, cfg_data)
+    elif isinstance(spec, (list, tuple)):
+        for item in spec:
+            yield from _iter_refs(item, cfg_data)
+
+
+# -----------------------------------------------------------------------------
+def _id_edge(cfg_edge):
+    """
+    Return the id of a normalized edge.
+
+    """
+    return ':'.join((cfg_edge['src'], cfg_edge['dst']))
+
+
+# -----------------------------------------------------------------------------
+def _digest(data):
+    """
+    Return a digest of the specified json-like data.
+
+    """
+    text = json.dumps(data, sort_keys = True, default = repr)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size = 16).hexdigest()
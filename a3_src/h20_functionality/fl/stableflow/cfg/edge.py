@@ -69,7 +69,9 @@ def _denormalize_edges(cfg):
         id_host_owner = _add_host_owner(cfg, cfg_edge)
         is_inter_host = _add_ipc_type(cfg_edge,
                                       id_process_src, id_process_dst,
-                                      id_host_src,    id_host_dst)
+                                      id_host_src,    id_host_dst,
+                                      _id_thread(cfg, cfg_edge['id_node_src']),
+                                      _id_thread(cfg, cfg_edge['id_node_dst']))
         if is_inter_host:
             set_id_host_remote_owner.add(id_host_owner)
             idx_edge = map_idx_edge[id_host_owner]
@@ -130,6 +132,15 @@ def _add_dst_info(cfg, cfg_edge):
     return (path_dst, id_process_dst, id_host_dst)
 
 
+# -----------------------------------------------------------------------------
+def _id_thread(cfg, id_node):
+    """
+    Return the id of the thread that the node runs in, or None for main.
+
+    """
+    return cfg['node'][id_node].get('thread', None)
+
+
 # -----------------------------------------------------------------------------
 def _add_host_owner(cfg, cfg_edge):
     """
@@ -144,21 +155,31 @@ def _add_host_owner(cfg, cfg_edge):
 
 
 # -----------------------------------------------------------------------------
-def _add_ipc_type(cfg_edge,
+def _add_ipc_type(cfg_edge,                           # pylint: disable=R0913
                   id_process_src, id_process_dst,
-                  id_host_src,    id_host_dst):
+                  id_host_src,    id_host_dst,
+                  id_thread_src = None,
+                  id_thread_dst = None):
     """
     Add IPC type information to the edge configuration.
 
+    Nodes in the same process but on different
+    threads are connected with an inter_thread
+    queue rather than shared memory.
+
     """
+    is_same_thread       = (id_thread_src == id_thread_dst)
     is_same_process      = (id_process_src == id_process_dst)
     is_same_host         = (id_host_src == id_host_dst)
-    is_intra_process     = is_same_host and is_same_process
+    is_local             = is_same_host and is_same_process
+    is_intra_process     = is_local and is_same_thread
+    is_inter_thread      = is_local and (not is_same_thread)
     is_inter_process     = is_same_host and (not is_same_process)
     is_inter_host        = (not is_same_host) and (not is_same_process)
     ipc_type             = _ipc_type(is_intra_process,
                                      is_inter_process,
-                                     is_inter_host)
+                                     is_inter_host,
+                                     is_inter_thread)
     cfg_edge['ipc_type'] = ipc_type
 
     return is_inter_host
@@ -176,13 +197,18 @@ def _denormalize_hosts(cfg, set_id_host_remote_owner):
 
 
 # -----------------------------------------------------------------------------
-def _ipc_type(is_intra_process, is_inter_process, is_inter_host):
+def _ipc_type(is_intra_process,
+              is_inter_process,
+              is_inter_host,
+              is_inter_thread = False):
     """
     Return ipc_type as a string.
 
     """
     if is_intra_process:
         ipc_type = 'intra_process'
+    elif is_inter_thread:
+        ipc_type = 'inter_thread'
     elif is_inter_process:
         ipc_type = 'inter_process'
     elif is_inter_host:
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+Module with a class for indexing the data flow graph of a configuration.
+
+The index is built once per configuration,
+in time linear in the number of nodes and
+edges. It groups nodes and edges by process,
+so that each process can be configured
+without scanning the whole graph, and it
+maintains the rank of each node in the
+local (intra process) data flow graph.
+
+The rank of a node is the length of the
+longest path to it from a source, so nodes
+of equal rank form the tranches of a
+breadth first topological sort, and the run
+order of a process is its nodes sorted by
+rank and then by id.
+
+Nodes and edges can be added and removed
+after the index is built, as when editing
+a configuration. Ranks are then updated
+incrementally, visiting only the nodes
+whose rank actually changes.
+
+Nodes on, or downstream of, a cycle of
+feedforward edges cannot be ranked. They
+are run last, in order of id, as they were
+before the index existed. While any such
+cycle exists, each change re-ranks the
+whole graph.
+
+---
+type:
+    python_extension
+
+name_extension:
+    fl.stableflow.cfg.graph
+...
+
+"""
+
+
+import collections
+import heapq
+
+
+# =============================================================================
+class GraphIndex():
+    """
+    Index of the nodes, edges and local run order of each process.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def from_cfg(cls, cfg):
+        """
+        Return a GraphIndex for the specified (denormalized) configuration.
+
+        """
+        return cls(map_cfg_node = cfg['node'], iter_cfg_edge = cfg['edge'])
+
+    # -------------------------------------------------------------------------
+    def __init__(self, map_cfg_node = None, iter_cfg_edge = None):
+        """
+        Return a GraphIndex of the specified nodes and denormalized edges.
+
+        """
+        ddict                       = collections.defaultdict
+        self.map_id_process         = dict()       # id_node    -> id_process
+        self.map_id_node_by_process = ddict(set)   # id_process -> {id_node}
+        self.map_id_edge_by_process = ddict(dict)  # id_process -> {id_edge}
+        self.map_id_edge_by_node    = ddict(set)   # id_node    -> {id_edge}
+        self.map_cfg_edge           = dict()       # id_edge    -> cfg_edge
+        self.map_forward            = ddict(dict)  # id_node    -> {id_node: n}
+        self.map_backward           = ddict(dict)  # id_node    -> {id_node: n}
+        self.map_rank               = dict()       # id_node    -> rank
+        self.set_id_node_cyclic     = set()        # unranked nodes
+
+        for (id_node, cfg_node) in (map_cfg_node or dict()).items():
+            self.add_node(id_node, cfg_node['process'])
+        for cfg_edge in (iter_cfg_edge or ()):
+            self._index_edge(cfg_edge)
+        self._rank_all()
+
+    # -------------------------------------------------------------------------
+    def list_id_node_in_runorder(self, id_process):
+        """
+        Return a list of node ids in the process sorted by order of execution.
+
+        Nodes in the local data flow graph run in
+        order of rank, then id. Nodes with no local
+        edges, or that cannot be ranked, run last,
+        in order of id.
+
+        """
+        list_id_node_linked   = list()
+        list_id_node_unlinked = list()
+        for id_node in self.map_id_node_by_process.get(id_process, ()):
+            if self._is_ranked(id_node):
+                list_id_node_linked.append((self.map_rank[id_node], id_node))
+            else:
+                list_id_node_unlinked.append(id_node)
+        return ([id_node for (_, id_node) in sorted(list_id_node_linked)]
+                                            + sorted(list_id_node_unlinked))
+
+    # -------------------------------------------------------------------------
+    def list_cfg_edge(self, id_process):
+        """
+        Return a list of the edges with at least one end in the process.
+
+        """
+        return [self.map_cfg_edge[id_edge] for id_edge
+                        in self.map_id_edge_by_process.get(id_process, ())]
+
+    # -------------------------------------------------------------------------
+    def add_node(self, id_node, id_process):
+        """
+        Add a node to the specified process.
+
+        """
+        self.map_id_process[id_node] = id_process
+        self.map_id_node_by_process[id_process].add(id_node)
+        self.map_rank.setdefault(id_node, 0)
+
+    # -------------------------------------------------------------------------
+    def remove_node(self, id_node):
+        """
+        Remove a node, and all edges starting or ending at it.
+
+        """
+        for id_edge in tuple(self.map_id_edge_by_node.get(id_node, ())):
+            self.remove_edge(self.map_cfg_edge[id_edge])
+        id_process = self.map_id_process.pop(id_node)
+        self.map_id_node_by_process[id_process].discard(id_node)
+        self.map_id_edge_by_node.pop(id_node, None)
+        self.set_id_node_cyclic.discard(id_node)
+        del self.map_rank[id_node]
+
+    # -------------------------------------------------------------------------
+    def add_edge(self, cfg_edge):
+        """
+        Add a denormalized edge, updating ranks in the local graph.
+
+        """
+        link = _local_link(cfg_edge)
+        is_cyclic = (link is not None) and (bool(self.set_id_node_cyclic)
+                                            or self._is_reachable(*link[::-1]))
+        self._index_edge(cfg_edge)
+        if is_cyclic:
+            self._rank_all()
+        elif link is not None:
+            self._update_ranks(link[1])
+
+    # -------------------------------------------------------------------------
+    def remove_edge(self, cfg_edge):
+        """
+        Remove a denormalized edge, updating ranks in the local graph.
+
+        """
+        id_edge = cfg_edge['id_edge']
+        del self.map_cfg_edge[id_edge]
+        for id_process in set(cfg_edge['list_id_process']):
+            self.map_id_edge_by_process[id_process].pop(id_edge, None)
+        for id_node in (cfg_edge['id_node_src'], cfg_edge['id_node_dst']):
+            self.map_id_edge_by_node[id_node].discard(id_edge)
+
+        link = _local_link(cfg_edge)
+        if link is None:
+            return
+        (id_node_up, id_node_down) = link
+        for (map_link, key, value) in (
+                            (self.map_forward,  id_node_up,   id_node_down),
+                            (self.map_backward, id_node_down, id_node_up)):
+            map_link[key][value] -= 1
+            if not map_link[key][value]:
+                del map_link[key][value]
+            if not map_link[key]:
+                del map_link[key]
+        if self.set_id_node_cyclic:
+            self._rank_all()
+        else:
+            self._update_ranks(id_node_down)
+
+    # -------------------------------------------------------------------------
+    def _index_edge(self, cfg_edge):
+        """
+        Add an edge to the index without updating ranks.
+
+        """
+        id_edge = cfg_edge['id_edge']
+        self.map_cfg_edge[id_edge] = cfg_edge
+        for id_process in cfg_edge['list_id_process']:
+            self.map_id_edge_by_process[id_process][id_edge] = None
+        for id_node in (cfg_edge['id_node_src'], cfg_edge['id_node_dst']):
+            self.map_id_edge_by_node[id_node].add(id_edge)
+
+        link = _local_link(cfg_edge)
+        if link is not None:
+            (id_node_up, id_node_down) = link
+            for (map_link, key, value) in (
+                            (self.map_forward,  id_node_up,   id_node_down),
+                            (self.map_backward, id_node_down, id_node_up)):
+                map_link[key][value] = map_link[key].get(value, 0) + 1
+
+    # -------------------------------------------------------------------------
+    def _is_ranked(self, id_node):
+        """
+        Return true if the node is ordered by the local data flow graph.
+
+        """
+        is_linked = id_node in self.map_forward or id_node in self.map_backward
+        return is_linked and id_node not in self.set_id_node_cyclic
+
+    # -------------------------------------------------------------------------
+    def _rank_all(self):
+        """
+        Rank every node with a breadth first topological sort.
+
+        Any nodes left over are on, or downstream
+        of, a cycle.
+
+        """
+        map_indegree = dict()
+        ready        = collections.deque()
+        for id_node in self.map_rank:
+            self.map_rank[id_node] = 0
+            map_indegree[id_node]  = len(self.map_backward.get(id_node, ()))
+            if not map_indegree[id_node]:
+                ready.append(id_node)
+
+        while ready:
+            id_node   = ready.popleft()
+            rank_next = self.map_rank[id_node] + 1
+            for id_node_down in self.map_forward.get(id_node, ()):
+                if self.map_rank[id_node_down] < rank_next:
+                    self.map_rank[id_node_down] = rank_next
+                map_indegree[id_node_down] -= 1
+                if not map_indegree[id_node_down]:
+                    ready.append(id_node_down)
+
+        self.set_id_node_cyclic = set(
+                    id_node for (id_node, num) in map_indegree.items() if num)
+
+    # -------------------------------------------------------------------------
+    def _is_reachable(self, id_node_from, id_node_to):
+        """
+        Return true if id_node_to is downstream of id_node_from.
+
+        A path between the two can only pass
+        through nodes ranked below id_node_to,
+        so the search is bounded by its rank.
+
+        """
+        rank_to = self.map_rank[id_node_to]
+        if self.map_rank[id_node_from] > rank_to:
+            return False
+        set_seen = set((id_node_from,))
+        stack    = [id_node_from]
+        while stack:
+            id_node = stack.pop()
+            if id_node == id_node_to:
+                return True
+            for id_node_next in self.map_forward.get(id_node, ()):
+                if (id_node_next not in set_seen
+                        and self.map_rank[id_node_next] <= rank_to):
+                    set_seen.add(id_node_next)
+                    stack.append(id_node_next)
+        return False
+
+    # -------------------------------------------------------------------------
+    def _update_ranks(self, id_node_start):
+        """
+        Recompute the rank of id_node_start, and of any nodes downstream.
+
+        Nodes are visited in order of their old
+        rank, which is still a topological order
+        for the affected part of the graph, so
+        each node is recomputed only once, after
+        all of its upstream neighbors.
+
+        """
+        heap     = [(self.map_rank[id_node_start], id_node_start)]
+        set_done = set()
+        while heap:
+            (_, id_node) = heapq.heappop(heap)
+            if id_node in set_done:
+                continue
+            set_done.add(id_node)
+            rank = max((self.map_rank[id_node_up] + 1 for id_node_up
+                                in self.map_backward.get(id_node, ())),
+                       default = 0)
+            if rank == self.map_rank[id_node]:
+                continue
+            self.map_rank[id_node] = rank
+            for id_node_down in self.map_forward.get(id_node, ()):
+                heapq.heappush(heap, (self.map_rank[id_node_down],
+                                      id_node_down))
+
+
+# -----------------------------------------------------------------------------
+def _local_link(cfg_edge):
+    """
+    Return the (upstream, downstream) pair for an edge, or None if not local.
+
+    Only intra process edges constrain the run
+    order. Feedback edges are reversed, so that
+    the local data flow graph is acyclic.
+
+    """
+    if cfg_edge['ipc_type'] != 'intra_process':
+        return None
+    if cfg_edge['dirn'] == 'feedforward':
+        return (cfg_edge['id_node_src'], cfg_edge['id_node_dst'])
+    return (cfg_edge['id_node_dst'], cfg_edge['id_node_src'])
@@ -46,8 +46,10 @@ license:
 
 
 import collections
+import statistics
 
-import fl.util.alg
+
+NUM_SWEEP_DEFAULT = 4
 
 
 # -------------------------------------------------------------------------
@@ -59,14 +61,23 @@ def horizontal(map_cfg_denorm,
                node_size_x    = 400,
                node_size_y    = 250,
                node_margin_x  = 10,
-               node_margin_y  = 10):
+               node_margin_y  = 10,
+               layout         = None):
 
     """
-    """
+    Add the positions of nodes, swimlanes and edges to map_cfg_denorm.
+
+    Nodes are placed on a grid by a layered
+    layout. Pass the same LayeredLayout each
+    time the configuration is edited to move
+    only the nodes near each edit.
 
+    """
+    if layout is None:
+        layout = LayeredLayout()
     (map_idx_node,
      map_idx_proc,
-     count_tranche) = _abstract_grid(map_cfg_denorm = map_cfg_denorm)
+     count_tranche) = layout.update(map_cfg_denorm)
 
     for (id_node, (idx_u, idx_v)) in map_idx_node.items():
         map_cfg_denorm['node'][id_node]['idx_u'] = idx_u
@@ -144,39 +155,210 @@ def horizontal(map_cfg_denorm,
     return map_cfg_denorm
 
 
-# -------------------------------------------------------------------------
-def _abstract_grid(map_cfg_denorm):
+# =============================================================================
+class LayeredLayout():
     """
-    Lay out nodes, swimlanes and buses in an abstract grid.
-
-    Each grid unit corresponds to a single node.
+    Layered layout of a data flow graph, with a swimlane for each process.
+
+    Each node is placed in the layer given by
+    the longest path to it from a source, and
+    in the swimlane of its process. The order
+    of nodes within each layer of each lane is
+    chosen to reduce edge crossings, with
+    alternating downward and upward sweeps
+    that sort nodes by the barycenter (mean
+    position) of their neighbors.
+
+    The layout is kept between calls to update.
+    Only nodes near an edit are moved: those
+    that were added, that changed layer or
+    lane, or that are at either end of an edge
+    that was added or removed, along with their
+    immediate neighbors. Every other node keeps
+    its order within its layer and lane.
 
     """
-    list_tranche_global  = fl.util.alg.topological_sort(
-                                        *_acyclic_data_flow(
-                                                map_cfg_denorm['edge']))
-
-    list_id_process      = _sorted_process_list(
-                                        map_cfg_denorm,
-                                        list_tranche_global)
-
-    map_size_tranche_max = _max_tranche_size(
-                                        map_cfg_denorm,
-                                        list_tranche_global,
-                                        list_id_process)
 
-    map_idx_node         = _2d_node_indices(
-                                        map_cfg_denorm,
-                                        list_tranche_global,
-                                        map_size_tranche_max)
+    # -------------------------------------------------------------------------
+    def __init__(self, num_sweep = NUM_SWEEP_DEFAULT):
+        """
+        Return an empty LayeredLayout.
+
+        """
+        self.num_sweep      = num_sweep
+        self.map_cell       = dict()  # (id_process, idx_layer) -> [id_node]
+        self.map_layer      = dict()  # id_node -> idx_layer
+        self.map_id_process = dict()  # id_node -> id_process
+        self.set_link       = set()   # (id_node_up, id_node_down)
+
+    # -------------------------------------------------------------------------
+    def update(self, map_cfg_denorm):
+        """
+        Lay out the configuration, returning grid indices for nodes and lanes.
+
+        Returns a tuple of a map from id_node to
+        (idx_u, idx_v), a map from id_process to
+        (idx_u, size_u) and the number of layers.
+
+        """
+        map_cfg_node = map_cfg_denorm['node']
+        (map_forward,
+         map_backward)  = _acyclic_data_flow(map_cfg_denorm['edge'])
+        map_layer       = _layers(map_cfg_node, map_forward, map_backward)
+        count_layer     = max(map_layer.values(), default = -1) + 1
+        map_id_process  = dict((id_node, cfg_node['process'])
+                            for (id_node, cfg_node) in map_cfg_node.items())
+        set_link        = set((id_node_up, id_node_down)
+                                for (id_node_up, set_id_node_down)
+                                                    in map_forward.items()
+                                for id_node_down in set_id_node_down)
+
+        set_dirty = self._dirty(map_layer,
+                                map_id_process,
+                                set_link,
+                                map_forward,
+                                map_backward)
+        map_cell  = self._cells(map_layer, map_id_process, set_dirty)
+
+        list_id_process = _lane_order(map_cfg_denorm, map_cell, count_layer)
+        map_idx_proc    = dict()
+        idx_u           = 0
+        for id_process in list_id_process:
+            size_u = max((len(map_cell.get((id_process, idx_layer), ()))
+                                        for idx_layer in range(count_layer)),
+                         default = 0)
+            map_idx_proc[id_process] = (idx_u, size_u)
+            idx_u += size_u
+
+        map_u = self._sweep(map_cell,
+                            map_idx_proc,
+                            count_layer,
+                            set_dirty,
+                            map_forward,
+                            map_backward)
+
+        self.map_cell       = map_cell
+        self.map_layer      = map_layer
+        self.map_id_process = map_id_process
+        self.set_link       = set_link
+
+        map_idx_node = dict((id_node, (map_u[id_node], map_layer[id_node]))
+                                                    for id_node in map_layer)
+        return (map_idx_node, map_idx_proc, count_layer)
+
+    # -------------------------------------------------------------------------
+    def _dirty(self,
+               map_layer,
+               map_id_process,
+               set_link,
+               map_forward,
+               map_backward):
+        """
+        Return the set of nodes that may be moved by this update.
+
+        """
+        if not self.map_layer:
+            return set(map_layer)
+
+        set_changed = set(id_node for id_node in map_layer
+                            if (self.map_layer.get(id_node, None)
+                                                        != map_layer[id_node])
+                                or (self.map_id_process.get(id_node, None)
+                                                != map_id_process[id_node]))
+        for (id_node_up, id_node_down) in set_link ^ self.set_link:
+            set_changed.add(id_node_up)
+            set_changed.add(id_node_down)
+
+        set_dirty = set()
+        for id_node in set_changed:
+            if id_node not in map_layer:
+                continue
+            set_dirty.add(id_node)
+            set_dirty.update(map_forward.get(id_node, ()))
+            set_dirty.update(map_backward.get(id_node, ()))
+        return set_dirty
+
+    # -------------------------------------------------------------------------
+    def _cells(self, map_layer, map_id_process, set_dirty):
+        """
+        Return the initial node order for each layer of each lane.
+
+        Nodes that are not dirty keep their previous
+        order. Dirty nodes are added at the end, in
+        order of id, ready to be sorted into place.
+
+        """
+        map_cell = collections.defaultdict(list)
+        for (key, list_id_node) in self.map_cell.items():
+            for id_node in list_id_node:
+                if id_node in map_layer and id_node not in set_dirty:
+                    map_cell[key].append(id_node)
+        for id_node in sorted(set_dirty):
+            key = (map_id_process[id_node], map_layer[id_node])
+            map_cell[key].append(id_node)
+        return dict(map_cell)
+
+    # -------------------------------------------------------------------------
+    def _sweep(self,
+               map_cell,
+               map_idx_proc,
+               count_layer,
+               set_dirty,
+               map_forward,
+               map_backward):
+        """
+        Order dirty nodes by barycenter and return a map of node positions.
+
+        Positions are indices across all lanes.
+        Nodes that are not dirty are sorted by
+        their current position, so they keep
+        their order relative to each other.
+
+        """
+        map_u = dict()
+        for ((id_process, _), list_id_node) in map_cell.items():
+            idx_u_lane = map_idx_proc[id_process][0]
+            for (idx, id_node) in enumerate(list_id_node):
+                map_u[id_node] = idx_u_lane + idx
+
+        map_list_key = collections.defaultdict(list)
+        for key in map_cell:
+            if any(id_node in set_dirty for id_node in map_cell[key]):
+                map_list_key[key[1]].append(key)
+
+        range_down = range(count_layer)
+        range_up   = range(count_layer - 1, -1, -1)
+        for _ in range(self.num_sweep):
+            for (range_layer, map_adjacent) in ((range_down, map_backward),
+                                                (range_up,   map_forward)):
+                for idx_layer in range_layer:
+                    for key in map_list_key.get(idx_layer, ()):
+                        _sort_cell(map_cell[key],
+                                   map_idx_proc[key[0]][0],
+                                   map_u,
+                                   set_dirty,
+                                   map_adjacent)
+        return map_u
 
-    map_idx_proc         = _2d_process_indices(
-                                        list_id_process,
-                                        map_size_tranche_max)
 
-    count_tranche        = len(list_tranche_global)
+# -----------------------------------------------------------------------------
+def _sort_cell(list_id_node, idx_u_lane, map_u, set_dirty, map_adjacent):
+    """
+    Sort one layer of one lane in place by barycenter, updating map_u.
 
-    return (map_idx_node, map_idx_proc, count_tranche)
+    """
+    map_key = dict()
+    for id_node in list_id_node:
+        set_id_node_adjacent = map_adjacent.get(id_node, ())
+        if id_node in set_dirty and set_id_node_adjacent:
+            map_key[id_node] = statistics.fmean(
+                        map_u[id_node_adj] for id_node_adj
+                                                    in set_id_node_adjacent)
+        else:
+            map_key[id_node] = map_u[id_node]
+    list_id_node.sort(key = lambda id_node: (map_key[id_node], map_u[id_node]))
+    for (idx, id_node) in enumerate(list_id_node):
+        map_u[id_node] = idx_u_lane + idx
 
 
 # -----------------------------------------------------------------------------
@@ -224,154 +406,69 @@ def _acyclic_data_flow(iter_cfg_edge, id_process = None):
 
 
 # -----------------------------------------------------------------------------
-def _sorted_process_list(map_cfg_denorm, list_tranche_global):
-    """
-    Return a sorted list of process ids.
-
-    This is intended to be a 'sensible' ordering
-    of processes that can be used to arrange
-    process-specific swimlanes in a SysML or
-    UML activity diagram.
-
-    The returned list of process ids is sorted
-    by the index of the first tranche that they
-    are involved in processing, then by id_host
-    lexicographic order and finally by id_proc
-    lexicographic order.
-
-    This means that if the system is overall
-    arranged as a pipeline, the swimlanes will
-    be sorted in pipeline order, but if it is
-    overall arranged as parallel pipelines, then
-    the swimlanes will be sorted lexicographically
-    by host id and then by process id, giving
-    the developer some control over ordering by
-    choosing appropirately sortable host and
-    process ids.
-
-    """
-    # First we get the minimum tranche index
-    # for each process (map_idx_tranche_min).
-    #
-    map_node            = map_cfg_denorm['node']
-    map_process         = map_cfg_denorm['process']
-    max_idx_tranche     = len(list_tranche_global)
-    map_idx_tranche_min = collections.defaultdict(lambda: max_idx_tranche)
-    for (idx_tranche, set_id_node) in enumerate(list_tranche_global):
-        for id_node in sorted(set_id_node):
-            id_process = map_node[id_node]['process']
-            map_idx_tranche_min[id_process] = min(
-                                idx_tranche, map_idx_tranche_min[id_process])
-
-    # Then we build up a list of tuples containing
-    # the keys that we want to sort by, and use
-    # it to build a list of process id strings in
-    # sorted order. (list_id_process)
-    #
-    list_tup_key    = list()
-    list_id_process = list()
-    for (id_process, idx_tranche_min) in map_idx_tranche_min.items():
-        id_host = map_process[id_process]['host']
-        tup_key = (idx_tranche_min, id_host, id_process)
-        list_tup_key.append(tup_key)
-    for tup_key in sorted(list_tup_key):
-        id_process = tup_key[-1]
-        list_id_process.append(id_process)
-
-    return list_id_process
-
-
-# -----------------------------------------------------------------------------
-def _max_tranche_size(map_cfg_denorm, list_tranche_global, list_id_process):
+def _layers(map_cfg_node, map_forward, map_backward):
     """
-    Return a map from process id to the maximum tranche size for the process.
+    Return a map from id_node to the length of the longest path to it.
 
-    This information is needed to size per process
-    swimlanes correctly.
+    Nodes on a cycle cannot be placed this way,
+    so they are placed one layer after the
+    furthest of their upstream neighbors that
+    has already been placed.
 
     """
-    # Work out how many nodes are in each
-    # tranche, broken down by process.
-    #
-    map_node              = map_cfg_denorm['node']
-    count_tranche_global  = len(list_tranche_global)
-    map_list_size_tranche = dict()
-    for id_process in list_id_process:
-        map_list_size_tranche[id_process] = [0] * count_tranche_global
-    for (idx_tranche, set_id_node) in enumerate(list_tranche_global):
-        for id_node in set_id_node:
-            id_process = map_node[id_node]['process']
-            map_list_size_tranche[id_process][idx_tranche] += 1
-
-    # Work out the maximum tranche size for
-    # each process, as this drives how 'wide'
-    # the per-process swimlane will need to be.
-    #
-    map_size_tranche_max = dict()
-    for id_process in list_id_process:
-        map_size_tranche_max[id_process] = max(map_list_size_tranche[id_process])
-    return map_size_tranche_max
+    map_layer    = dict()
+    map_indegree = dict()
+    ready        = collections.deque()
+    for id_node in sorted(map_cfg_node):
+        map_layer[id_node]    = 0
+        map_indegree[id_node] = len(map_backward.get(id_node, ()))
+        if not map_indegree[id_node]:
+            ready.append(id_node)
+
+    set_placed = set()
+    while ready:
+        id_node = ready.popleft()
+        set_placed.add(id_node)
+        for id_node_down in map_forward.get(id_node, ()):
+            map_layer[id_node_down] = max(map_layer[id_node_down],
+                                          map_layer[id_node] + 1)
+            map_indegree[id_node_down] -= 1
+            if not map_indegree[id_node_down]:
+                ready.append(id_node_down)
+
+    for id_node in sorted(set(map_layer) - set_placed):
+        map_layer[id_node] = max((map_layer[id_node_up] + 1
+                                    for id_node_up in map_backward[id_node]
+                                                if id_node_up in set_placed),
+                                 default = 0)
+        set_placed.add(id_node)
+
+    return map_layer
 
 
 # -----------------------------------------------------------------------------
-def _2d_node_indices(map_cfg_denorm, list_tranche_global, map_size_tranche_max):
-    """
-    Return a map of two dimensional indices, one for each node in the graph.
-
+def _lane_order(map_cfg_denorm, map_cell, count_layer):
     """
-    # Grid positioning transverse to
-    # swimlane direction. u is the "x"
-    # axis with vertical swimlanes, y
-    # axis with horizontal swimlanes.
-    #
-    idx_u                 = 0
-    map_idx_u_min_process = dict()
-    for (id_process, size_tranche_max) in map_size_tranche_max.items():
-        map_idx_u_min_process[id_process] = idx_u
-        idx_u += size_tranche_max
-
-    # x and y grid position for each node.
-    #
-    map_node     = map_cfg_denorm['node']
-    map_idx_node = dict()
-    for (idx_tranche, set_id_node) in enumerate(list_tranche_global):
-        for (idx_node, id_node) in enumerate(sorted(set_id_node)):
-            id_process            = map_node[id_node]['process']
-            idx_u_min_process     = map_idx_u_min_process[id_process]
-            idx_u_node            = idx_u_min_process + idx_node
-            idx_v_node            = idx_tranche
-            map_idx_node[id_node] = (idx_u_node, idx_v_node)
-
-    # Sort by tranche and then by
-    # position within the tranche.
-    #
-    map_idx_node = dict(sorted(map_idx_node.items(),
-                               key = lambda item: (item[1], item[0])))
-
-    return map_idx_node
-
-
-# -----------------------------------------------------------------------------
-def _2d_process_indices(list_id_process, map_size_tranche_max):
-    """
-    Return a map of tuples holding the start index and width of each process.
-
-    This fundtion returns a map from id_process
-    to a length two tuple describing the size
-    of the corresponding process swimlane.
-
-    The first element of the tuple is the start
-    index (in abstract grid units).
-
-    The second element of the tuple is the length
-    of the swimlane (in abstract grid units).
+    Return a sorted list of process ids, one for each swimlane.
+
+    Lanes are sorted by the first layer that
+    they have a node in, then by id_host and
+    finally by id_process. If the system is
+    arranged as a pipeline, the lanes will be
+    in pipeline order, but if it is arranged as
+    parallel pipelines, the developer can order
+    the lanes by choosing sortable host and
+    process ids.
 
     """
-    map_idx_proc = dict()
-    idx_u        = 0
-    for id_proc in list_id_process:
-        size_u = map_size_tranche_max[id_proc]
-        map_idx_proc[id_proc] = (idx_u, size_u)
-        idx_u  += size_u
-
-    return map_idx_proc
\ No newline at end of file
+    map_idx_layer_min = dict((id_process, count_layer)
+                                for id_process in map_cfg_denorm['process'])
+    for ((id_process, idx_layer), list_id_node) in map_cell.items():
+        if list_id_node:
+            map_idx_layer_min[id_process] = min(
+                                idx_layer, map_idx_layer_min[id_process])
+    return sorted(map_idx_layer_min,
+                  key = lambda id_process: (
+                        map_idx_layer_min[id_process],
+                        map_cfg_denorm['process'][id_process].get('host', ''),
+                        id_process))
@@ -10,17 +10,50 @@ name_extension:
     fl.stableflow.cfg.load
 ...
 
+The files in a configuration directory are
+read and parsed in parallel, on a pool of
+threads, and then merged in order.
+
+Parsed files can be cached on disk, in the
+directory named by the STABLEFLOW_CFG_CACHE
+environment variable, keyed by the path of
+the file and the version of the cache format.
+Caching is off unless that variable is set.
+A cache entry is used if the modification
+time and size of the file are unchanged, or
+failing that, if the hash of the file content
+is unchanged, so files are not re-parsed
+between invocations unless they have been
+edited.
+
+Cache entries are pickled, so the cache is
+only read or written if the directory is
+owned by the current user and is not
+accessible to anyone else.
+
 """
 
 
+import concurrent.futures
+import functools
 import glob
+import hashlib
+import io
+import os
 import os.path
+import pickle
+import tempfile
 
 import fl.stableflow.cfg.util
 
 from fl.stableflow.cfg.exception import CfgError
 
 
+NUM_WORKERS_MAX       = 8
+CACHE_FORMAT          = 'stableflow-cfg-cache-v1'
+DIRPATH_CACHE_DEFAULT = os.environ.get('STABLEFLOW_CFG_CACHE', None) or None
+
+
 # -----------------------------------------------------------------------------
 def from_path(path_cfg):
     """
@@ -41,7 +74,7 @@ def from_path(path_cfg):
 
 
 # -----------------------------------------------------------------------------
-def from_dirpath(dirpath_cfg):
+def from_dirpath(dirpath_cfg, dirpath_cache = DIRPATH_CACHE_DEFAULT):
     """
     Return configuration loaded from the specified directory path.
 
@@ -62,6 +95,9 @@ def from_dirpath(dirpath_cfg):
     on in the process, from files which are
     broader in scope and less specific.
 
+    Parsed files are cached in dirpath_cache,
+    unless it is None.
+
     """
     suffix        = '.cfg.*'
     glob_expr     = dirpath_cfg + os.sep + '*' + suffix
@@ -79,20 +115,147 @@ def from_dirpath(dirpath_cfg):
             sort_key = len(section_address)
         list_fileinfo.append((sort_key, filepath_cfg, section_address))
 
+    list_fileinfo = sorted(list_fileinfo)
+    list_cfg_file = _load_all(
+                        list_filepath = [filepath_cfg for (_, filepath_cfg, _)
+                                                        in list_fileinfo],
+                        dirpath_cache = dirpath_cache)
+
     cfg = dict()
-    for (_, filepath_cfg, section_address) in sorted(list_fileinfo):
+    for ((_, _, section_address), cfg_file) in zip(list_fileinfo,
+                                                   list_cfg_file):
         cfg = fl.stableflow.cfg.util.apply(cfg,
                                   section_address,
-                                  from_filepath(filepath_cfg),
+                                  cfg_file,
                                   delim_cfg_addr = '.')
     return cfg
 
 
 # -----------------------------------------------------------------------------
-def from_filepath(filepath_cfg):
+def _load_all(list_filepath, dirpath_cache):
+    """
+    Return a list of the configuration loaded from each file, in order.
+
+    """
+    load = functools.partial(_load_cached, dirpath_cache = dirpath_cache)
+    if len(list_filepath) < 2:
+        return [load(filepath_cfg) for filepath_cfg in list_filepath]
+    num_workers = min(len(list_filepath), os.cpu_count() or 1, NUM_WORKERS_MAX)
+    with concurrent.futures.ThreadPoolExecutor(num_workers) as executor:
+        return list(executor.map(load, list_filepath))
+
+
+# -----------------------------------------------------------------------------
+def _load_cached(filepath_cfg, dirpath_cache):
+    """
+    Return configuration loaded from the file, or from the cache if unchanged.
+
+    """
+    if dirpath_cache is None:
+        return from_filepath(filepath_cfg)
+
+    stat          = os.stat(filepath_cfg)
+    key           = '{format}:{path}'.format(
+                                    format = CACHE_FORMAT,
+                                    path   = os.path.abspath(filepath_cfg))
+    filepath_item = os.path.join(dirpath_cache, hashlib.blake2b(
+                                    key.encode('utf-8'),
+                                    digest_size = 16).hexdigest() + '.pickle')
+    entry         = _read_cache_entry(filepath_item)
+    if entry is not None and entry['stat'] == (stat.st_mtime_ns,
+                                               stat.st_size):
+        return entry['cfg']
+
+    with open(filepath_cfg, 'rb') as file_cfg:
+        bytes_cfg = file_cfg.read()
+    digest = hashlib.blake2b(bytes_cfg).hexdigest()
+    if entry is not None and entry['digest'] == digest:
+        cfg = entry['cfg']
+    else:
+        cfg = from_filepath(filepath_cfg, bytes_cfg = bytes_cfg)
+
+    _write_cache_entry(filepath_item, {
+                        'stat':   (stat.st_mtime_ns, stat.st_size),
+                        'digest': digest,
+                        'cfg':    cfg})
+    return cfg
+
+
+# -----------------------------------------------------------------------------
+def _read_cache_entry(filepath_item):
+    """
+    Return the specified cache entry, or None if it is missing or unreadable.
+
+    Entries are only unpickled from a private
+    directory, and only if they are owned by
+    the current user.
+
+    """
+    if not _is_private(os.path.dirname(filepath_item)):
+        return None
+    try:
+        with open(filepath_item, 'rb') as file_item:
+            if not _is_private(file_item.fileno()):
+                return None
+            entry = pickle.load(file_item)
+    except Exception:  # pylint: disable=W0703
+        return None
+    if not isinstance(entry, dict) or entry.get('format') != CACHE_FORMAT:
+        return None
+    return entry
+
+
+# -----------------------------------------------------------------------------
+def _write_cache_entry(filepath_item, entry):
+    """
+    Atomically write the specified cache entry, ignoring any errors.
+
+    Nothing is written unless the cache
+    directory is private to the current user,
+    as entries are pickled. An existing
+    directory is not made private, as its
+    contents may already have been tampered
+    with.
+
+    """
+    dirpath_cache = os.path.dirname(filepath_item)
+    try:
+        os.makedirs(dirpath_cache, mode = 0o700, exist_ok = True)
+        if not _is_private(dirpath_cache):
+            return
+        (fd, filepath_tmp) = tempfile.mkstemp(dir = dirpath_cache)
+        with os.fdopen(fd, 'wb') as file_tmp:
+            pickle.dump(dict(entry, format = CACHE_FORMAT),
+                        file_tmp,
+                        protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(filepath_tmp, filepath_item)
+    except Exception:  # pylint: disable=W0703
+        pass
+
+
+# -----------------------------------------------------------------------------
+def _is_private(path_or_fd):
+    """
+    Return true if the file is owned by, and only accessible to, this user.
+
+    """
+    if not hasattr(os, 'getuid'):
+        return False
+    try:
+        stat = os.stat(path_or_fd)
+    except OSError:
+        return False
+    return stat.st_uid == os.getuid() and (stat.st_mode & 0o077) == 0
+
+
+# -----------------------------------------------------------------------------
+def from_filepath(filepath_cfg, bytes_cfg = None):
     """
     Return confiuguration data loaded from the specified file path.
 
+    If the content of the file has already
+    been read, it can be passed in bytes_cfg.
+
     """
     map_reader = {
         '.xml':  _from_xml_file,
@@ -101,9 +264,13 @@ def from_filepath(filepath_cfg):
         '.toml': _from_toml_file,
     }
     for (str_ext, fcn_reader) in map_reader.items():
-        if filepath_cfg.endswith(str_ext):
-            with open(filepath_cfg) as file_cfg:
-                return fcn_reader(filepath_cfg, file_cfg)
+        if not filepath_cfg.endswith(str_ext):
+            continue
+        if bytes_cfg is not None:
+            return fcn_reader(filepath_cfg,
+                              io.TextIOWrapper(io.BytesIO(bytes_cfg)))
+        with open(filepath_cfg) as file_cfg:
+            return fcn_reader(filepath_cfg, file_cfg)
     raise CfgError('Did not recognize filename extension.')
 
 
@@ -152,13 +319,9 @@ def from_yaml_string(str_yaml, filepath_cfg = 'memory'):
     Return confiuguration data loaded from the specified YAML format string.
 
     """
+    import yaml  # pylint: disable=C0415
     try:
-        import yaml  # pylint: disable=C0415
-        loader = yaml.SafeLoader
-        yaml.add_constructor('!regex',
-                             lambda l, n: str(n.value),
-                             Loader = loader)
-        return yaml.load(str_yaml, Loader = loader)
+        return yaml.load(str_yaml, Loader = _yaml_loader())
     except yaml.YAMLError as err:
         if hasattr(err, 'problem_mark'):
             mark = err.problem_mark
@@ -173,6 +336,25 @@ def from_yaml_string(str_yaml, filepath_cfg = 'memory'):
                                                         msg  = str(err)))
 
 
+# -----------------------------------------------------------------------------
+@functools.lru_cache(maxsize = None)
+def _yaml_loader():
+    """
+    Return the YAML loader class for config files, creating it on first use.
+
+    The libyaml based loader is used if it is
+    available, as it is much faster than the
+    pure python loader.
+
+    """
+    import yaml  # pylint: disable=C0415
+    loader = type('CfgLoader',
+                  (getattr(yaml, 'CSafeLoader', yaml.SafeLoader),),
+                  dict())
+    loader.add_constructor('!regex', lambda l, n: str(n.value))
+    return loader
+
+
 # -----------------------------------------------------------------------------
 def _from_toml_file(filepath_cfg, file_cfg):  # pylint: disable=W0613
     """
@@ -11,7 +11,11 @@ import fl.stableflow.cfg.util
 # -----------------------------------------------------------------------------
 def apply(cfg, tup_overrides = None, delim_cfg_addr = '.'):
     """
-    Apply all specified configuration field overrides.
+    Return cfg with all specified configuration field overrides applied.
+
+    The original cfg is left unchanged. Only
+    the dicts along each overridden path are
+    copied, and all other subtrees are shared.
 
     """
     if tup_overrides is None:
@@ -19,7 +23,7 @@ def apply(cfg, tup_overrides = None, delim_cfg_addr = '.'):
 
     for (address, value) in zip(tup_overrides[::2], tup_overrides[1::2]):
         try:
-            cfg = fl.stableflow.cfg.util.apply(
+            cfg = fl.stableflow.cfg.util.apply_shared(
                                             data           = cfg,
                                             address        = address,
                                             value          = value,
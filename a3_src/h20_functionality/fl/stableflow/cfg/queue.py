@@ -13,6 +13,7 @@ def denormalize(cfg):
     """
     if 'queue' not in cfg:
         cfg['queue'] = dict()
+        cfg['queue']['inter_thread']      = 'pl.stableflow.queue.spsc'
         cfg['queue']['inter_process']     = 'pl.stableflow.queue.multiprocessing'
         cfg['queue']['inter_host_server'] = 'pl.stableflow.queue.zmq_server'
         cfg['queue']['inter_host_client'] = 'pl.stableflow.queue.zmq_client'
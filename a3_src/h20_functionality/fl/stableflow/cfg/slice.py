@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Module of functions for slicing a configuration down to a single process.
+
+A child process only needs its own nodes, the
+edges that touch it, the data types that those
+nodes and edges use, and the hosts and processes
+at either end of those edges. The process host
+gives each child just that slice, so that the
+time taken to hand a configuration to a child,
+and the memory that it holds, depend on the
+size of the process rather than the size of
+the whole system.
+
+Nodes at the far end of an inter-process or
+inter-host edge are kept, so that a stalled
+input can still be attributed to its peer.
+
+All other sections (system, queue, etc.) are
+shared with the full configuration, except for
+the runtime section, which is copied so that
+the slice can carry its own graph index.
+
+"""
+
+
+import fl.stableflow.cfg.graph
+
+
+SECTIONS_SLICED = ('host', 'process', 'node', 'edge', 'data', 'runtime')
+
+
+# -----------------------------------------------------------------------------
+def for_process(cfg, id_process, graph = None):
+    """
+    Return a slice of a denormalized config with what one process needs.
+
+    graph is a GraphIndex of the full config. If
+    it is not given, one is taken from the runtime
+    section, or built if there is none there.
+
+    """
+    if graph is None:
+        graph = cfg.get('runtime', dict()).get('proc', dict()).get('graph')
+    if graph is None:
+        graph = fl.stableflow.cfg.graph.GraphIndex.from_cfg(cfg)
+
+    list_cfg_edge = graph.list_cfg_edge(id_process)
+    set_id_node   = set(graph.map_id_node_by_process.get(id_process, ()))
+    set_id_host   = {cfg['process'][id_process]['host']}
+    set_id_type   = set()
+    for cfg_edge in list_cfg_edge:
+        set_id_node.update((cfg_edge['id_node_src'], cfg_edge['id_node_dst']))
+        set_id_host.update(cfg_edge['list_id_host'])
+        set_id_type.add(cfg_edge['data'])
+
+    map_cfg_node = _subset(cfg['node'], set_id_node)
+    for cfg_node in map_cfg_node.values():
+        if cfg_node['process'] == id_process:
+            set_id_type.add(cfg_node.get('state_type', None))
+    set_id_process = set(cfg_node['process']
+                                    for cfg_node in map_cfg_node.values())
+    set_id_process.add(id_process)
+
+    cfg_slice = dict((key, value) for (key, value) in cfg.items()
+                                            if key not in SECTIONS_SLICED)
+    cfg_slice['host']    = _subset(cfg['host'],    set_id_host)
+    cfg_slice['process'] = _subset(cfg['process'], set_id_process)
+    cfg_slice['node']    = map_cfg_node
+    cfg_slice['edge']    = list_cfg_edge
+    cfg_slice['data']    = _subset(cfg['data'],    set_id_type)
+
+    if 'runtime' in cfg:
+        runtime         = dict(cfg['runtime'])
+        runtime['id']   = dict(runtime.get('id', dict()))
+        runtime['proc'] = dict(runtime.get('proc', dict()))
+        runtime['proc']['graph'] = (
+                        fl.stableflow.cfg.graph.GraphIndex.from_cfg(cfg_slice))
+        cfg_slice['runtime'] = runtime
+
+    return cfg_slice
+
+
+# -----------------------------------------------------------------------------
+def _subset(map_section, set_id):
+    """
+    Return the entries of a config section whose ids are in set_id.
+
+    """
+    list_id = sorted(id_entity for id_entity in set_id
+                                        if id_entity in map_section)
+    return dict((id_entity, map_section[id_entity]) for id_entity in list_id)
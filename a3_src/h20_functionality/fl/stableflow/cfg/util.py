@@ -23,6 +23,85 @@ def apply(data, address, value, delim_cfg_addr = '.'):
     return data
 
 
+# -----------------------------------------------------------------------------
+def apply_shared(data, address, value, delim_cfg_addr = '.'):
+    """
+    Return a copy of data with a single configuration field overridden.
+
+    Only the dicts along the overridden path
+    are copied. Every other subtree is shared
+    by reference with the original, which is
+    left unchanged, so many variants of one
+    configuration cost memory in proportion
+    to their differences.
+
+    """
+    addr_parts = address.split(delim_cfg_addr)
+    root       = dict(data)
+    subtree    = root
+
+    for key in addr_parts[:-1]:
+        subtree[key] = dict(subtree.get(key, ()))
+        subtree      = subtree[key]
+    key = addr_parts[-1]
+    subtree[key] = value
+    return root
+
+
+# -----------------------------------------------------------------------------
+def freeze(data):
+    """
+    Return a read-only copy of data, sharing any parts already frozen.
+
+    Dicts become FrozenDict and lists become
+    tuples. Frozen subtrees can be shared safely
+    between configurations, and are copied only
+    along the path of any later override.
+
+    """
+    if isinstance(data, FrozenDict):
+        return data
+    if isinstance(data, dict):
+        return FrozenDict((key, freeze(value))
+                                        for (key, value) in data.items())
+    if isinstance(data, (list, tuple)):
+        return tuple(freeze(item) for item in data)
+    return data
+
+
+# =============================================================================
+class FrozenDict(dict):
+    """
+    A dict that raises a TypeError on any attempt to modify it.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def _raise_read_only(self, *args, **kwargs):
+        """
+        Raise a TypeError, as the dict is read-only.
+
+        """
+        raise TypeError('Frozen configuration cannot be modified.')
+
+    __setitem__ = _raise_read_only
+    __delitem__ = _raise_read_only
+    __ior__     = _raise_read_only
+    clear       = _raise_read_only
+    pop         = _raise_read_only
+    popitem     = _raise_read_only
+    setdefault  = _raise_read_only
+    update      = _raise_read_only
+
+    # -------------------------------------------------------------------------
+    def __reduce__(self):
+        """
+        Support pickling and copying without calling __setitem__.
+
+        """
+        return (type(self), (dict(self),))
+
+
 # =============================================================================
 class SubstitutionTable():  # pylint: disable=R0903
     """
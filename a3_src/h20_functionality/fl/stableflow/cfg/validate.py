@@ -2,16 +2,38 @@
 """
 Module of functions for validating configuration data.
 
+Schema validators are built and checked once,
+on first use, and then reused for every
+config that is validated. Local references to
+schema definitions are inlined when the
+validator is built, so that they are not
+resolved again for every node and edge.
+
+Where successive versions of a config are
+validated, an IncrementalValidator can be
+used instead, which only re-validates those
+entries (hosts, nodes, edges, etc.) whose
+content has changed since the last version
+that it validated successfully.
+
 """
 
 
+import collections
 import copy
+import functools
+import hashlib
+import json
+
 import jsonschema
 
 import fl.stableflow.cfg.exception
 import pl.stableflow.log
 
 
+_PREFIX_DEFINITION = '#/definitions/'
+
+
 # -----------------------------------------------------------------------------
 def normalized(cfg):
     """
@@ -21,7 +43,7 @@ def normalized(cfg):
     any denormalization and/or expansion.
 
     """
-    return _validate_with_schema(cfg, _normalized_cfg_schema())
+    return _validate_with_schema(cfg, _validator('normalized'))
 
 
 # -----------------------------------------------------------------------------
@@ -33,24 +55,189 @@ def denormalized(cfg):
     to make implicit information explicit.
 
     """
-    return _validate_with_schema(cfg, _denormalized_cfg_schema())
+    return _validate_with_schema(cfg, _validator('denormalized'))
+
+
+# =============================================================================
+class IncrementalValidator():
+    """
+    Validator for successive versions of a config.
+
+    Each top level section is split into
+    entries (the values of mapping sections
+    and the items of list sections), and a
+    digest of each entry that passes
+    validation is remembered. On the next
+    call, only entries with an unseen digest
+    are validated against their schema. The
+    structure of each section, and the cross
+    references between sections, are always
+    checked in full.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, kind = 'normalized'):
+        """
+        Return an IncrementalValidator for 'normalized' or 'denormalized' cfg.
+
+        """
+        validator       = _validator(kind)
+        schema          = validator.schema
+        self._list_unit = [(None, None, validator.evolve(schema = dict(
+                                schema,
+                                properties = dict.fromkeys(
+                                            schema['properties'], True))))]
+        for (name, schema_section) in schema['properties'].items():
+            self._list_unit.append(_unit(validator, name, schema_section))
+        self._set_digest = set()
+
+    # -------------------------------------------------------------------------
+    def validate(self, cfg):
+        """
+        Validate cfg, skipping entries unchanged since the last call.
+
+        """
+        set_digest = set()
+        for (name, key_entry, validator) in self._list_unit:
+            if name is None:
+                _raise_on_error(validator.iter_errors(cfg))
+                continue
+            if name not in cfg:
+                continue
+            section = cfg[name]
+            if key_entry is None:
+                iter_entry = (section,)
+            else:
+                _raise_on_error(validator[0].iter_errors(section))
+                iter_entry = _iter_entry(section, key_entry)
+                validator  = validator[1]
+            for entry in iter_entry:
+                digest = _digest((name, entry))
+                if digest not in self._set_digest:
+                    _raise_on_error(validator.iter_errors(entry))
+                set_digest.add(digest)
+
+        self._set_digest = set_digest
+        _check_consistency(cfg)
+        return cfg
 
 
 # -----------------------------------------------------------------------------
-def _validate_with_schema(cfg, schema):
+def _unit(validator, name, schema_section):
     """
-    Validate config using the specified schema.
+    Return a (name, key_entry, validator) tuple for one top level section.
+
+    For sections made of entries, key_entry
+    names the schema keyword for the entries,
+    and the validator is a pair: one for the
+    section without its entries, and one for
+    each entry.
 
     """
-    try:
-        jsonschema.validate(cfg, schema)
-    except jsonschema.exceptions.ValidationError as err:
-        msg = '\n\n{msg}\n\n'.format(msg = str(err))
-        raise fl.stableflow.cfg.exception.CfgError(msg)
+    for key_entry in ('additionalProperties', 'items'):
+        schema_entry = schema_section.get(key_entry, None)
+        if isinstance(schema_entry, dict):
+            schema_shell = dict(schema_section)
+            del schema_shell[key_entry]
+            return (name, key_entry, (validator.evolve(schema = schema_shell),
+                                      validator.evolve(schema = schema_entry)))
+    return (name, None, validator.evolve(schema = schema_section))
+
+
+# -----------------------------------------------------------------------------
+def _iter_entry(section, key_entry):
+    """
+    Return an iterable of the entries in the specified section.
+
+    Entries are validated independently of
+    their key or position, so entries that
+    are renamed or reordered are not
+    revalidated.
+
+    """
+    if key_entry == 'items' and isinstance(section, list):
+        return section
+    if key_entry == 'additionalProperties' and isinstance(section, dict):
+        return section.values()
+    return ()
+
+
+# -----------------------------------------------------------------------------
+def _digest(data):
+    """
+    Return a digest of the specified json-like data.
+
+    """
+    text = json.dumps(data, sort_keys = True, default = repr)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size = 16).digest()
+
+
+# -----------------------------------------------------------------------------
+def _validate_with_schema(cfg, validator):
+    """
+    Validate config using the specified validator.
+
+    """
+    _raise_on_error(validator.iter_errors(cfg))
     _check_consistency(cfg)
     return cfg
 
 
+# -----------------------------------------------------------------------------
+def _raise_on_error(iter_error):
+    """
+    Raise a CfgError for the most relevant of the specified errors, if any.
+
+    """
+    err = jsonschema.exceptions.best_match(iter_error)
+    if err is not None:
+        msg = '\n\n{msg}\n\n'.format(msg = str(err))
+        raise fl.stableflow.cfg.exception.CfgError(msg)
+
+
+# -----------------------------------------------------------------------------
+@functools.lru_cache(maxsize = None)
+def _validator(kind):
+    """
+    Return a validator for the 'normalized' or 'denormalized' cfg schema.
+
+    The schema is built, checked and has its
+    references inlined on the first call only.
+
+    """
+    if kind == 'normalized':
+        schema = _normalized_cfg_schema()
+    elif kind == 'denormalized':
+        schema = _denormalized_cfg_schema()
+    else:
+        raise ValueError('Unknown schema kind: {kind}'.format(kind = kind))
+    cls_validator = jsonschema.validators.validator_for(schema)
+    cls_validator.check_schema(schema)
+    return cls_validator(_inline_refs(schema, schema['definitions']))
+
+
+# -----------------------------------------------------------------------------
+def _inline_refs(schema, map_definition):
+    """
+    Return a copy of schema with each local definition reference inlined.
+
+    Keywords alongside a reference are
+    dropped, as draft 7 ignores them.
+
+    """
+    if isinstance(schema, dict):
+        ref = schema.get('$ref', None)
+        if isinstance(ref, str) and ref.startswith(_PREFIX_DEFINITION):
+            return _inline_refs(map_definition[ref[len(_PREFIX_DEFINITION):]],
+                                map_definition)
+        return dict((key, _inline_refs(value, map_definition))
+                                            for (key, value) in schema.items())
+    if isinstance(schema, list):
+        return [_inline_refs(value, map_definition) for value in schema]
+    return schema
+
+
 # -----------------------------------------------------------------------------
 def _normalized_cfg_schema():
     """
@@ -77,6 +264,38 @@ def _normalized_cfg_schema():
                                      'pattern': '^[a-z0-9_./:]*$'    },
             'edge_direction':      { 'type':    'string',
                                      'pattern': '^feedforward|feedback$'    },
+            'activation':          { 'oneOf': [
+                                        { 'enum': [ 'always', 'on_input' ] },
+                                        { 'type':  'array',
+                                          'items': { 'type': 'string' } } ] },
+            'checkpoint':          {
+                'type': 'object',
+                'properties': {
+                    'interval':      { 'type': 'integer', 'minimum': 1 },
+                    'do_skip_reset': { 'type': 'boolean'               } },
+                'required': [ 'interval' ],
+                'additionalProperties': False },
+            'memoize':             {
+                'type': 'object',
+                'properties': {
+                    'size':    { 'type': 'integer', 'minimum': 1 },
+                    'exclude': { 'type': 'array',
+                                 'items': { 'type': 'string' } } },
+                'required': [ 'size' ],
+                'additionalProperties': False },
+            'batch':               {
+                'type': 'object',
+                'properties': {
+                    'ticks':          { 'type': 'integer', 'minimum': 1 },
+                    'max_delay_secs': { 'type': 'number',  'minimum': 0 } },
+                'additionalProperties': False },
+            'compress':            {
+                'type': 'object',
+                'properties': {
+                    'codec':     { 'enum': [ 'zlib', 'lz4', 'zstd' ] },
+                    'level':     { 'type': 'integer'                 },
+                    'min_bytes': { 'type': 'integer', 'minimum': 0   } },
+                'additionalProperties': False },
             'path_cfg':        { 'type': 'string'                           },
             'id_path':         { '$ref': '#/definitions/hex_string'         },
             'id_system':       { '$ref': '#/definitions/lowercase_name'     },
@@ -127,7 +346,8 @@ def _normalized_cfg_schema():
             'system': {
                 'type': 'object',
                 'properties': {
-                    'id_system': { '$ref': '#/definitions/id_system' } },
+                    'id_system': { '$ref': '#/definitions/id_system' },
+                    'num_batch': { 'type': 'integer', 'minimum': 1   } },
                 'required': [ 'id_system' ],
                 'additionalProperties': False
             },
@@ -146,6 +366,12 @@ def _normalized_cfg_schema():
                         'environment':     { 'type': 'string' },
                         'launch_cmd':      { 'type': 'string' },
                         'dirpath_log':     { 'type': 'string' },
+                        'dirpath_record':  { 'type': 'string' },
+                        'dirpath_checkpoint': { 'type': 'string' },
+                        'dirpath_profile': { 'type': 'string' },
+                        'do_tracemalloc':  { 'type': 'boolean' },
+                        'dirpath_status':  { 'type': 'string' },
+                        'stall_secs':      { 'type': 'number' },
                         'log_level':       { 'type': 'string' }
                     },
                     'required': [],
@@ -178,7 +404,13 @@ def _normalized_cfg_schema():
                         'class':         {
                             'type': 'array',
                             'items': { '$ref': '#/definitions/lowercase_name' }
-                        }
+                        },
+                        'activation':    { '$ref': '#/definitions/activation'         },  # noqa pylint: disable=C0301
+                        'is_vectorized': { 'type': 'boolean'                          },  # noqa pylint: disable=C0301
+                        'checkpoint':    { '$ref': '#/definitions/checkpoint'         },  # noqa pylint: disable=C0301
+                        'memoize':       { '$ref': '#/definitions/memoize'            },  # noqa pylint: disable=C0301
+                        'thread':        { '$ref': '#/definitions/lowercase_name'     },  # noqa pylint: disable=C0301
+                        'reload':        { 'type': 'boolean'                          }   # noqa pylint: disable=C0301
                     },
                     'required': [ 'process', 'functionality' ],
                     'additionalProperties': False
@@ -193,7 +425,11 @@ def _normalized_cfg_schema():
                         'data':  { '$ref': '#/definitions/id_data_type'   },
                         'src':   { '$ref': '#/definitions/path_part'      },
                         'dst':   { '$ref': '#/definitions/path_part'      },
-                        'dirn':  { '$ref': '#/definitions/edge_direction' }
+                        'dirn':  { '$ref': '#/definitions/edge_direction' },
+                        'record': { 'type': 'boolean'                     },
+                        'trace':  { 'type': 'boolean'                     },
+                        'batch':  { '$ref': '#/definitions/batch'         },
+                        'compress': { '$ref': '#/definitions/compress'    }
                     },
                     'required': [
                         'owner',
@@ -348,7 +584,8 @@ def _denormalize_edge_section(schema):
     edge_props['id_host_src'] = { '$ref': '#/definitions/id_host' }
     edge_props['id_host_dst'] = { '$ref': '#/definitions/id_host' }
 
-    set_required = set(edge_schema['properties'].keys()) - set(('dirn',))
+    set_optional = set(('dirn', 'record', 'trace', 'batch', 'compress'))
+    set_required = set(edge_schema['properties'].keys()) - set_optional
     edge_schema['required'] = list(set_required)
 
 
@@ -358,20 +595,37 @@ def _check_consistency(cfg):
     Raise an exception if cfg is inconsistent.
 
     """
-    _check_process_consistency(cfg)
-    _check_node_consistency(cfg)
-    _check_edge_consistency(cfg)
+    map_set_id = _map_set_id(cfg)
+    _check_process_consistency(cfg, map_set_id)
+    _check_node_consistency(cfg, map_set_id)
+    _check_edge_consistency(cfg, map_set_id)
     _check_edge_end_uniqueness(cfg)
-    _check_required_host_configuration(cfg)
+    _check_batched_edges(cfg)
+    _check_compressed_edges(cfg)
+    _check_required_host_configuration(cfg, map_set_id)
+
+
+# -----------------------------------------------------------------------------
+def _map_set_id(cfg):
+    """
+    Return a map from section name to the set of ids defined in it.
+
+    The sets are built once per config and
+    shared by all of the consistency checks.
+
+    """
+    return dict((name, set(cfg[name].keys()) if name in cfg else set())
+                        for name in ('host', 'process', 'node', 'data',
+                                     'req_host_cfg', 'role'))
 
 
 # -----------------------------------------------------------------------------
-def _check_process_consistency(cfg):
+def _check_process_consistency(cfg, map_set_id):
     """
     Raise an exception if process configuration is inconsistent.
 
     """
-    set_id_host = set(cfg['host'].keys())
+    set_id_host = map_set_id['host']
     for cfg_process in cfg['process'].values():
         _check(item      = cfg_process['host'],
                set_valid = set_id_host,
@@ -379,16 +633,16 @@ def _check_process_consistency(cfg):
 
 
 # -----------------------------------------------------------------------------
-def _check_node_consistency(cfg):
+def _check_node_consistency(cfg, map_set_id):
     """
     Raise an exception if node configuration is inconsistent.
 
     """
-    set_id_process      = set(cfg['process'].keys())
-    set_id_data         = set(cfg['data'].keys())
-    set_id_req_host_cfg = set(cfg['req_host_cfg'].keys()) if \
-                                            'req_host_cfg' in cfg else set()
-    for cfg_node in cfg['node'].values():
+    set_id_process      = map_set_id['process']
+    set_id_data         = map_set_id['data']
+    set_id_req_host_cfg = map_set_id['req_host_cfg']
+    map_set_name_input  = _map_set_name_input(cfg)
+    for (id_node, cfg_node) in cfg['node'].items():
         _check(item      = cfg_node['process'],
                set_valid = set_id_process,
                msg       = 'Unkown id_process in cfg: {id}')
@@ -403,17 +657,47 @@ def _check_node_consistency(cfg):
                    set_valid = set_id_req_host_cfg,
                    msg       = 'Unkown id_req_host_cfg in cfg: {id}')
 
+        spec_activation = cfg_node.get('activation', 'always')
+        if spec_activation != 'always':
+            set_name_input = map_set_name_input.get(id_node, set())
+            if not set_name_input:
+                msg = 'Input activation needs a node with inputs: {id}'
+                raise fl.stableflow.cfg.exception.CfgError(
+                                                    msg.format(id = id_node))
+            if spec_activation != 'on_input':
+                for name_trigger in spec_activation:
+                    _check(item      = name_trigger,
+                           set_valid = set_name_input,
+                           msg       = 'Unknown trigger input in cfg: {id}')
+
 
 # -----------------------------------------------------------------------------
-def _check_edge_consistency(cfg):
+def _map_set_name_input(cfg):
+    """
+    Return a map from each node id to the names of the inputs it receives.
+
+    """
+    map_set_name_input = collections.defaultdict(set)
+    for cfg_edge in cfg['edge']:
+        path_parts_dst = cfg_edge['dst'].split('.')
+        if len(path_parts_dst) > 2:
+            map_set_name_input[path_parts_dst[0]].add(path_parts_dst[2])
+    return map_set_name_input
+
+
+# -----------------------------------------------------------------------------
+def _check_edge_consistency(cfg, map_set_id):
     """
     Raise an exception if edge configuration is inconsistent.
 
     """
-    set_id_node = set(cfg['node'].keys())
-    set_id_data = set(cfg['data'].keys())
+    set_id_node = map_set_id['node']
+    set_id_data = map_set_id['data']
     for cfg_edge in cfg['edge']:
 
+        path_parts_src = cfg_edge['src'].split('.')
+        path_parts_dst = cfg_edge['dst'].split('.')
+
         _check(item      = cfg_edge['owner'],
                set_valid = set_id_node,
                msg       = 'Unkown id_node in cfg: {id}')
@@ -422,19 +706,19 @@ def _check_edge_consistency(cfg):
                set_valid = set_id_data,
                msg       = 'Unkown id_data in cfg: {id}')
 
-        _check(item      = cfg_edge['src'].split('.')[0],
+        _check(item      = path_parts_src[0],
                set_valid = set_id_node,
                msg       = 'Unkown id_node in cfg: {id}')
 
-        _check(item      = cfg_edge['dst'].split('.')[0],
+        _check(item      = path_parts_dst[0],
                set_valid = set_id_node,
                msg       = 'Unkown id_node in cfg: {id}')
 
-        if cfg_edge['src'].split('.')[1] != 'outputs':
+        if path_parts_src[1] != 'outputs':
             msg = 'Edge source needs to be an output.'
             raise fl.stableflow.cfg.exception.CfgError(msg)
 
-        if cfg_edge['dst'].split('.')[1] != 'inputs':
+        if path_parts_dst[1] != 'inputs':
             msg = 'Edge destination needs to be an input.'
             raise fl.stableflow.cfg.exception.CfgError(msg)
 
@@ -460,12 +744,110 @@ def _check_edge_end_uniqueness(cfg):
 
 
 # -----------------------------------------------------------------------------
-def _check_required_host_configuration(cfg):
+def _check_batched_edges(cfg):
+    """
+    Raise an exception if a batched edge could deadlock a cycle.
+
+    A batch of more than one tick holds the
+    source's output back until a later tick.
+    If the destination can reach the source
+    by any path, feedback edges included,
+    the source waits for input that depends
+    on the output that it is holding.
+
+    """
+    map_id_node_next = None
+    for cfg_edge in cfg['edge']:
+        cfg_batch = cfg_edge.get('batch', None)
+        if not cfg_batch:
+            continue
+        if cfg_edge.get('dirn', 'feedforward') == 'feedback':
+            msg = 'Feedback edge cannot be batched: {src} -> {dst}'.format(
+                                                        src = cfg_edge['src'],
+                                                        dst = cfg_edge['dst'])
+            raise fl.stableflow.cfg.exception.CfgError(msg)
+        if cfg_batch.get('ticks', 1) < 2:
+            continue
+        if map_id_node_next is None:
+            map_id_node_next = _map_id_node_next(cfg)
+        id_node_src = cfg_edge['src'].split('.')[0]
+        id_node_dst = cfg_edge['dst'].split('.')[0]
+        if _is_reachable(id_node_dst, id_node_src, map_id_node_next):
+            msg = ('Edge on a cycle cannot be batched over more than one '
+                   'tick: {src} -> {dst}'.format(src = cfg_edge['src'],
+                                                 dst = cfg_edge['dst']))
+            raise fl.stableflow.cfg.exception.CfgError(msg)
+
+
+# -----------------------------------------------------------------------------
+def _check_compressed_edges(cfg):
+    """
+    Raise an exception if an edge that is not inter host is compressed.
+
+    Only inter host queues apply the codec, so
+    compression on any other edge would be
+    silently ignored.
+
+    """
+    for cfg_edge in cfg['edge']:
+        if not cfg_edge.get('compress', None):
+            continue
+        if _id_host(cfg, cfg_edge['src']) == _id_host(cfg, cfg_edge['dst']):
+            msg = ('Only inter host edges can be compressed: '
+                   '{src} -> {dst}'.format(src = cfg_edge['src'],
+                                           dst = cfg_edge['dst']))
+            raise fl.stableflow.cfg.exception.CfgError(msg)
+
+
+# -----------------------------------------------------------------------------
+def _id_host(cfg, path):
+    """
+    Return the id of the host running the node at the end of an edge path.
+
+    """
+    id_process = cfg['node'][path.split('.')[0]]['process']
+    return cfg['process'][id_process]['host']
+
+
+# -----------------------------------------------------------------------------
+def _map_id_node_next(cfg):
+    """
+    Return a map from each node id to the ids of the nodes that it feeds.
+
+    """
+    map_id_node_next = collections.defaultdict(set)
+    for cfg_edge in cfg['edge']:
+        map_id_node_next[cfg_edge['src'].split('.')[0]].add(
+                                                cfg_edge['dst'].split('.')[0])
+    return map_id_node_next
+
+
+# -----------------------------------------------------------------------------
+def _is_reachable(id_node_from, id_node_to, map_id_node_next):
+    """
+    Return true if there is a path from id_node_from to id_node_to.
+
+    """
+    set_visited = {id_node_from}
+    stack       = [id_node_from]
+    while stack:
+        id_node = stack.pop()
+        if id_node == id_node_to:
+            return True
+        for id_node_next in map_id_node_next.get(id_node, ()):
+            if id_node_next not in set_visited:
+                set_visited.add(id_node_next)
+                stack.append(id_node_next)
+    return False
+
+
+# -----------------------------------------------------------------------------
+def _check_required_host_configuration(cfg, map_set_id):
     """
     Raise an exception if req_host_cfg roles are inconsistent.
 
     """
-    set_id_role = set(cfg['role'].keys()) if 'role' in cfg else set()
+    set_id_role = map_set_id['role']
     if 'req_host_cfg' in cfg:
         for cfg_req_host_cfg in cfg['req_host_cfg'].values():
             if 'role' not in cfg_req_host_cfg:
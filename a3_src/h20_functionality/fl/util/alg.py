@@ -383,43 +383,38 @@ def topological_sort(map_forward, map_backward = None):
     # as a list of sets; each set representing
     # nodes of equal rank. Here we create
     # the output list and fill it with
-    # nodes at rank zero, removing them
-    # from the graph.
+    # nodes at rank zero.
     #
-    set_rank_zero = _nodes_at_count_zero(map_indegree)
-    list_set_ranks = [set_rank_zero]
-    _del_items(map_indegree, set_rank_zero)
+    list_set_ranks = [_nodes_at_count_zero(map_indegree)]
 
     # The topological sort algorithm
     # uses breadth first search. An
     # indegree number is maintained
     # for all nodes remaining in the
     # graph. At each iteration, the
-    # 'source' nodes (indegree zero)
-    # are taken from the graph and
-    # added to the output, and the
     # indegree of immediate downstream
-    # neighbors is decremented.
+    # neighbors of the previous rank is
+    # decremented, and those that reach
+    # zero form the next rank. Only the
+    # edges out of each rank are visited,
+    # so the sort is linear in the size
+    # of the graph.
     #
     while True:
 
-        # Maintain indegree number.
-        set_prev = list_set_ranks[-1]
-        for id_node in _list_downstream_neighbors(set_prev, map_forward):
+        set_next = set()
+        for id_node in _list_downstream_neighbors(list_set_ranks[-1],
+                                                  map_forward):
             map_indegree[id_node] -= 1
+            if map_indegree[id_node] == 0:
+                set_next.add(id_node)
 
-        # Find the next rank - terminate
-        # if it does not exist.
+        # Terminate if the next
+        # rank does not exist.
         #
-        set_next = _nodes_at_count_zero(map_indegree)
         if not set_next:
             break
 
-        # If the next rank does exist,
-        # remove it from the graph and
-        # add it to the list of ranks.
-        #
-        _del_items(map_indegree, set_next)
         list_set_ranks.append(set_next)
 
     return list_set_ranks
@@ -434,16 +429,6 @@ def _nodes_at_count_zero(map_indegree):
     return set(key for (key, count) in map_indegree.items() if count == 0)
 
 
-# -----------------------------------------------------------------------------
-def _del_items(map_data, set_keys):
-    """
-    Delete the specified items from the dict.
-
-    """
-    for key in set_keys:
-        del map_data[key]
-
-
 # -----------------------------------------------------------------------------
 def _list_downstream_neighbors(set_id_node, map_forward):
     """
@@ -228,6 +228,7 @@ def expected_help_text_main():
         'Commands:\n'
         '  system  Control the system as a whole.\n'
         '  host    Control a single process host.\n'
+        '  cfg     Inspect system configuration.\n'
 
     )
 
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Package of classes supporting node state checkpointing and warm restart.
+
+A checkpoint of a node is a snapshot of its
+state dict and of the edge memory that it
+owns (its outputs), stored in a directory
+per node.
+
+Each top level value is pickled separately
+and stored in a content addressed segment
+file, named by a digest of its bytes. A
+manifest, replaced atomically, records which
+segment holds each value. Values that have
+not changed since the previous checkpoint
+map to segments that already exist, so only
+changed values are written to disk.
+
+Pickling is done on the hot path so that the
+snapshot is consistent, but hashing and file
+IO are done on a background thread, and a
+checkpoint is skipped rather than waited for
+if the previous one is still being written.
+
+Segments that the new manifest no longer
+refers to are removed once it is in place.
+A lock shared with restore keeps them until
+any restore that is reading the previous
+manifest has loaded them.
+
+"""
+
+
+import collections.abc
+import hashlib
+import os
+import os.path
+import pickle
+import threading
+
+import pl.stableflow.log
+
+
+FILENAME_MANIFEST = 'manifest.pkl'
+MISSING           = object()
+
+
+# =============================================================================
+class Checkpointer():  # pylint: disable=R0902
+    """
+    Periodic checkpoint writer and reader for the memory of a single node.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self,  # pylint: disable=R0913
+                 dirpath,
+                 id_cfg,
+                 interval,
+                 do_skip_reset = False):
+        """
+        Return a Checkpointer storing checkpoints in dirpath.
+
+        """
+        self.dirpath         = dirpath
+        self.id_cfg          = id_cfg
+        self.interval        = interval
+        self.do_skip_reset   = do_skip_reset
+        self._thread         = None
+        self._set_key_failed = set()
+        self._set_digest     = set()
+        self._lock           = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    def maybe_save(self, idx, state, outputs):
+        """
+        Start writing a checkpoint if one is due at tick idx.
+
+        """
+        if idx % self.interval != 0:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        map_blob = dict()
+        for (section, memory) in (('state', state), ('outputs', outputs)):
+            for (key, value) in memory.items():
+                blob = self._pickle(section, key, value)
+                if blob is not None:
+                    map_blob[(section, key)] = blob
+
+        self._thread = threading.Thread(target = self._write,
+                                        args   = (idx, map_blob),
+                                        daemon = True)
+        self._thread.start()
+
+    # -------------------------------------------------------------------------
+    def restore(self, state, outputs):
+        """
+        Restore the latest checkpoint into state and outputs.
+
+        Output memory may be aliased by other
+        nodes, so it is restored in place. The
+        checkpoint is only used if it was taken
+        with the same configuration (id_cfg).
+
+        Returns true iff a checkpoint was restored.
+
+        """
+        with self._lock:
+            map_value = self._load()
+        if map_value is None:
+            return False
+
+        for ((section, key), value) in map_value.items():
+            if section == 'state':
+                state[key] = value
+            elif key in outputs:
+                _restore_in_place(outputs, key, value)
+        return True
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """
+        Wait for any checkpoint that is still being written.
+
+        """
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # -------------------------------------------------------------------------
+    def _load(self):
+        """
+        Return the values in the latest checkpoint, or None if unavailable.
+
+        Must be called with the lock held, so that
+        segments are not removed while being read.
+
+        """
+        manifest = _read_pickle(os.path.join(self.dirpath, FILENAME_MANIFEST))
+        if manifest is MISSING or manifest['id_cfg'] != self.id_cfg:
+            return None
+
+        map_value = dict()
+        for (section, key, digest) in manifest['list_entry']:
+            value = _read_pickle(os.path.join(self.dirpath, digest))
+            if value is MISSING:
+                pl.stableflow.log.logger.warning(
+                    'Checkpoint segment missing in "{dirpath}"',
+                    dirpath = self.dirpath)
+                return None
+            map_value[(section, key)] = value
+
+        self._set_digest = set(entry[2] for entry in manifest['list_entry'])
+        return map_value
+
+    # -------------------------------------------------------------------------
+    def _pickle(self, section, key, value):
+        """
+        Return the pickled value, or None if it cannot be pickled.
+
+        Values that cannot be pickled (e.g.
+        coroutines) are left out of the
+        checkpoint, with a single warning.
+
+        """
+        try:
+            return pickle.dumps(value, protocol = pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            if (section, key) not in self._set_key_failed:
+                self._set_key_failed.add((section, key))
+                pl.stableflow.log.logger.warning(
+                    'Cannot checkpoint {section}[{key}]: not picklable',
+                    section = section,
+                    key     = repr(key))
+            return None
+
+    # -------------------------------------------------------------------------
+    def _write(self, idx, map_blob):
+        """
+        Write changed segments, then replace the manifest.
+
+        """
+        os.makedirs(self.dirpath, exist_ok = True)
+
+        list_entry = list()
+        set_digest = set()
+        for ((section, key), blob) in map_blob.items():
+            digest = hashlib.blake2b(blob, digest_size = 16).hexdigest()
+            if digest not in self._set_digest:
+                _write_atomic(os.path.join(self.dirpath, digest), blob)
+            list_entry.append((section, key, digest))
+            set_digest.add(digest)
+
+        manifest = {'id_cfg':     self.id_cfg,
+                    'idx':        idx,
+                    'list_entry': list_entry}
+        blob     = pickle.dumps(manifest, protocol = pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            _write_atomic(os.path.join(self.dirpath, FILENAME_MANIFEST), blob)
+            for digest in self._set_digest - set_digest:
+                try:
+                    os.remove(os.path.join(self.dirpath, digest))
+                except FileNotFoundError:
+                    pass
+            self._set_digest = set_digest
+
+
+# -----------------------------------------------------------------------------
+def _restore_in_place(outputs, key, value):
+    """
+    Copy a checkpointed value into existing output memory.
+
+    """
+    memory = outputs[key]
+    if isinstance(memory, collections.abc.MutableMapping):
+        memory.clear()
+        memory.update(value)
+    elif hasattr(memory, 'shape'):
+        memory[...] = value
+    else:
+        pl.stableflow.log.logger.warning(
+            'Cannot restore outputs[{key}] in place', key = repr(key))
+
+
+# -----------------------------------------------------------------------------
+def _write_atomic(filepath, blob):
+    """
+    Write blob to filepath so that readers never see a partial file.
+
+    """
+    filepath_tmp = filepath + '.tmp'
+    with open(filepath_tmp, 'wb') as file:
+        file.write(blob)
+    os.replace(filepath_tmp, filepath)
+
+
+# -----------------------------------------------------------------------------
+def _read_pickle(filepath):
+    """
+    Return the unpickled content of filepath, or MISSING if unavailable.
+
+    """
+    try:
+        with open(filepath, 'rb') as file:
+            return pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return MISSING
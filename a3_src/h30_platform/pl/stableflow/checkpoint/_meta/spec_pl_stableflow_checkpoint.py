@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Functional specification for the pl.stableflow.checkpoint package.
+
+"""
+
+
+# =============================================================================
+class SpecifyStableflowCheckpoint:
+    """
+    Spec for pl.stableflow.checkpoint package.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_restores_state_and_outputs_in_place(self, tmp_path):
+        """
+        A saved checkpoint is restored, with outputs updated in place.
+
+        """
+        checkpointer = _checkpointer(tmp_path, 'cfg_a')
+        checkpointer.maybe_save(idx     = 1,
+                                state   = {'count': 7, 'empty': None},
+                                outputs = {'output': {'ena': True}})
+        checkpointer.close()
+
+        state   = dict()
+        output  = {'ena': False, 'stale': True}
+        outputs = {'output': output}
+        assert _checkpointer(tmp_path, 'cfg_a').restore(state, outputs)
+        assert state == {'count': 7, 'empty': None}
+        assert outputs['output'] is output
+        assert output == {'ena': True}
+
+    # -------------------------------------------------------------------------
+    def it_ignores_checkpoints_from_a_different_configuration(self, tmp_path):
+        """
+        Checkpoints taken with a different id_cfg are not restored.
+
+        """
+        checkpointer = _checkpointer(tmp_path, 'cfg_a')
+        checkpointer.maybe_save(idx = 1, state = {'count': 7}, outputs = {})
+        checkpointer.close()
+
+        state = dict()
+        assert not _checkpointer(tmp_path, 'cfg_b').restore(state, {})
+        assert state == {}
+
+    # -------------------------------------------------------------------------
+    def it_only_keeps_segments_for_the_latest_checkpoint(self, tmp_path):
+        """
+        Segments for values that have changed are replaced, not accumulated.
+
+        """
+        checkpointer = _checkpointer(tmp_path, 'cfg_a')
+        for count in (1, 2, 3):
+            checkpointer.maybe_save(idx     = count,
+                                    state   = {'count': count, 'big': 'x'},
+                                    outputs = {})
+            checkpointer.close()
+
+        assert len(list(tmp_path.iterdir())) == 3  # Manifest & 2 segments.
+
+    # -------------------------------------------------------------------------
+    def it_keeps_old_segments_while_a_restore_is_reading_them(self, tmp_path):
+        """
+        Unreferenced segments are only removed once no restore is in flight.
+
+        """
+        checkpointer = _checkpointer(tmp_path, 'cfg_a')
+        checkpointer.maybe_save(idx = 1, state = {'count': 1}, outputs = {})
+        checkpointer.close()
+        set_filename = set(path.name for path in tmp_path.iterdir())
+
+        with checkpointer._lock:  # pylint: disable=W0212
+            checkpointer.maybe_save(idx     = 2,
+                                    state   = {'count': 2},
+                                    outputs = {})
+            checkpointer._thread.join(timeout = 0.2)  # pylint: disable=W0212
+            set_filename_now = set(path.name for path in tmp_path.iterdir())
+            assert set_filename <= set_filename_now
+        checkpointer.close()
+
+        state = dict()
+        assert _checkpointer(tmp_path, 'cfg_a').restore(state, {})
+        assert state == {'count': 2}
+        assert len(list(tmp_path.iterdir())) == 2  # Manifest & 1 segment.
+
+
+# -----------------------------------------------------------------------------
+def _checkpointer(dirpath, id_cfg):
+    """
+    Return a Checkpointer that saves on every tick.
+
+    """
+    import pl.stableflow.checkpoint  # pylint: disable=C0415
+
+    return pl.stableflow.checkpoint.Checkpointer(dirpath  = str(dirpath),
+                                                 id_cfg   = id_cfg,
+                                                 interval = 1)
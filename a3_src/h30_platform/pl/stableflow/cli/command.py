@@ -133,6 +133,17 @@ def grp_host():
     pass
 
 
+# -----------------------------------------------------------------------------
+@grp_main.group(name = 'cfg',
+                cls  = pl.stableflow.cli.util.OrderedGroup)
+def grp_cfg():
+    """
+    Inspect system configuration.
+
+    """
+    pass
+
+
 # -----------------------------------------------------------------------------
 @grp_system.command()
 @click.option(
@@ -310,6 +321,85 @@ def stop(path_cfg       = None,
                 sys.exit(1)
 
 
+# -----------------------------------------------------------------------------
+@grp_system.command()
+@click.option(
+    '-p', '--cfg-path', 'path_cfg',
+    help     = 'Directory path for configuration files.',
+    required = False,
+    default  = None,
+    type     = click.Path(exists = True),
+    nargs    = 1,
+    envvar   = _envvar('CFG_PATH'))
+@click.option(
+    '-c', '--cfg', 'cfg',
+    help     = 'Serialized configuration data.',
+    required = False,
+    default  = None,
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG'))
+@click.option(
+    '-s', '--cfg-addr-delim', 'delim_cfg_addr',
+    help     = 'The character to use as a delimiter in config override addresses.',  # noqa pylint: disable=C0301
+    required = False,
+    default  = '.',
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG_ADDR_DELIM'))
+@click.argument(
+    'cfg_override',
+    required = False,
+    default  = None,
+    type     = click.STRING,
+    nargs    = -1,
+    envvar   = _envvar('CFG_OVERRIDE'))
+def update(path_cfg       = None,
+           cfg            = None,
+           delim_cfg_addr = '.',
+           cfg_override   = None):
+    """
+    Update the specified system, restarting only what changed.
+
+    The new configuration is compared with the one
+    that the system was started with, and only the
+    processes whose nodes, edges or data types
+    changed are restarted, together with any that
+    share an inter-process queue with them. Other
+    processes keep running.
+
+    """
+    import fl.stableflow.cfg            # pylint: disable=C0415,W0621
+    import fl.stableflow.cfg.exception  # pylint: disable=C0415,W0621
+    import pl.stableflow.sys            # pylint: disable=C0415,W0621
+
+    with pl.stableflow.log.logger.catch(onerror = lambda _: sys.exit(1)):
+        try:
+            cfg = fl.stableflow.cfg.prepare(path_cfg       = path_cfg,
+                                            string_cfg     = cfg,
+                                            do_make_ready  = False,
+                                            is_local       = False,
+                                            delim_cfg_addr = delim_cfg_addr,
+                                            tup_overrides  = cfg_override)
+        except fl.stableflow.cfg.exception.CfgError as err:
+            print(err, file = sys.stderr)  # Custom message (no stack trace)
+            sys.exit(1)
+        else:
+            try:
+                sys.exit(pl.stableflow.sys.update(cfg))
+            except Exception as err:
+
+                # An exception will be thrown
+                # when we need to display either
+                # a custom error message, or no
+                # error message at all.
+                #
+                err_msg = str(err)
+                if err_msg != '':
+                    print(err_msg, file = sys.stderr)
+                sys.exit(1)
+
+
 # -----------------------------------------------------------------------------
 @grp_system.command()
 @click.option(
@@ -454,6 +544,161 @@ def step(path_cfg       = None,
                 sys.exit(1)
 
 
+# -----------------------------------------------------------------------------
+@grp_system.command()
+@click.option(
+    '-p', '--cfg-path', 'path_cfg',
+    help     = 'Directory path for configuration files.',
+    required = False,
+    default  = None,
+    type     = click.Path(exists = True),
+    nargs    = 1,
+    envvar   = _envvar('CFG_PATH'))
+@click.option(
+    '-c', '--cfg', 'cfg',
+    help     = 'Serialized configuration data.',
+    required = False,
+    default  = None,
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG'))
+@click.option(
+    '-s', '--cfg-addr-delim', 'delim_cfg_addr',
+    help     = 'The character to use as a delimiter in config override addresses.',  # noqa pylint: disable=C0301
+    required = False,
+    default  = '.',
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG_ADDR_DELIM'))
+@click.argument(
+    'cfg_override',
+    required = False,
+    default  = None,
+    type     = click.STRING,
+    nargs    = -1,
+    envvar   = _envvar('CFG_OVERRIDE'))
+def profile(path_cfg       = None,
+            cfg            = None,
+            delim_cfg_addr = '.',
+            cfg_override   = None):
+    """
+    Start or stop the sampling profiler in the specified system.
+
+    Each process writes collapsed-stack and
+    speedscope profiles, with samples attributed
+    to nodes, when the profiler is stopped.
+
+    """
+    import fl.stableflow.cfg            # pylint: disable=C0415,W0621
+    import fl.stableflow.cfg.exception  # pylint: disable=C0415,W0621
+    import pl.stableflow.sys            # pylint: disable=C0415,W0621
+
+    with pl.stableflow.log.logger.catch(onerror = lambda _: sys.exit(1)):
+        try:
+            cfg = fl.stableflow.cfg.prepare(path_cfg       = path_cfg,
+                                            string_cfg     = cfg,
+                                            do_make_ready  = False,
+                                            is_local       = False,
+                                            delim_cfg_addr = delim_cfg_addr,
+                                            tup_overrides  = cfg_override)
+        except fl.stableflow.cfg.exception.CfgError as err:
+            print(err, file = sys.stderr)  # Custom message (no stack trace)
+            sys.exit(1)
+        else:
+            try:
+                sys.exit(pl.stableflow.sys.profile(cfg))
+            except Exception as err:
+
+                # An exception will be thrown
+                # when we need to display either
+                # a custom error message, or no
+                # error message at all.
+                #
+                err_msg = str(err)
+                if err_msg != '':
+                    print(err_msg, file = sys.stderr)
+                sys.exit(1)
+
+
+# -----------------------------------------------------------------------------
+@grp_system.command()
+@click.option(
+    '-p', '--cfg-path', 'path_cfg',
+    help     = 'Directory path for configuration files.',
+    required = False,
+    default  = None,
+    type     = click.Path(exists = True),
+    nargs    = 1,
+    envvar   = _envvar('CFG_PATH'))
+@click.option(
+    '-c', '--cfg', 'cfg',
+    help     = 'Serialized configuration data.',
+    required = False,
+    default  = None,
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG'))
+@click.option(
+    '-s', '--cfg-addr-delim', 'delim_cfg_addr',
+    help     = 'The character to use as a delimiter in config override addresses.',  # noqa pylint: disable=C0301
+    required = False,
+    default  = '.',
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG_ADDR_DELIM'))
+@click.argument(
+    'cfg_override',
+    required = False,
+    default  = None,
+    type     = click.STRING,
+    nargs    = -1,
+    envvar   = _envvar('CFG_OVERRIDE'))
+def memory(path_cfg       = None,
+           cfg            = None,
+           delim_cfg_addr = '.',
+           cfg_override   = None):
+    """
+    Report node and queue memory usage in the specified system.
+
+    Each process logs the approximate deep size
+    of the state, inputs and outputs of each of
+    its nodes and the backlog of each queue. If
+    do_tracemalloc is set for the host, the top
+    allocation differences since the previous
+    report are logged as well.
+
+    """
+    import fl.stableflow.cfg            # pylint: disable=C0415,W0621
+    import fl.stableflow.cfg.exception  # pylint: disable=C0415,W0621
+    import pl.stableflow.sys            # pylint: disable=C0415,W0621
+
+    with pl.stableflow.log.logger.catch(onerror = lambda _: sys.exit(1)):
+        try:
+            cfg = fl.stableflow.cfg.prepare(path_cfg       = path_cfg,
+                                            string_cfg     = cfg,
+                                            do_make_ready  = False,
+                                            is_local       = False,
+                                            delim_cfg_addr = delim_cfg_addr,
+                                            tup_overrides  = cfg_override)
+        except fl.stableflow.cfg.exception.CfgError as err:
+            print(err, file = sys.stderr)  # Custom message (no stack trace)
+            sys.exit(1)
+        else:
+            try:
+                sys.exit(pl.stableflow.sys.memory(cfg))
+            except Exception as err:
+
+                # An exception will be thrown
+                # when we need to display either
+                # a custom error message, or no
+                # error message at all.
+                #
+                err_msg = str(err)
+                if err_msg != '':
+                    print(err_msg, file = sys.stderr)
+                sys.exit(1)
+
+
 # -----------------------------------------------------------------------------
 @grp_system.command()
 @click.option(
@@ -526,6 +771,168 @@ def ps(path_cfg       = None,
                 sys.exit(1)
 
 
+# -----------------------------------------------------------------------------
+@grp_system.command()
+@click.option(
+    '-p', '--cfg-path', 'path_cfg',
+    help     = 'Directory path for configuration files.',
+    required = False,
+    default  = None,
+    type     = click.Path(exists = True),
+    nargs    = 1,
+    envvar   = _envvar('CFG_PATH'))
+@click.option(
+    '-c', '--cfg', 'cfg',
+    help     = 'Serialized configuration data.',
+    required = False,
+    default  = None,
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG'))
+@click.option(
+    '-s', '--cfg-addr-delim', 'delim_cfg_addr',
+    help     = 'The character to use as a delimiter in config override addresses.',  # noqa pylint: disable=C0301
+    required = False,
+    default  = '.',
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG_ADDR_DELIM'))
+@click.argument(
+    'cfg_override',
+    required = False,
+    default  = None,
+    type     = click.STRING,
+    nargs    = -1,
+    envvar   = _envvar('CFG_OVERRIDE'))
+def stalls(path_cfg       = None,
+           cfg            = None,
+           delim_cfg_addr = '.',
+           cfg_override   = None):
+    """
+    Print stalled processes and deadlocks in the specified system.
+
+    Each host lists the reads that its
+    processes are blocked in, with the peer
+    that each is waiting on, and any cycle of
+    stalled processes in the wait-for graph.
+
+    """
+    import fl.stableflow.cfg            # pylint: disable=C0415,W0621
+    import fl.stableflow.cfg.exception  # pylint: disable=C0415,W0621
+    import pl.stableflow.sys            # pylint: disable=C0415,W0621
+
+    with pl.stableflow.log.logger.catch(onerror = lambda _: sys.exit(1)):
+        try:
+            cfg = fl.stableflow.cfg.prepare(path_cfg       = path_cfg,
+                                            string_cfg     = cfg,
+                                            do_make_ready  = False,
+                                            is_local       = False,
+                                            delim_cfg_addr = delim_cfg_addr,
+                                            tup_overrides  = cfg_override)
+        except fl.stableflow.cfg.exception.CfgError as err:
+            print(err, file = sys.stderr)  # Custom message (no stack trace)
+            sys.exit(1)
+        else:
+            try:
+                sys.exit(pl.stableflow.sys.print_wait_for_graph(cfg))
+            except Exception as err:
+
+                # An exception will be thrown
+                # when we need to display either
+                # a custom error message, or no
+                # error message at all.
+                #
+                err_msg = str(err)
+                if err_msg != '':
+                    print(err_msg, file = sys.stderr)
+                sys.exit(1)
+
+
+# -----------------------------------------------------------------------------
+@grp_cfg.command()
+@click.option(
+    '-p', '--cfg-path', 'path_cfg',
+    help     = 'Directory path for configuration files.',
+    required = False,
+    default  = None,
+    type     = click.Path(exists = True),
+    nargs    = 1,
+    envvar   = _envvar('CFG_PATH'))
+@click.option(
+    '-c', '--cfg', 'cfg',
+    help     = 'Serialized configuration data.',
+    required = False,
+    default  = None,
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG'))
+@click.option(
+    '-l', '--limit', 'tup_limit',
+    help     = 'Bytes per tick allowed on edges of an IPC type.',
+    required = False,
+    multiple = True,
+    type     = (click.STRING, click.INT),
+    nargs    = 2)
+@click.option(
+    '-s', '--cfg-addr-delim', 'delim_cfg_addr',
+    help     = 'The character to use as a delimiter in config override addresses.',  # noqa pylint: disable=C0301
+    required = False,
+    default  = '.',
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG_ADDR_DELIM'))
+@click.argument(
+    'cfg_override',
+    required = False,
+    default  = None,
+    type     = click.STRING,
+    nargs    = -1,
+    envvar   = _envvar('CFG_OVERRIDE'))
+def analyze(path_cfg       = None,
+            cfg            = None,
+            tup_limit      = (),
+            delim_cfg_addr = '.',
+            cfg_override   = None):
+    """
+    Report the communication costs of the specified system.
+
+    Bytes per tick are estimated for each edge
+    from the data dictionary, and summed over the
+    edges crossing each process and host
+    boundary. Edges over the limit for their IPC
+    type are flagged, and the exit status is
+    non-zero if there are any. Limits can be set
+    with --limit IPC_TYPE BYTES.
+
+    """
+    import fl.stableflow.cfg            # pylint: disable=C0415,W0621
+    import fl.stableflow.cfg.analyze    # pylint: disable=C0415,W0621
+    import fl.stableflow.cfg.exception  # pylint: disable=C0415,W0621
+
+    with pl.stableflow.log.logger.catch(onerror = lambda _: sys.exit(1)):
+        try:
+            cfg = fl.stableflow.cfg.denormalize(
+                    fl.stableflow.cfg.prepare(
+                                        path_cfg       = path_cfg,
+                                        string_cfg     = cfg,
+                                        do_make_ready  = False,
+                                        is_local       = False,
+                                        delim_cfg_addr = delim_cfg_addr,
+                                        tup_overrides  = cfg_override))
+        except fl.stableflow.cfg.exception.CfgError as err:
+            print(err, file = sys.stderr)  # Custom message (no stack trace)
+            sys.exit(1)
+        else:
+            analysis = fl.stableflow.cfg.analyze.analyze(
+                                        cfg             = cfg,
+                                        map_limit_bytes = dict(tup_limit))
+            for line in fl.stableflow.cfg.analyze.format_report(analysis):
+                print(line)
+            is_over_limit = any(cost.is_over_limit
+                                for cost in analysis.list_edge_cost)
+            sys.exit(1 if is_over_limit else 0)
+
+
 # -----------------------------------------------------------------------------
 @grp_host.command()
 @click.argument(
@@ -572,6 +979,29 @@ def stop_host(cfg = None):
             pl.stableflow.util.serialization.deserialize(cfg)))
 
 
+# -----------------------------------------------------------------------------
+@grp_host.command()
+@click.argument(
+    'cfg',
+    required = True,
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG'))
+def update_host(cfg = None):
+    """
+    Restart the updated processes on the local process host.
+
+    This command takes a single argument, CFG, which is expected to be a
+    serialized configuration structure.
+
+    """
+    import pl.stableflow.util.serialization  # pylint: disable=C0415,W0621
+    import pl.stableflow.host                # pylint: disable=C0415,W0621
+    sys.exit(
+        pl.stableflow.host.update(
+            pl.stableflow.util.serialization.deserialize(cfg)))
+
+
 # -----------------------------------------------------------------------------
 @grp_host.command()
 @click.argument(
@@ -618,6 +1048,52 @@ def step_host(cfg = None):
             pl.stableflow.util.serialization.deserialize(cfg)))
 
 
+# -----------------------------------------------------------------------------
+@grp_host.command()
+@click.argument(
+    'cfg',
+    required = True,
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG'))
+def profile_host(cfg = None):
+    """
+    Start or stop the sampling profiler for the local process host.
+
+    This command takes a single argument, CFG, which is expected to be a
+    serialized configuration structure.
+
+    """
+    import pl.stableflow.util.serialization  # pylint: disable=C0415,W0621
+    import pl.stableflow.host                # pylint: disable=C0415,W0621
+    sys.exit(
+        pl.stableflow.host.profile(
+            pl.stableflow.util.serialization.deserialize(cfg)))
+
+
+# -----------------------------------------------------------------------------
+@grp_host.command()
+@click.argument(
+    'cfg',
+    required = True,
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG'))
+def memory_host(cfg = None):
+    """
+    Report node and queue memory usage for the local process host.
+
+    This command takes a single argument, CFG, which is expected to be a
+    serialized configuration structure.
+
+    """
+    import pl.stableflow.util.serialization  # pylint: disable=C0415,W0621
+    import pl.stableflow.host                # pylint: disable=C0415,W0621
+    sys.exit(
+        pl.stableflow.host.memory(
+            pl.stableflow.util.serialization.deserialize(cfg)))
+
+
 # -----------------------------------------------------------------------------
 @grp_host.command()
 @click.argument(
@@ -641,6 +1117,29 @@ def ps_host(cfg = None):
             pl.stableflow.util.serialization.deserialize(cfg)))
 
 
+# -----------------------------------------------------------------------------
+@grp_host.command()
+@click.argument(
+    'cfg',
+    required = True,
+    type     = click.STRING,
+    nargs    = 1,
+    envvar   = _envvar('CFG'))
+def stalls_host(cfg = None):
+    """
+    Print stalled processes and deadlocks for the local process host.
+
+    This command takes a single argument, CFG, which is expected to be a
+    serialized configuration structure.
+
+    """
+    import pl.stableflow.util.serialization  # pylint: disable=C0415,W0621
+    import pl.stableflow.host                # pylint: disable=C0415,W0621
+    sys.exit(
+        pl.stableflow.host.get_wait_for_graph(
+            pl.stableflow.util.serialization.deserialize(cfg)))
+
+
 # -----------------------------------------------------------------------------
 if __name__ == '__main__':
     grp_main()
\ No newline at end of file
@@ -3,3 +3,59 @@
 Functional specification for the pl.stableflow.gen.python module.
 
 """
+
+
+# =============================================================================
+class SpecifyStableflowGenPythonBatch:
+    """
+    Spec for batched allocation in pl.stableflow.gen.python.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_allocates_numpy_fields_without_a_batch_dimension_by_default(self):
+        """
+        Numpy fields keep their declared shape when num_batch is not given.
+
+        """
+        import pl.stableflow.gen.python  # pylint: disable=C0415
+
+        map_alloc = pl.stableflow.gen.python.map_allocator(_cfg_data())
+        sample    = map_alloc['sample']()
+        assert sample['vec'].shape == (3,)
+        assert sample['value'].shape == ()
+
+    # -------------------------------------------------------------------------
+    def it_adds_a_leading_batch_dimension_to_numpy_fields(self):
+        """
+        Numpy fields gain a leading batch dimension when num_batch is given.
+
+        """
+        import pl.stableflow.gen.python  # pylint: disable=C0415
+
+        cfg_data  = _cfg_data()
+        map_alloc = pl.stableflow.gen.python.map_allocator(cfg_data,
+                                                           num_batch = 4)
+        map_init  = pl.stableflow.gen.python.map_initializer(cfg_data,
+                                                             num_batch = 4)
+        sample    = map_alloc['sample']()
+        map_init['sample'](sample)
+
+        assert sample['vec'].shape   == (4, 3)
+        assert sample['value'].shape == (4,)
+        assert list(sample['value']) == [2.0, 2.0, 2.0, 2.0]
+        assert pl.stableflow.gen.python.set_id_type_with_numpy_fields(
+                                                    cfg_data) == {'sample'}
+
+
+# -----------------------------------------------------------------------------
+def _cfg_data():
+    """
+    Return a denormalized data dictionary with scalar and array fields.
+
+    """
+    import fl.stableflow.cfg.data  # pylint: disable=C0415
+
+    cfg = {'data': {'sample': [{'value': {'type': 'float32', 'preset': 2.0}},
+                               {'vec':   {'type': 'float64', 'shape': [3]}}]}}
+    return fl.stableflow.cfg.data.denormalize(cfg)['data']
@@ -8,9 +8,16 @@ dictionary.
 
 The data dictionary is stored in cfg['data'] or cfg_data.
 
+When num_batch is given, every numpy field is
+allocated with a leading batch dimension of
+that size, so that N lockstep instances of a
+graph can share a single set of node memory.
+Pure python fields are not batched.
+
 """
 
 import copy
+import functools
 
 import numpy
 
@@ -18,7 +25,7 @@ import pl.stableflow.util
 
 
 # -----------------------------------------------------------------------------
-def map_allocator(cfg_data):
+def map_allocator(cfg_data, num_batch = None):
     """
     Return a map of allocator functions for the specified data dictionary.
 
@@ -27,13 +34,15 @@ def map_allocator(cfg_data):
     in the cfg_data data dictionary.
 
     """
-    map_alloc = _map_function(cfg_data, _allocator)
+    map_alloc = _map_function(cfg_data, functools.partial(
+                                                _allocator,
+                                                num_batch = num_batch))
     map_alloc[None] = dict
     return map_alloc
 
 
 # -----------------------------------------------------------------------------
-def map_initializer(cfg_data):
+def map_initializer(cfg_data, num_batch = None):
     """
     Return a map of initializer functions for the specified data dictionary.
 
@@ -42,7 +51,33 @@ def map_initializer(cfg_data):
     clean initial state.
 
     """
-    return _map_function(cfg_data, _initializer)
+    return _map_function(cfg_data, functools.partial(
+                                                _initializer,
+                                                num_batch = num_batch))
+
+
+# -----------------------------------------------------------------------------
+def set_id_type_with_numpy_fields(cfg_data):
+    """
+    Return the set of id_type in the data dictionary with numpy fields.
+
+    These are the types which gain a leading
+    batch dimension when allocated in batched
+    mode.
+
+    """
+    blacklist = set(('compound_type',
+                     'compound_type_scope_closer'))
+
+    set_id_type = set()
+    for (id_type, list_node) in cfg_data.items():
+        for node in list_node:
+            if node['category'] in blacklist:
+                continue
+            if node['typeinfo']['np'] is not None:
+                set_id_type.add(id_type)
+                break
+    return set_id_type
 
 
 # -----------------------------------------------------------------------------
@@ -83,17 +118,19 @@ def _map_function(cfg_data, _get_function):
 
 
 # -----------------------------------------------------------------------------
-def _allocator(id_type, list_node):
+def _allocator(id_type, list_node, num_batch = None):
     """
     Return an allocator function for the specified type.
 
     """
-    prototype = _make_prototype_instance(id_type, list_node)
+    prototype = _make_prototype_instance(id_type, list_node, num_batch)
     return lambda: copy.copy(getattr(prototype, 'data', prototype))
 
 
 # -----------------------------------------------------------------------------
-def _make_prototype_instance(id_type, list_node):  # pylint: disable=W0613
+def _make_prototype_instance(id_type,  # pylint: disable=W0613
+                             list_node,
+                             num_batch = None):
     """
     Return a prototype data instance for the specified type.
 
@@ -111,8 +148,9 @@ def _make_prototype_instance(id_type, list_node):  # pylint: disable=W0613
 
         # Numpy types
         if typeinfo['np'] is not None:
-            if node['shape'] is not None:
-                value = numpy.zeros(shape = node['shape'],
+            shape = _batched_shape(node['shape'], num_batch)
+            if shape is not None:
+                value = numpy.zeros(shape = shape,
                                     dtype = node['typeinfo']['np'],
                                     order = node['memory_order'])
             else:
@@ -136,12 +174,31 @@ def _make_prototype_instance(id_type, list_node):  # pylint: disable=W0613
 
 
 # -----------------------------------------------------------------------------
-def _initializer(id_type, list_node):  # pylint: disable=W0613
+def _batched_shape(shape, num_batch):
+    """
+    Return shape with a leading batch dimension if num_batch is given.
+
+    Scalar fields (with a shape of None) become
+    one dimensional arrays of length num_batch.
+
+    """
+    if num_batch is None:
+        return shape
+    if shape is None:
+        return (num_batch,)
+    return (num_batch,) + tuple(shape)
+
+
+# -----------------------------------------------------------------------------
+def _initializer(id_type,  # pylint: disable=W0613
+                 list_node,
+                 num_batch = None):
     """
     Return an initializer function for the specified type.
 
     """
-    default_initializer_list = _get_initializers_for_all_nodes(list_node)
+    default_initializer_list = _get_initializers_for_all_nodes(list_node,
+                                                               num_batch)
 
     # -------------------------------------------------------------------------
     def _initialize_all_fields(data_structure,
@@ -160,7 +217,7 @@ def _initializer(id_type, list_node):  # pylint: disable=W0613
 
 
 # -----------------------------------------------------------------------------
-def _get_initializers_for_all_nodes(list_node):
+def _get_initializers_for_all_nodes(list_node, num_batch = None):
     """
     Return a list of initializer functions, one for each node in the list.
 
@@ -168,7 +225,7 @@ def _get_initializers_for_all_nodes(list_node):
     blacklist = set(('compound_type',
                      'compound_type_scope_closer'))
 
-    initializer_list = list(_get_initializer_for_one_node(node)
+    initializer_list = list(_get_initializer_for_one_node(node, num_batch)
                                     for node in list_node
                                         if node['category'] not in blacklist)
 
@@ -176,7 +233,7 @@ def _get_initializers_for_all_nodes(list_node):
 
 
 # -----------------------------------------------------------------------------
-def _get_initializer_for_one_node(node):
+def _get_initializer_for_one_node(node, num_batch = None):
     """
     Return an initializer function for the specified node.
 
@@ -185,7 +242,10 @@ def _get_initializer_for_one_node(node):
     dtype = numpy.dtype(node['typeinfo']['id'])
     value = dtype.type(node['preset'])
 
-    if node['shape'] is None:
+    if node['typeinfo']['np'] is None:
+        num_batch = None
+
+    if _batched_shape(node['shape'], num_batch) is None:
 
         # -----------------------------------------------------------------
         def _initialize_one_field(path_dict, path = path, value = value):
@@ -11,9 +11,12 @@ import platform
 import sys
 
 import fl.stableflow.cfg
+import fl.stableflow.cfg.graph
+import fl.stableflow.cfg.slice
 import pl.stableflow.host.util
 import pl.stableflow.log
 import pl.stableflow.proc
+import pl.stableflow.proc.watchdog
 
 
 FIFO_HOST_CONTROL = "stableflow_host_control"
@@ -46,6 +49,30 @@ def stop(cfg):
     return pl.stableflow.host.util.stop(id_system = cfg['system']['id_system'])
 
 
+# -----------------------------------------------------------------------------
+@pl.stableflow.log.logger.catch
+def update(cfg):
+    """
+    Restart only the processes on the local host that are due for update.
+
+    Processes listed in list_id_process_stop are
+    stopped first. Processes listed in
+    list_id_process_start are then started, with
+    new queues for their edges only. All other
+    processes on the host keep running.
+
+    """
+    _setup_host(cfg)
+    pl.stableflow.log.logger.info('Host update')
+    cfg_update = cfg['runtime']['update']
+    for id_process in cfg_update['list_id_process_stop']:
+        pl.stableflow.host.util.stop_process(
+                name_proc = pl.stableflow.proc.fully_qualified_name(
+                                                            cfg, id_process))
+    return _start_all_hosted_processes(
+                cfg, set_id_process = set(cfg_update['list_id_process_start']))
+
+
 # -----------------------------------------------------------------------------
 @pl.stableflow.log.logger.catch
 def pause(cfg):
@@ -70,6 +97,32 @@ def step(cfg):
     return pl.stableflow.host.util.step(id_system = cfg['system']['id_system'])
 
 
+# -----------------------------------------------------------------------------
+@pl.stableflow.log.logger.catch
+def profile(cfg):
+    """
+    Start or stop the sampling profiler for the local host.
+
+    """
+    _setup_host(cfg)
+    pl.stableflow.log.logger.info('Host profile')
+    return pl.stableflow.host.util.profile(
+                                    id_system = cfg['system']['id_system'])
+
+
+# -----------------------------------------------------------------------------
+@pl.stableflow.log.logger.catch
+def memory(cfg):
+    """
+    Report node and queue memory usage for the local host.
+
+    """
+    _setup_host(cfg)
+    pl.stableflow.log.logger.info('Host memory')
+    return pl.stableflow.host.util.memory(
+                                    id_system = cfg['system']['id_system'])
+
+
 # -----------------------------------------------------------------------------
 @pl.stableflow.log.logger.catch
 def get_process_summary(cfg):
@@ -84,6 +137,22 @@ def get_process_summary(cfg):
                                         id_host   = id_host)
 
 
+# -----------------------------------------------------------------------------
+@pl.stableflow.log.logger.catch
+def get_wait_for_graph(cfg):
+    """
+    Print blocked reads and the wait-for graph for the local host.
+
+    """
+    id_host = _setup_host(cfg)
+    pl.stableflow.log.logger.info('Host stalls')
+    return pl.stableflow.host.util.print_wait_for_graph(
+                    id_system = cfg['system']['id_system'],
+                    id_host   = id_host,
+                    dirpath   = pl.stableflow.proc.watchdog.dirpath_status(
+                                        cfg['host'].get(id_host, None)))
+
+
 # -----------------------------------------------------------------------------
 def _setup_host(cfg):
     """
@@ -96,9 +165,9 @@ def _setup_host(cfg):
 
 
 # -----------------------------------------------------------------------------
-def _start_all_hosted_processes(cfg):
+def _start_all_hosted_processes(cfg, set_id_process = None):
     """
-    Start all processes on the local host.
+    Start all processes on the local host, or only those in set_id_process.
 
     """
     # TODO: POSIX event handling.
@@ -111,9 +180,17 @@ def _start_all_hosted_processes(cfg):
         multiprocessing.set_start_method('spawn')
 
     id_host_local = cfg['runtime']['id']['id_host']
-    map_queues    = connect_queues(cfg, id_host_local)
+    map_queues    = connect_queues(cfg, id_host_local, set_id_process)
     map_processes = dict()
 
+    # The graph index is built once, here, and
+    # inherited by each child process, so that
+    # each process only visits its own nodes
+    # and edges when it is configured.
+    #
+    cfg['runtime']['proc']['graph'] = (
+                        fl.stableflow.cfg.graph.GraphIndex.from_cfg(cfg))
+
     # Redirect stdin and stdout
     #
     # sys.stdin.close()
@@ -125,6 +202,8 @@ def _start_all_hosted_processes(cfg):
     # sys.stderr   = file_devnull
 
     for (id_process, cfg_process) in sorted(cfg['process'].items()):
+        if set_id_process is not None and id_process not in set_id_process:
+            continue
         if cfg_process['host'] == id_host_local:
             map_processes[id_process] = _start_one_child_process(
                                                 cfg        = cfg,
@@ -134,15 +213,18 @@ def _start_all_hosted_processes(cfg):
 
 
 # -----------------------------------------------------------------------------
-def connect_queues(cfg, id_host_local):
+def connect_queues(cfg, id_host_local, set_id_process = None):
     """
     Return a map of (id_node, path) to queues.
 
     Start servers and connect clients as required.
+    If set_id_process is given, only edges with
+    an end in one of those processes are
+    connected.
 
     """
     map_cfg_edge    = _index_edge_config(cfg)
-    map_id_by_class = _group_edges_by_class(cfg, id_host_local)
+    map_id_by_class = _group_edges_by_class(cfg, id_host_local, set_id_process)
     map_queues      = _construct_queues(cfg,
                                         map_cfg_edge,
                                         map_id_by_class,
@@ -163,7 +245,7 @@ def _index_edge_config(cfg):
 
 
 # -----------------------------------------------------------------------------
-def _group_edges_by_class(cfg, id_host_local):
+def _group_edges_by_class(cfg, id_host_local, set_id_process = None):
     """
     Return a map of edge ids grouped into ipc, server, or client edge classes.
 
@@ -184,6 +266,12 @@ def _group_edges_by_class(cfg, id_host_local):
         if not is_on_host_local:
             continue
 
+        # Ignore edges that don't impact the processes being started.
+        #
+        if set_id_process is not None and set_id_process.isdisjoint(
+                                                cfg_edge['list_id_process']):
+            continue
+
         # Inter-host (i.e. remote) queues have a server end and a client end.
         #
         if cfg_edge['ipc_type'] == 'inter_host':
@@ -192,6 +280,13 @@ def _group_edges_by_class(cfg, id_host_local):
             else:
                 queue_type = 'inter_host_client'
 
+        # Inter-thread queues are constructed in
+        # the process itself, by pl.stableflow.proc,
+        # as they cannot be passed to a child.
+        #
+        elif cfg_edge['ipc_type'] == 'inter_thread':
+            continue
+
         # Inter-process and intra-process queues are the same class both ends.
         #
         else:
@@ -222,7 +317,7 @@ def _construct_queues(cfg, map_cfg_edge, map_id_by_class, id_host_local):
     #
     map_queues = dict()
     for (id_edge_class, queue_impl) in map_queue_impl.items():
-        for id_edge in map_id_by_class[id_edge_class]:
+        for id_edge in map_id_by_class.get(id_edge_class, ()):
             map_queues[id_edge] = queue_impl(
                                     cfg, map_cfg_edge[id_edge], id_host_local)
 
@@ -234,6 +329,10 @@ def _start_one_child_process(cfg, id_process, map_queues):
     """
     Start a single specified child process.
 
+    The child is given only the slice of the
+    configuration that it needs, together with
+    its own queues, rather than the whole of it.
+
     """
     # name_proc is also used to
     # set process title inside
@@ -241,9 +340,13 @@ def _start_one_child_process(cfg, id_process, map_queues):
     #
     name_proc   = pl.stableflow.proc.fully_qualified_name(cfg, id_process)
     id_host     = cfg['runtime']['id']['id_host']
+    cfg_slice   = fl.stableflow.cfg.slice.for_process(cfg, id_process)
+    map_queues  = dict((cfg_edge['id_edge'], map_queues[cfg_edge['id_edge']])
+                            for cfg_edge in cfg_slice['edge']
+                                if cfg_edge['id_edge'] in map_queues)
     proc        = multiprocessing.Process(
                         target = pl.stableflow.proc.start,
-                        args   = (cfg, id_process, id_host, map_queues),
+                        args   = (cfg_slice, id_process, id_host, map_queues),
                         name   = name_proc)
     proc.daemon = False
     try:
@@ -6,26 +6,54 @@ Module of utilities to support the operation of process hosts.
 
 
 import os
+import time
+import pl.stableflow.proc.watchdog
 import pl.stableflow.signal
 
 import loguru
 import psutil
 
 
+SECS_WAIT_FOR_EXIT = 10.0
+SECS_POLL_FOR_EXIT = 0.05
+
+
 # -----------------------------------------------------------------------------
 def stop(id_system):
     """
     Stop the specified system.
 
+    Returns only once every process in the
+    system has exited, so that the system
+    can safely be started again straight
+    away.
+
     """
     # Does not seem to be killing processes
     # reliably. Do we need to repeat this
     # several times?
     #
-    return _signal_process_by_prefix(
+    _signal_process_by_prefix(
                         prefix      = id_system,
                         iter_signal = (pl.stableflow.signal.exit_ok_controlled,
                                        pl.stableflow.signal.exit_ex_immediate))
+    return _wait_for_exit(prefix = id_system)
+
+
+# -----------------------------------------------------------------------------
+def stop_process(name_proc):
+    """
+    Stop the single process with the specified fully qualified name.
+
+    Returns only once the process has exited.
+
+    """
+    _signal_process_by_prefix(
+                        prefix      = name_proc,
+                        iter_signal = (pl.stableflow.signal.exit_ok_controlled,
+                                       pl.stableflow.signal.exit_ex_immediate),
+                        is_exact    = True)
+    return _wait_for_exit(prefix = name_proc, is_exact = True)
 
 
 # -----------------------------------------------------------------------------
@@ -50,6 +78,28 @@ def step(id_system):
                         iter_signal = (pl.stableflow.signal.control_step,))
 
 
+# -----------------------------------------------------------------------------
+def profile(id_system):
+    """
+    Start or stop the sampling profiler in the specified system.
+
+    """
+    return _signal_process_by_prefix(
+                        prefix      = id_system,
+                        iter_signal = (pl.stableflow.signal.control_profile,))
+
+
+# -----------------------------------------------------------------------------
+def memory(id_system):
+    """
+    Report node and queue memory usage in the specified system.
+
+    """
+    return _signal_process_by_prefix(
+                        prefix      = id_system,
+                        iter_signal = (pl.stableflow.signal.control_memory,))
+
+
 # -----------------------------------------------------------------------------
 def print_process_summary(id_system, id_host):
     """
@@ -83,14 +133,64 @@ def print_process_summary(id_system, id_host):
 
 
 # -----------------------------------------------------------------------------
-def _signal_process_by_prefix(prefix, iter_signal):
+def print_wait_for_graph(id_system, id_host, dirpath):
+    """
+    Print blocked reads and the wait-for graph for the specified system.
+
+    Each process on this host that is blocked
+    in a read is listed with the edge and peer
+    it waits on. Stalled processes form the
+    wait-for graph, and any cycle in it is
+    reported as a deadlock.
+
+    """
+    list_status = pl.stableflow.proc.watchdog.read_status(
+                                        dirpath = dirpath,
+                                        prefix  = id_system + '.')
+    if not list_status:
+        return 0
+
+    (map_wait, list_cycle) = pl.stableflow.proc.watchdog.wait_for_graph(
+                                                                list_status)
+
+    print('\n')
+    print('{id_system}.{id_host}:'.format(
+                                id_system = id_system,
+                                id_host   = id_host))
+    for status in list_status:
+        if not status['list_blocked']:
+            print('   {name}: running'.format(name = status['name']))
+            continue
+        for blocked in status['list_blocked']:
+            print('   {name}: {state} {secs:.1f}s in "{id_node}" '
+                  'on "{id_edge}" <- {peer}'.format(
+                        name    = status['name'],
+                        state   = 'STALLED' if blocked['is_stalled']
+                                            else 'waiting',
+                        secs    = blocked['wait_secs'],
+                        id_node = blocked['id_node'],
+                        id_edge = blocked['id_edge'],
+                        peer    = blocked['peer']['name']))
+    for list_name in list_cycle:
+        print('   DEADLOCK: {cycle}'.format(
+                        cycle = ' -> '.join(list_name + list_name[:1])))
+    print('\n')
+
+    return 0
+
+
+# -----------------------------------------------------------------------------
+def _signal_process_by_prefix(prefix, iter_signal, is_exact = False):
     """
     Send the specified signal to the process with the specified name prefix.
 
+    If is_exact is true, the name must match
+    the prefix exactly.
+
     """
     for signal in iter_signal:
 
-        set_pid   = _pid_from_prefix(prefix)
+        set_pid   = _pid_from_prefix(prefix, is_exact)
         count_pid = len(set_pid)
 
         if count_pid == 0:
@@ -108,14 +208,41 @@ def _signal_process_by_prefix(prefix, iter_signal):
 
 
 # -----------------------------------------------------------------------------
-def _pid_from_prefix(prefix):
+def _wait_for_exit(prefix, is_exact = False):
+    """
+    Wait for all processes with the specified name prefix to exit.
+
+    Processes that are still running after
+    SECS_WAIT_FOR_EXIT are killed. Returns
+    zero once none are left.
+
+    """
+    secs_deadline = time.monotonic() + SECS_WAIT_FOR_EXIT
+    while _pid_from_prefix(prefix, is_exact):
+        if time.monotonic() > secs_deadline:
+            loguru.logger.warning(
+                    'Processes "{prefix}" did not exit; killing.'.format(
+                                                            prefix = prefix))
+            for pid in _pid_from_prefix(prefix, is_exact):
+                try:
+                    psutil.Process(pid).kill()
+                except psutil.NoSuchProcess:
+                    pass
+            secs_deadline = float('inf')
+        time.sleep(SECS_POLL_FOR_EXIT)
+    return 0
+
+
+# -----------------------------------------------------------------------------
+def _pid_from_prefix(prefix, is_exact = False):
     """
     Return a list of process ids that correspond to the specified names.
 
     """
     set_pids  = set()
     for proc in psutil.process_iter(['name', 'pid']):
-        if proc.info['name'].startswith(prefix):
+        name = proc.info['name']
+        if name == prefix or (not is_exact and name.startswith(prefix)):
             set_pids.add(proc.info['pid'])
     return set_pids
 
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Package of classes supporting the memoization of pure nodes.
+
+A node that is a pure function of its inputs
+can be configured to memoize its step. The
+input packets are hashed on each tick, and if
+the same inputs have been seen recently, the
+outputs produced at the time are copied back
+into edge memory and the step function is
+not called.
+
+Numpy arrays are hashed directly from their
+buffers, without copying when contiguous.
+Named packet fields (e.g. the 'ts' timestamp
+of edict packets) can be excluded from the
+hash when the node does not depend on them.
+
+The cache is a bounded LRU of output
+snapshots. Only ticks on which the step
+function signals continue_ok are cached, and
+state is never cached, so nodes that use
+state are not pure and must not be memoized.
+
+"""
+
+
+import collections
+import collections.abc
+import copy
+import hashlib
+import pickle
+
+import pl.stableflow.log
+import pl.stableflow.signal
+
+
+# =============================================================================
+class OutputCache():
+    """
+    Bounded LRU cache of node output snapshots keyed by an input hash.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, size, tup_key_exclude = ()):
+        """
+        Return an OutputCache holding at most size snapshots.
+
+        """
+        self.size            = size
+        self.set_key_exclude = frozenset(tup_key_exclude)
+        self.num_hit         = 0
+        self.num_miss        = 0
+        self._map_entry      = collections.OrderedDict()
+
+    # -------------------------------------------------------------------------
+    def key(self, inputs):
+        """
+        Return a digest of the specified input memory.
+
+        """
+        hasher = hashlib.blake2b(digest_size = 16)
+        for name in sorted(inputs.keys()):
+            hasher.update(repr(name).encode('utf-8'))
+            _update(hasher, inputs[name], self.set_key_exclude)
+        return hasher.digest()
+
+    # -------------------------------------------------------------------------
+    def restore(self, key, outputs):
+        """
+        Copy cached outputs for key into outputs; return None on a miss.
+
+        On a hit, the signals returned by the
+        step function at the time are returned.
+
+        """
+        entry = self._map_entry.get(key, None)
+        if entry is None:
+            self.num_miss += 1
+            return None
+        self._map_entry.move_to_end(key)
+        self.num_hit += 1
+        (map_output, iter_signal) = entry
+        for (name, value) in map_output.items():
+            memory = _copy_into(outputs[name], value)
+            if memory is not outputs[name]:
+                # pylint: disable=W0212
+                outputs._stableflow_framework_internal_setitem(name, memory)
+        return iter_signal
+
+    # -------------------------------------------------------------------------
+    def store(self, key, outputs, iter_signal):
+        """
+        Cache a snapshot of outputs for key, if iter_signal allows it.
+
+        """
+        iter_signal = tuple(iter_signal)
+        if any(sig != pl.stableflow.signal.continue_ok for sig in iter_signal):
+            return
+        self._map_entry[key] = (copy.deepcopy(dict(outputs)), iter_signal)
+        self._map_entry.move_to_end(key)
+        while len(self._map_entry) > self.size:
+            self._map_entry.popitem(last = False)
+
+    # -------------------------------------------------------------------------
+    def clear(self):
+        """
+        Discard all cached snapshots.
+
+        """
+        self._map_entry.clear()
+
+    # -------------------------------------------------------------------------
+    def report(self, id_node):
+        """
+        Log the hit and miss counts for the specified node.
+
+        """
+        pl.stableflow.log.logger.info(
+                'Memoize {id_node}: {hit} hits, {miss} misses',
+                id_node = id_node,
+                hit     = self.num_hit,
+                miss    = self.num_miss)
+
+
+# -----------------------------------------------------------------------------
+def _update(hasher, value, set_key_exclude):
+    """
+    Add the top level packet value to the hash, skipping excluded fields.
+
+    """
+    if isinstance(value, collections.abc.Mapping):
+        hasher.update(b'{')
+        for name in sorted(value.keys(), key = repr):
+            if name in set_key_exclude:
+                continue
+            hasher.update(repr(name).encode('utf-8'))
+            _update_value(hasher, value[name])
+        hasher.update(b'}')
+    else:
+        _update_value(hasher, value)
+
+
+# -----------------------------------------------------------------------------
+def _update_value(hasher, value):
+    """
+    Add an arbitrary value to the hash.
+
+    """
+    if isinstance(value, (str, int, float, bool, bytes, type(None))):
+        hasher.update(type(value).__name__.encode('utf-8'))
+        hasher.update(repr(value).encode('utf-8'))
+    elif hasattr(value, 'dtype') and hasattr(value, 'shape'):
+        hasher.update(str(value.dtype).encode('utf-8'))
+        hasher.update(repr(value.shape).encode('utf-8'))
+        hasher.update(_buffer(value))
+    elif isinstance(value, collections.abc.Mapping):
+        hasher.update(b'{')
+        for name in sorted(value.keys(), key = repr):
+            hasher.update(repr(name).encode('utf-8'))
+            _update_value(hasher, value[name])
+        hasher.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b'[')
+        for item in value:
+            _update_value(hasher, item)
+        hasher.update(b']')
+    else:
+        hasher.update(pickle.dumps(value, protocol = pickle.HIGHEST_PROTOCOL))
+
+
+# -----------------------------------------------------------------------------
+def _buffer(array):
+    """
+    Return the bytes of a numpy array, without a copy where possible.
+
+    """
+    try:
+        return memoryview(array).cast('B')
+    except (TypeError, ValueError):
+        return array.tobytes()
+
+
+# -----------------------------------------------------------------------------
+def _copy_into(dst, src):
+    """
+    Copy src into the existing memory of dst and return the result.
+
+    Edge memory may be aliased by other nodes,
+    so mappings and arrays are updated in
+    place. Other values are replaced by a copy.
+
+    """
+    is_mapping = isinstance(src, collections.abc.Mapping)
+    if is_mapping and isinstance(dst, collections.abc.MutableMapping):
+        for (name, value) in src.items():
+            dst[name] = _copy_into(dst.get(name, None), value)
+        return dst
+    if hasattr(dst, 'shape') and getattr(dst, 'shape', None) == getattr(
+                                                        src, 'shape', None):
+        dst[...] = src
+        return dst
+    return copy.deepcopy(src)
@@ -5,11 +5,17 @@ Package of functions that support the operation of individual compute nodes.
 """
 
 
+import collections.abc
 import functools
 import importlib
+import os
+import os.path
 import sys
 
+import pl.stableflow.checkpoint
 import pl.stableflow.log
+import pl.stableflow.memo
+import pl.stableflow.reload
 import pl.stableflow.signal
 import pl.stableflow.util
 import pl.stableflow.proc
@@ -35,29 +41,62 @@ class Node():  # pylint: disable=R0902
         self.runtime['id']['id_node'] = id_node
 
         self.id_node       = id_node
+        self.id_thread     = cfg_node.get('thread', None)
         self.config        = dict()
         self.inputs        = pl.stableflow.util.RestrictedWriteDict()
         self.state         = dict()
         self.outputs       = pl.stableflow.util.RestrictedWriteDict()
         self.input_queues  = dict()
         self.output_queues = dict()
+        self.recorders     = dict()
+        self.trace_context = None
+        self.idx_step      = 0
 
         try:
             self.config = cfg_node['config']
         except KeyError:
             pass
 
+        (self.is_input_activated,
+         self.tup_name_trigger) = _activation_mode(
+                                    cfg_node.get('activation', 'always'))
+
         (self.fcn_reset,
          self.fcn_step,
          self.fcn_finalize) = _load_functionality(cfg_node['functionality'])
 
+        self.checkpointer = _checkpointer(id_node, cfg_node, self.runtime)
+        self.memo         = _output_cache(cfg_node)
+        self.reloader     = _reloader(cfg_node)
+
     # -------------------------------------------------------------------------
     def reset(self):
         """
         Reset or zeroize node data structures.
 
+        If checkpointing is configured, the latest
+        checkpoint is restored over the freshly
+        reset state, or, with do_skip_reset, in
+        place of calling reset at all, so that
+        expensive warm-up can be avoided.
+
+        Coroutines cannot be checkpointed, so
+        coroutine nodes are always reset, to
+        create the coroutine, and the checkpoint
+        is restored on top.
+
         """
-        iter_signal = _call_reset(
+        checkpointer = self.checkpointer
+        is_skippable = (checkpointer is not None
+                            and checkpointer.do_skip_reset
+                            and self.fcn_step is not _coro_step)
+        do_reset     = True
+        if is_skippable:
+            do_reset = not checkpointer.restore(self.state, self.outputs)
+
+        iter_signal = (pl.stableflow.signal.continue_ok,)
+        if do_reset:
+            iter_signal = _call_reset(
                 id_node   = self.id_node,
                 fcn_reset = self.fcn_reset,
                 runtime   = self.runtime,
@@ -65,6 +104,8 @@ class Node():  # pylint: disable=R0902
                 inputs    = self.inputs,
                 state     = self.state,
                 outputs   = self.outputs)
+            if checkpointer is not None and not is_skippable:
+                checkpointer.restore(self.state, self.outputs)
 
         _prime_feedback(
                 id_node       = self.id_node,
@@ -81,23 +122,122 @@ class Node():  # pylint: disable=R0902
         Step node logic.
 
         """
+        iter_signal_reload = ()
+        if self.reloader is not None:
+            iter_signal_reload = self._maybe_reload()
+            for signal in pl.stableflow.signal.immediate:
+                if signal in iter_signal_reload:
+                    return (signal,)
+
         _dequeue_inputs(
                     input_queues = self.input_queues,
                     input_memory = self.inputs)
 
-        iter_signal = _call_step(
+        if self.recorders:
+            _record_inputs(
+                    recorders    = self.recorders,
+                    input_memory = self.inputs,
+                    idx          = self.idx_step)
+        self.idx_step += 1
+
+        # Nodes which have opted in to input
+        # activation are skipped entirely when
+        # none of their trigger inputs carry an
+        # enabled message this tick. Outputs are
+        # disabled rather than reset so that
+        # downstream nodes do not see stale
+        # messages, and queued outputs are still
+        # sent so that consumers stay in lockstep.
+        #
+        is_idle = self.is_input_activated and not _has_active_input(
+                                    inputs           = self.inputs,
+                                    tup_name_trigger = self.tup_name_trigger)
+        if is_idle:
+            _disable_outputs(self.outputs)
+            _enqueue_outputs(
+                    output_queues = self.output_queues,
+                    output_memory = self.outputs)
+            return tuple(iter_signal_reload) + (
+                                        pl.stableflow.signal.continue_ok,)
+
+        # Memoized nodes skip the step function
+        # when their inputs match a recent tick,
+        # reusing the outputs from that tick.
+        #
+        iter_signal = None
+        if self.memo is not None:
+            key_memo    = self.memo.key(self.inputs)
+            iter_signal = self.memo.restore(key_memo, self.outputs)
+
+        if iter_signal is None:
+            iter_signal = _call_step(
                     id_node  = self.id_node,
                     fcn_step = self.fcn_step,
                     inputs   = self.inputs,
                     state    = self.state,
                     outputs  = self.outputs)
+            if self.memo is not None:
+                self.memo.store(key_memo, self.outputs, iter_signal)
+
+        if self.checkpointer is not None:
+            self.checkpointer.maybe_save(
+                    idx     = self.idx_step,
+                    state   = self.state,
+                    outputs = self.outputs)
 
         _enqueue_outputs(
                     output_queues = self.output_queues,
                     output_memory = self.outputs)
 
+        if iter_signal_reload:
+            iter_signal = tuple(iter_signal_reload) + tuple(iter_signal)
         return iter_signal
 
+    # -------------------------------------------------------------------------
+    def _maybe_reload(self):
+        """
+        Swap in new functionality if the node module has been changed.
+
+        State is preserved, but coroutine nodes,
+        and nodes that change between coroutine
+        and reset/step style, are re-initialized
+        by the new reset, whose signal is then
+        returned. Any memoized outputs are
+        discarded. An empty tuple is returned if
+        reset is not called.
+
+        """
+        module = self.reloader.poll()
+        if module is None:
+            return ()
+
+        is_coro_old = self.fcn_step is _coro_step
+        (self.fcn_reset,
+         self.fcn_step,
+         self.fcn_finalize) = _functions_from_module(module)
+        is_coro_new = self.fcn_step is _coro_step
+
+        if self.memo is not None:
+            self.memo.clear()
+
+        iter_signal = ()
+        if is_coro_old or is_coro_new:
+            coro = self.state.pop('__stableflow_coro__', None)
+            if coro is not None:
+                coro.close()
+            iter_signal = _call_reset(
+                id_node   = self.id_node,
+                fcn_reset = self.fcn_reset,
+                runtime   = self.runtime,
+                config    = self.config,
+                inputs    = self.inputs,
+                state     = self.state,
+                outputs   = self.outputs)
+
+        pl.stableflow.log.logger.info(
+                'Reloaded functionality for id_node = "{id}"',
+                id = self.id_node)
+        return iter_signal
 
     # -------------------------------------------------------------------------
     def finalize(self):
@@ -114,9 +254,138 @@ class Node():  # pylint: disable=R0902
                 state        = self.state,
                 outputs      = self.outputs)
 
+        for recorder in self.recorders.values():
+            recorder.close()
+        self.recorders.clear()
+
+        if self.checkpointer is not None:
+            self.checkpointer.close()
+
+        if self.memo is not None:
+            self.memo.report(self.id_node)
+
         return iter_signal
 
 
+# -----------------------------------------------------------------------------
+def _checkpointer(id_node, cfg_node, runtime):
+    """
+    Return a Checkpointer for the node, or None if it is not configured.
+
+    Checkpoints are written to a directory per
+    node under the dirpath_checkpoint directory
+    of the host, or under the current working
+    directory if none is configured.
+
+    """
+    if 'checkpoint' not in cfg_node:
+        return None
+    cfg_checkpoint = cfg_node['checkpoint']
+    dirpath_root   = runtime['proc'].get('dirpath_checkpoint', None)
+    if not dirpath_root:
+        dirpath_root = os.path.join(os.getcwd(), 'checkpoint')
+    return pl.stableflow.checkpoint.Checkpointer(
+                    dirpath       = os.path.join(dirpath_root, id_node),
+                    id_cfg        = runtime['id'].get('id_cfg', None),
+                    interval      = cfg_checkpoint['interval'],
+                    do_skip_reset = cfg_checkpoint.get('do_skip_reset', False))
+
+
+# -----------------------------------------------------------------------------
+def _output_cache(cfg_node):
+    """
+    Return an OutputCache for the node, or None if it is not memoized.
+
+    """
+    if 'memoize' not in cfg_node:
+        return None
+    cfg_memoize = cfg_node['memoize']
+    return pl.stableflow.memo.OutputCache(
+                    size            = cfg_memoize['size'],
+                    tup_key_exclude = tuple(cfg_memoize.get('exclude', ())))
+
+
+# -----------------------------------------------------------------------------
+def _reloader(cfg_node):
+    """
+    Return a ModuleReloader for the node, or None if it is not reloadable.
+
+    Only nodes loaded from a module can be
+    reloaded, as serialized functionality has
+    no source file to watch.
+
+    """
+    cfg_func = cfg_node['functionality']
+    if not (cfg_node.get('reload', False) and 'py_module' in cfg_func):
+        return None
+    return pl.stableflow.reload.ModuleReloader(
+                                        spec_module = cfg_func['py_module'])
+
+
+# -----------------------------------------------------------------------------
+def _activation_mode(spec_activation):
+    """
+    Return a tuple describing the activation mode of a node.
+
+    The first element is true iff the node is
+    only stepped when at least one trigger input
+    carries an enabled message. The second is a
+    tuple of trigger input names, or None if all
+    inputs act as triggers.
+
+    """
+    if spec_activation == 'always':
+        return (False, None)
+    if spec_activation == 'on_input':
+        return (True, None)
+    return (True, tuple(spec_activation))
+
+
+# -----------------------------------------------------------------------------
+def _has_active_input(inputs, tup_name_trigger):
+    """
+    Return true iff any trigger input carries an enabled message.
+
+    The 'ena' flag of each edict packet acts as
+    the dirty flag for the edge memory. Inputs
+    that do not follow the edict convention are
+    conservatively treated as always active.
+    In batched mode, the flag is an array and
+    the node is active if any instance is.
+
+    """
+    if tup_name_trigger is None:
+        iter_packet = inputs.values()
+    else:
+        iter_packet = (inputs[name] for name in tup_name_trigger
+                                                        if name in inputs)
+    for packet in iter_packet:
+        if not isinstance(packet, collections.abc.Mapping):
+            return True
+        is_ena = packet.get('ena', True)
+        if getattr(is_ena, 'ndim', 0) > 0:
+            is_ena = is_ena.any()
+        if is_ena:
+            return True
+    return False
+
+
+# -----------------------------------------------------------------------------
+def _disable_outputs(outputs):
+    """
+    Clear the 'ena' flag on each edict output packet.
+
+    """
+    for packet in outputs.values():
+        is_edict = isinstance(packet, collections.abc.MutableMapping)
+        if not (is_edict and 'ena' in packet):
+            continue
+        if getattr(packet['ena'], 'ndim', 0) > 0:
+            packet['ena'].fill(False)
+        else:
+            packet['ena'] = False
+
+
 # -------------------------------------------------------------------------
 def _load_functionality(cfg_func):
     """
@@ -157,7 +426,15 @@ def _load_from_module(spec_module):
 
     """
     module = pl.stableflow.proc.ensure_imported(spec_module)  # throws
+    return _functions_from_module(module)
+
+
+# -----------------------------------------------------------------------------
+def _functions_from_module(module):
+    """
+    Return the reset, step and finalize functions defined by module.
 
+    """
     if _is_step(map_func = module.__dict__):
         fcn_reset    = module.reset
         fcn_step     = module.step
@@ -359,6 +636,21 @@ def _dequeue_inputs(input_queues, input_memory):
         _put_ref(input_memory, path, item)
 
 
+# -----------------------------------------------------------------------------
+def _record_inputs(recorders, input_memory, idx):
+    """
+    Append the current message on each recorded input to its edge log.
+
+    Recording is done on the input side so
+    that intra process (shared memory) edges
+    and queue edges are captured in the same
+    way, once per tick, after dequeueing.
+
+    """
+    for (path, recorder) in recorders.items():
+        recorder.append(idx, _get_ref(input_memory, path))
+
+
 # -----------------------------------------------------------------------------
 def _enqueue_outputs(output_queues, output_memory):
     """
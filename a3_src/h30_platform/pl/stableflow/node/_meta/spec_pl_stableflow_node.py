@@ -21,3 +21,324 @@ class SpecifyStableflowNode:
 
         """
         import pl.stableflow.node
+
+
+# =============================================================================
+class SpecifyStableflowNodeActivation:
+    """
+    Spec for input activation of pl.stableflow.node.Node.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_steps_always_by_default(self):
+        """
+        Nodes without an activation option are stepped on every tick.
+
+        """
+        node = _counting_node(cfg_extra = {}, is_ena = False)
+        node.step()
+        assert node.state['count'] == 1
+
+    # -------------------------------------------------------------------------
+    def it_skips_idle_nodes_in_on_input_mode(self):
+        """
+        Input activated nodes are skipped when no input is enabled.
+
+        """
+        node = _counting_node(cfg_extra = {'activation': 'on_input'},
+                              is_ena    = False)
+        node.outputs['output']['ena'] = True
+        node.step()
+        assert node.state['count'] == 0
+        assert node.outputs['output']['ena'] is False
+
+    # -------------------------------------------------------------------------
+    def it_steps_active_nodes_in_on_input_mode(self):
+        """
+        Input activated nodes are stepped when an input is enabled.
+
+        """
+        node = _counting_node(cfg_extra = {'activation': 'on_input'},
+                              is_ena    = True)
+        node.step()
+        assert node.state['count'] == 1
+
+    # -------------------------------------------------------------------------
+    def it_only_considers_named_trigger_inputs(self):
+        """
+        Input activated nodes can be restricted to named trigger inputs.
+
+        """
+        node = _counting_node(cfg_extra = {'activation': ['other']},
+                              is_ena    = True)
+        node.step()
+        assert node.state['count'] == 0
+
+
+
+# =============================================================================
+class SpecifyStableflowNodeCheckpoint:
+    """
+    Spec for checkpointing of pl.stableflow.node.Node.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_restores_state_from_checkpoint_on_warm_restart(self, tmp_path):
+        """
+        A restarted node resumes from its latest checkpoint.
+
+        """
+        runtime   = {'id':   {'id_cfg': '0123abcd'},
+                     'proc': {'dirpath_checkpoint': str(tmp_path)}}
+        cfg_extra = {'checkpoint': {'interval': 2, 'do_skip_reset': True}}
+
+        node = _counting_node(cfg_extra, is_ena = True, runtime = runtime)
+        node.step()
+        node.step()
+        node.step()
+        node.finalize()
+
+        node = _counting_node(cfg_extra, is_ena = True, runtime = runtime)
+        assert node.state['count'] == 2
+
+    # -------------------------------------------------------------------------
+    def it_resets_coroutine_nodes_before_restoring_them(self, tmp_path):
+        """
+        A coroutine node is reset on warm restart, then restored and stepped.
+
+        """
+        runtime   = {'id':   {'id_cfg': '0123abcd'},
+                     'proc': {'dirpath_checkpoint': str(tmp_path)}}
+        cfg_extra = {
+            'checkpoint': {'interval': 2, 'do_skip_reset': True},
+            'functionality': {'py_src': {
+                'coro': 'def coro(runtime, config, inputs, state, outputs):\n'
+                        '    state["count"] = 0\n'
+                        '    while True:\n'
+                        '        inputs = yield (outputs, None)\n'
+                        '        state["count"] += 1\n'}}}
+
+        node = _counting_node(cfg_extra, is_ena = True, runtime = runtime)
+        node.step()
+        node.step()
+        node.step()
+        node.finalize()
+
+        node = _counting_node(cfg_extra, is_ena = True, runtime = runtime)
+        assert node.state['count'] == 2
+        node.step()
+        assert node.state['count'] == 3
+
+
+# =============================================================================
+class SpecifyStableflowNodeMemoize:
+    """
+    Spec for memoization of pl.stableflow.node.Node.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_reuses_cached_outputs_when_inputs_repeat(self):
+        """
+        Memoized nodes only step for inputs not seen recently.
+
+        """
+        cfg_extra = {
+            'memoize': {'size': 4, 'exclude': ['ts']},
+            'functionality': {'py_src': {
+                'reset': 'def reset(runtime, config, inputs, state, outputs):\n'
+                         '    state["count"] = 0\n',
+                'step':  'def step(inputs, state, outputs):\n'
+                         '    state["count"] += 1\n'
+                         '    outputs["output"]["ena"] = '
+                         'inputs["input"]["ena"]\n'}}}
+        node = _counting_node(cfg_extra, is_ena = True)
+
+        for idx in range(3):
+            node.inputs['input']['ts'] = idx
+            node.step()
+        assert node.state['count'] == 1
+        assert node.outputs['output']['ena'] is True
+
+        node.inputs['input']['ena'] = False
+        node.step()
+        node.inputs['input']['ena'] = True
+        node.outputs['output']['ena'] = None
+        node.step()
+        assert node.state['count'] == 2
+        assert node.outputs['output']['ena'] is True
+        assert (node.memo.num_hit, node.memo.num_miss) == (3, 2)
+
+
+# =============================================================================
+class SpecifyStableflowNodeReload:
+    """
+    Spec for hot reload of pl.stableflow.node.Node functionality.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_swaps_in_changed_code_and_keeps_state(self, tmp_path):
+        """
+        A changed module is reloaded between ticks without a reset.
+
+        """
+        import os                  # pylint: disable=C0415
+        import sys                 # pylint: disable=C0415
+        import pl.stableflow.node  # pylint: disable=C0415
+
+        filepath = tmp_path / 'stableflow_reload_spec.py'
+        src      = ('def reset(runtime, config, inputs, state, outputs):\n'
+                    '    state["count"] = 0\n'
+                    'def step(inputs, state, outputs):\n'
+                    '    state["count"] += {inc}\n')
+        filepath.write_text(src.format(inc = 1))
+        sys.path.insert(0, str(tmp_path))
+        try:
+            node = pl.stableflow.node.Node(
+                    id_node  = 'reloading',
+                    cfg_node = {'reload':        True,
+                                'functionality': {
+                                    'py_module': 'stableflow_reload_spec'}},
+                    runtime  = {'id': {}, 'proc': {}})
+            node.reloader.interval_secs = 0.0
+            node.reset()
+            node.step()
+            node.step()
+
+            filepath.write_text(src.format(inc = 10))
+            mtime = os.stat(filepath).st_mtime_ns + 10 ** 9
+            os.utime(filepath, ns = (mtime, mtime))
+            node.step()
+        finally:
+            sys.path.remove(str(tmp_path))
+            sys.modules.pop('stableflow_reload_spec', None)
+
+        assert node.state['count'] == 12
+
+    # -------------------------------------------------------------------------
+    def it_resets_when_the_function_style_changes(self, tmp_path):
+        """
+        A switch from coro to step style calls the new reset, and its signal.
+
+        """
+        import os                    # pylint: disable=C0415
+        import sys                   # pylint: disable=C0415
+        import pl.stableflow.node    # pylint: disable=C0415
+        import pl.stableflow.signal  # pylint: disable=C0415
+
+        filepath = tmp_path / 'stableflow_restyle_spec.py'
+        filepath.write_text(
+                    'def coro(runtime, config, inputs, state, outputs):\n'
+                    '    while True:\n'
+                    '        inputs = yield (outputs, None)\n')
+        sys.path.insert(0, str(tmp_path))
+        try:
+            node = pl.stableflow.node.Node(
+                    id_node  = 'restyling',
+                    cfg_node = {'reload':        True,
+                                'functionality': {
+                                    'py_module': 'stableflow_restyle_spec'}},
+                    runtime  = {'id': {}, 'proc': {}})
+            node.reloader.interval_secs = 0.0
+            node.reset()
+            node.step()
+
+            filepath.write_text(
+                    'import pl.stableflow.signal\n'
+                    'def reset(runtime, config, inputs, state, outputs):\n'
+                    '    state["count"] = 0\n'
+                    '    return (pl.stableflow.signal.exit_ok_controlled,)\n'
+                    'def step(inputs, state, outputs):\n'
+                    '    state["count"] += 1\n')
+            mtime = os.stat(filepath).st_mtime_ns + 10 ** 9
+            os.utime(filepath, ns = (mtime, mtime))
+            iter_signal = node.step()
+        finally:
+            sys.path.remove(str(tmp_path))
+            sys.modules.pop('stableflow_restyle_spec', None)
+
+        assert node.state == {'count': 1}
+        assert pl.stableflow.signal.exit_ok_controlled in iter_signal
+
+    # -------------------------------------------------------------------------
+    def it_keeps_reset_signals_when_the_node_is_idle(self, tmp_path):
+        """
+        Signals from a reset on reload are returned on an idle tick too.
+
+        """
+        import os                    # pylint: disable=C0415
+        import sys                   # pylint: disable=C0415
+        import pl.stableflow.node    # pylint: disable=C0415
+        import pl.stableflow.proc    # pylint: disable=C0415
+        import pl.stableflow.signal  # pylint: disable=C0415
+
+        filepath = tmp_path / 'stableflow_idle_spec.py'
+        filepath.write_text(
+                    'def coro(runtime, config, inputs, state, outputs):\n'
+                    '    while True:\n'
+                    '        inputs = yield (outputs, None)\n')
+        sys.path.insert(0, str(tmp_path))
+        try:
+            node = pl.stableflow.node.Node(
+                    id_node  = 'idle',
+                    cfg_node = {'reload':        True,
+                                'activation':    'on_input',
+                                'functionality': {
+                                    'py_module': 'stableflow_idle_spec'}},
+                    runtime  = {'id': {}, 'proc': {}})
+            pl.stableflow.proc._point(node,
+                                      ('inputs', 'input'),
+                                      {'ena': False})
+            node.reloader.interval_secs = 0.0
+            node.reset()
+            node.step()
+
+            filepath.write_text(
+                    'import pl.stableflow.signal\n'
+                    'def reset(runtime, config, inputs, state, outputs):\n'
+                    '    return (pl.stableflow.signal.exit_ok_controlled,)\n'
+                    'def step(inputs, state, outputs):\n'
+                    '    pass\n')
+            mtime = os.stat(filepath).st_mtime_ns + 10 ** 9
+            os.utime(filepath, ns = (mtime, mtime))
+            iter_signal = node.step()
+        finally:
+            sys.path.remove(str(tmp_path))
+            sys.modules.pop('stableflow_idle_spec', None)
+
+        assert pl.stableflow.signal.exit_ok_controlled in iter_signal
+
+
+# -----------------------------------------------------------------------------
+def _counting_node(cfg_extra, is_ena, runtime = None):
+    """
+    Return a node that counts the number of times it has been stepped.
+
+    """
+    if runtime is None:
+        runtime = {'id': {}, 'proc': {}}
+    import pl.stableflow.node  # pylint: disable=C0415
+    import pl.stableflow.proc  # pylint: disable=C0415
+
+    cfg_node = {
+        'functionality': {
+            'py_src': {
+                'reset': 'def reset(runtime, config, inputs, state, outputs):\n'
+                         '    state["count"] = 0\n',
+                'step':  'def step(inputs, state, outputs):\n'
+                         '    state["count"] += 1\n'
+            }
+        }
+    }
+    cfg_node.update(cfg_extra)
+    node = pl.stableflow.node.Node(id_node  = 'node',
+                                   cfg_node = cfg_node,
+                                   runtime  = runtime)
+    pl.stableflow.proc._point(node, ('inputs',  'input'),  {'ena': is_ena})
+    pl.stableflow.proc._point(node, ('inputs',  'other'),  {'ena': False})
+    pl.stableflow.proc._point(node, ('outputs', 'output'), {'ena': False})
+    node.reset()
+    return node
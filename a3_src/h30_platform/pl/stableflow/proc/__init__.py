@@ -9,24 +9,38 @@ import collections
 import importlib
 import itertools
 import multiprocessing
+import os
+import os.path
 import signal
+import threading
+import time
 
 try:
     import setproctitle
 except ModuleNotFoundError:
     setproctitle = None  # pylint: disable=C0103
 
-import fl.util.alg
+import fl.stableflow.cfg.graph
 
 import pl.stableflow.exception
 import pl.stableflow.gen.python
 import pl.stableflow.log
 import pl.stableflow.node
 import pl.stableflow.proc.mainloop
+import pl.stableflow.proc.memory
+import pl.stableflow.proc.profile
+import pl.stableflow.proc.watchdog
+import pl.stableflow.queue.batch
+import pl.stableflow.queue.spsc
+import pl.stableflow.record
 import pl.stableflow.signal
+import pl.stableflow.trace
 import pl.stableflow.util
 
 
+JOIN_TIMEOUT_SECS = 5.0
+
+
 # -----------------------------------------------------------------------------
 def start(cfg, id_process, id_process_host, map_queues):
     """
@@ -42,22 +56,47 @@ def start(cfg, id_process, id_process_host, map_queues):
                         id_host    = id_process_host,
                         id_process = id_process)
 
+    runtime                        = cfg['runtime']
+    graph                          = runtime['proc'].get('graph', None)
+    if graph is None:
+        graph = fl.stableflow.cfg.graph.GraphIndex.from_cfg(cfg)
     map_cfg_node                   = cfg['node']
-    iter_cfg_edge                  = cfg['edge']
+    iter_cfg_edge                  = graph.list_cfg_edge(id_process)
     map_cfg_data                   = cfg['data']
-    runtime                        = cfg['runtime']
     runtime['id']['id_system']     = id_system
     runtime['id']['id_process']    = id_process
     runtime['id']['id_host']       = id_process_host
     runtime['proc']['list_signal'] = list()  # Signals that need handling
+    runtime['proc']['num_batch']   = cfg['system'].get('num_batch', None)
+    _set_host_options(runtime, cfg['host'].get(id_process_host, dict()))
+    map_queues_thread              = _construct_inter_thread_queues(
+                                    cfg, iter_cfg_edge, id_process_host)
+    map_queues                     = dict(map_queues, **map_queues_thread)
     runtime['proc']['list_node']   = list()
     runtime['proc']['list_node'].extend(_configure(id_process,
                                                    map_cfg_node,
                                                    iter_cfg_edge,
+                                                   graph,
                                                    map_queues,
                                                    map_cfg_data,
                                                    runtime))
 
+    # Blocking reads on input queues are timed
+    # and watched for stalls, if there are any.
+    #
+    watchdog = pl.stableflow.proc.watchdog.Watchdog(
+                    name       = fully_qualified_name(cfg, id_process),
+                    dirpath    = runtime['proc']['dirpath_status'],
+                    stall_secs = runtime['proc']['stall_secs'])
+    is_watched = _configure_watchdog(id_system,
+                                     id_process,
+                                     map_cfg_node,
+                                     iter_cfg_edge,
+                                     runtime['proc']['list_node'],
+                                     watchdog)
+    if is_watched:
+        watchdog.start()
+
     # Add posix signal handler.
     #
     def handle_signal(sig, frame):
@@ -67,11 +106,58 @@ def start(cfg, id_process, id_process_host, map_queues):
     signal.signal(pl.stableflow.signal.control_step,  handle_signal)
     # signal.signal(pl.stableflow.signal.exit_ex_controlled, handle_signal)
 
+    # The sampling profiler is toggled on and
+    # off directly from its signal handler, as
+    # it does not need the mainloop to act.
+    # Errors (e.g. failing to write the output
+    # files) are logged rather than raised in
+    # the interrupted node step.
+    #
+    dirpath_profile = runtime['proc']['dirpath_profile']
+    if not dirpath_profile:
+        dirpath_profile = os.path.join(os.getcwd(), 'profile')
+    profiler = pl.stableflow.proc.profile.Profiler(
+                    dirpath = dirpath_profile,
+                    name    = fully_qualified_name(cfg, id_process))
+
+    def handle_profile_signal(sig, frame):
+        try:
+            profiler.toggle()
+        except Exception:  # pylint: disable=W0703
+            pl.stableflow.log.logger.exception('Profiler toggle failed')
+
+    signal.signal(pl.stableflow.signal.control_profile, handle_profile_signal)
+
+    # Memory reports are likewise produced
+    # directly from the signal handler, while
+    # the node being stepped is suspended.
+    # Errors are logged rather than raised, as
+    # they would otherwise be raised inside the
+    # interrupted node step.
+    #
+    reporter = pl.stableflow.proc.memory.MemoryReporter(
+                    do_tracemalloc = runtime['proc']['do_tracemalloc'])
+
+    def handle_memory_signal(sig, frame):
+        try:
+            reporter.report(tuple(runtime['proc']['list_node']))
+        except Exception:  # pylint: disable=W0703
+            pl.stableflow.log.logger.exception('Memory report failed')
+
+    signal.signal(pl.stableflow.signal.control_memory, handle_memory_signal)
+
     # Enter the main loop (compiled with cython)
     #
-    sig = pl.stableflow.proc.mainloop.run_with_retry(
-                    tup_node    = tuple(runtime['proc']['list_node']),
-                    list_signal = runtime['proc']['list_signal'])
+    sig = _run_threads(list_node   = runtime['proc']['list_node'],
+                       list_signal = runtime['proc']['list_signal'],
+                       tup_queue   = tuple(map_queues_thread.values()))
+    _flush_batches(runtime['proc']['list_batch'])
+    if profiler.is_running:
+        profiler.stop()
+    if is_watched:
+        watchdog.stop()
+    if runtime['proc']['trace'] is not None:
+        runtime['proc']['trace'].report()
     if sig == pl.stableflow.signal.exit_ok_controlled:
         return 0
     elif sig in pl.stableflow.signal.exit:
@@ -80,6 +166,130 @@ def start(cfg, id_process, id_process_host, map_queues):
         raise RuntimeError('Termination condition not recognized.')
 
 
+# -----------------------------------------------------------------------------
+def _construct_inter_thread_queues(cfg, iter_cfg_edge, id_host):
+    """
+    Return a map from edge id to queue for each inter thread edge.
+
+    Inter thread queues hold thread primitives,
+    so they are constructed here, inside the
+    process, rather than by the process host.
+
+    """
+    list_cfg_edge = [cfg_edge for cfg_edge in iter_cfg_edge
+                                if cfg_edge['ipc_type'] == 'inter_thread']
+    if not list_cfg_edge:
+        return dict()
+
+    spec_module = cfg['queue'].get('inter_thread', 'pl.stableflow.queue.spsc')
+    module      = ensure_imported(spec_module)
+    return dict((cfg_edge['id_edge'], module.Queue(cfg, cfg_edge, id_host))
+                                                for cfg_edge in list_cfg_edge)
+
+
+# -----------------------------------------------------------------------------
+def _run_threads(list_node, list_signal, tup_queue):
+    """
+    Run the mainloop for each thread of nodes and return the exit signal.
+
+    Nodes without a thread run on the main
+    thread, which alone handles pause and step
+    signals. If every node has a thread, the
+    first thread of nodes runs on the main
+    thread instead, so that those signals are
+    still handled. Each other thread runs its
+    own mainloop.
+
+    When any mainloop exits, the inter thread
+    queues are closed so that the other threads
+    stop at their next read or write, and the
+    highest priority exit signal of all the
+    threads is returned. A thread that is still
+    blocked (e.g. reading from another process)
+    after JOIN_TIMEOUT_SECS is left behind.
+
+    """
+    map_group = collections.OrderedDict()
+    for node in list_node:
+        map_group.setdefault(node.id_thread, list()).append(node)
+    tup_node_main = tuple(map_group.pop(None, ()))
+    if not tup_node_main and map_group:
+        tup_node_main = tuple(map_group.popitem(last = False)[1])
+
+    if not map_group:
+        return pl.stableflow.proc.mainloop.run_with_retry(
+                                                tup_node    = tup_node_main,
+                                                list_signal = list_signal)
+
+    list_sig    = list()
+    list_thread = list()
+    for (id_thread, list_node_thread) in map_group.items():
+        thread = threading.Thread(target = _run_thread,
+                                  args   = (tuple(list_node_thread),
+                                            list(),
+                                            tup_queue,
+                                            list_sig),
+                                  name   = id_thread,
+                                  daemon = True)
+        thread.start()
+        list_thread.append(thread)
+    _run_thread(tup_node_main, list_signal, tup_queue, list_sig)
+    time_end = time.monotonic() + JOIN_TIMEOUT_SECS
+    for thread in list_thread:
+        thread.join(timeout = max(0.0, time_end - time.monotonic()))
+        if thread.is_alive():
+            pl.stableflow.log.logger.warning(
+                'Thread {name} did not stop within {secs}s',
+                name = thread.name,
+                secs = JOIN_TIMEOUT_SECS)
+
+    for sig in pl.stableflow.signal.exit:
+        if sig in list_sig:
+            return sig
+    return pl.stableflow.signal.exit_ex_controlled
+
+
+# -----------------------------------------------------------------------------
+def _run_thread(tup_node, list_signal, tup_queue, list_sig):
+    """
+    Run the mainloop for one thread of nodes, then close the queues.
+
+    A thread that is stopped by a closed queue
+    finalizes its nodes and exits cleanly.
+
+    """
+    try:
+        sig = pl.stableflow.proc.mainloop.run_with_retry(
+                                                tup_node    = tup_node,
+                                                list_signal = list_signal)
+    except pl.stableflow.queue.spsc.QueueClosed:
+        for node in tup_node:
+            node.finalize()
+        sig = pl.stableflow.signal.exit_ok_controlled
+    except Exception:  # pylint: disable=W0703
+        pl.stableflow.log.logger.exception('Thread mainloop failed')
+        sig = pl.stableflow.signal.exit_ex_immediate
+    list_sig.append(sig)
+    for queue in tup_queue:
+        queue.close()
+
+
+# -----------------------------------------------------------------------------
+def _set_host_options(runtime, cfg_host):
+    """
+    Copy host specific output directories and options into the runtime.
+
+    """
+    for key in ('dirpath_record', 'dirpath_checkpoint', 'dirpath_profile'):
+        runtime['proc'][key] = cfg_host.get(key, None)
+    runtime['proc']['do_tracemalloc'] = cfg_host.get('do_tracemalloc', False)
+    runtime['proc']['dirpath_status'] = (
+                    pl.stableflow.proc.watchdog.dirpath_status(cfg_host))
+    runtime['proc']['stall_secs']     = cfg_host.get(
+                    'stall_secs',
+                    pl.stableflow.proc.watchdog.STALL_SECS_DEFAULT)
+
+
 # -----------------------------------------------------------------------------
 def fully_qualified_name(cfg, id_process):
     """
@@ -108,9 +318,10 @@ def ensure_imported(spec_module):
 
 
 # -----------------------------------------------------------------------------
-def _configure(id_process,
+def _configure(id_process,  # pylint: disable=R0913
                map_cfg_node,
                iter_cfg_edge,
+               graph,
                map_queues,
                map_cfg_data,
                runtime):
@@ -118,7 +329,15 @@ def _configure(id_process,
     Configure the process and return the list of nodes to be executed.
 
     """
-    map_alloc = pl.stableflow.gen.python.map_allocator(map_cfg_data)
+    num_batch = runtime['proc'].get('num_batch', None)
+    if num_batch is not None:
+        _check_vectorized(id_process,
+                          map_cfg_node,
+                          iter_cfg_edge,
+                          map_cfg_data)
+
+    map_alloc = pl.stableflow.gen.python.map_allocator(map_cfg_data,
+                                                       num_batch)
     map_node  = _instantiate_nodes(id_process,
                                    map_cfg_node,
                                    map_alloc,
@@ -130,13 +349,61 @@ def _configure(id_process,
                      map_queues,
                      map_alloc)
 
-    list_node = _get_list_node_in_runorder(id_process,
-                                           map_cfg_node,
-                                           iter_cfg_edge,
-                                           map_node)
+    _configure_batching(id_process,
+                        iter_cfg_edge,
+                        map_node,
+                        runtime)
+
+    _configure_recorders(id_process,
+                         iter_cfg_edge,
+                         map_node,
+                         runtime)
+
+    _configure_tracing(id_process,
+                       iter_cfg_edge,
+                       map_node,
+                       runtime)
+
+    list_node = _get_list_node_in_runorder(id_process, graph, map_node)
     return list_node
 
 
+# -----------------------------------------------------------------------------
+def _check_vectorized(id_process, map_cfg_node, iter_cfg_edge, map_cfg_data):
+    """
+    Raise an error if a node would see batched data without opting in.
+
+    In batched mode, every numpy field gains a
+    leading batch dimension and each node is
+    stepped once per tick for all instances.
+    Nodes that touch numpy data must declare
+    that their step function handles the
+    whole batch by setting is_vectorized.
+    Nodes that only use pure python data
+    (e.g. controllers) are unaffected.
+
+    """
+    set_id_type_batched = (
+            pl.stableflow.gen.python.set_id_type_with_numpy_fields(
+                                                            map_cfg_data))
+    map_set_id_type = collections.defaultdict(set)
+    for cfg_edge in iter_cfg_edge:
+        map_set_id_type[cfg_edge['id_node_src']].add(cfg_edge['data'])
+        map_set_id_type[cfg_edge['id_node_dst']].add(cfg_edge['data'])
+
+    for (id_node, cfg_node) in map_cfg_node.items():
+        if cfg_node['process'] != id_process:
+            continue
+        if cfg_node.get('is_vectorized', False):
+            continue
+        set_id_type = set(map_set_id_type[id_node])
+        set_id_type.add(cfg_node.get('state_type', None))
+        if set_id_type & set_id_type_batched:
+            raise pl.stableflow.exception.NonRecoverableError(
+                cause = 'Node "{id}" uses batched data '
+                        'but is not vectorized.'.format(id = id_node))
+
+
 # -----------------------------------------------------------------------------
 def _instantiate_nodes(id_process, map_cfg_node, map_alloc, runtime):
     """
@@ -178,7 +445,10 @@ def _configure_edges(id_process,
             _point(map_node[id_node_src], relpath_src, memory)
             _point(map_node[id_node_dst], relpath_dst, memory)
 
-        # Inter_process or inter_host comms use a queue.
+        # Inter_thread, inter_process or inter_host
+        # comms use a queue. Both ends of an inter
+        # thread edge are in this process, and each
+        # end gets its own memory.
         else:
 
             queue = map_queues[cfg_edge['id_edge']]
@@ -188,8 +458,10 @@ def _configure_edges(id_process,
                 _point(node, relpath_src, memory)
                 relpath_queue_src = relpath_src[1:]
                 node.output_queues[relpath_queue_src] = queue
+                memory = map_alloc[cfg_edge['data']]()
 
-            else:  # is_dst_end
+            is_dst_end = (id_node_dst in map_node)
+            if is_dst_end:
                 node = map_node[id_node_dst]
                 _point(node, relpath_dst, memory)
                 relpath_queue_dst = relpath_dst[1:]
@@ -197,70 +469,257 @@ def _configure_edges(id_process,
 
 
 # -----------------------------------------------------------------------------
-def _point(node, path, memory):
+def _configure_batching(id_process, iter_cfg_edge, map_node, runtime):
     """
-    Make the specified node and path point to the specified memory.
+    Replace the queues of batched edges with batch writers and readers.
+
+    Batched edges from the same source node to
+    the same destination process, with the same
+    batch options, share one frame, which is
+    sent over the queue of the first edge in
+    the group (the carrier). Both ends group
+    the edges from the same edge list, so they
+    always agree on the carrier.
 
     """
-    ref = node.__dict__
-    for name in path[:-1]:
-        ref = ref[name]
+    map_group = collections.OrderedDict()
+    for cfg_edge in iter_cfg_edge:
 
-    if isinstance(ref, pl.stableflow.util.RestrictedWriteDict):
-        ref._stableflow_framework_internal_setitem(path[-1], memory)
-    else:
-        ref[path[-1]] = memory
+        cfg_batch = cfg_edge.get('batch', None)
+        if not cfg_batch:
+            continue
+        if id_process not in cfg_edge['list_id_process']:
+            continue
+        if cfg_edge['ipc_type'] == 'intra_process':
+            continue
+        if cfg_edge['dirn'] == 'feedback':
+            raise pl.stableflow.exception.NonRecoverableError(
+                cause = 'Feedback edge "{id}" cannot be batched.'.format(
+                                                id = cfg_edge['id_edge']))
+
+        key = (cfg_edge['id_node_src'],
+               cfg_edge['list_id_process'][1],
+               cfg_edge['ipc_type'],
+               cfg_batch.get('ticks', 1),
+               cfg_batch.get('max_delay_secs', None))
+        map_group.setdefault(key, list()).append(cfg_edge)
+
+    runtime['proc']['list_batch'] = list()
+    for (key, list_cfg_edge) in map_group.items():
+
+        (id_node_src, id_process_dst, _, num_tick, max_delay_secs) = key
+        tup_id_edge = tuple(cfg_edge['id_edge'] for cfg_edge in list_cfg_edge)
+
+        if id_node_src in map_node:
+            node    = map_node[id_node_src]
+            map_rel = dict((cfg_edge['id_edge'],
+                            tuple(cfg_edge['relpath_src'])[1:])
+                                            for cfg_edge in list_cfg_edge)
+            group   = pl.stableflow.queue.batch.BatchGroup(
+                        carrier        = node.output_queues[
+                                                    map_rel[tup_id_edge[0]]],
+                        tup_id_edge    = tup_id_edge,
+                        num_tick       = num_tick,
+                        max_delay_secs = max_delay_secs)
+            for id_edge in tup_id_edge:
+                relpath = map_rel[id_edge]
+                node.output_queues[relpath] = (
+                        pl.stableflow.queue.batch.BatchWriter(
+                                        group   = group,
+                                        id_edge = id_edge,
+                                        queue   = node.output_queues[relpath]))
+            runtime['proc']['list_batch'].append(group)
+
+        if id_process_dst != id_process:
+            continue
+        demux = None
+        for cfg_edge in list_cfg_edge:
+            node    = map_node[cfg_edge['id_node_dst']]
+            relpath = tuple(cfg_edge['relpath_dst'])[1:]
+            if demux is None:
+                demux = pl.stableflow.queue.batch.BatchDemux(
+                                    carrier     = node.input_queues[relpath],
+                                    tup_id_edge = tup_id_edge)
+            node.input_queues[relpath] = pl.stableflow.queue.batch.BatchReader(
+                                        demux   = demux,
+                                        id_edge = cfg_edge['id_edge'],
+                                        queue   = node.input_queues[relpath])
 
 
 # -----------------------------------------------------------------------------
-def _get_list_node_in_runorder(id_process,
-                               map_cfg_node,
-                               iter_cfg_edge,
-                               map_node):
+def _flush_batches(iter_group):
     """
-    Return a list of node objects sorted by order of execution.
+    Send any ticks still held by batch writers when the process exits.
 
     """
-    return list(map_node[id_node] for id_node in
-                            _get_list_id_node_in_runorder(
-                                    id_process, map_cfg_node, iter_cfg_edge))
+    for group in iter_group:
+        try:
+            group.flush()
+        except pl.stableflow.queue.spsc.QueueClosed:
+            pass
 
 
 # -----------------------------------------------------------------------------
-def _get_list_id_node_in_runorder(id_process, map_cfg_node, iter_cfg_edge):
+def _configure_recorders(id_process, iter_cfg_edge, map_node, runtime):
     """
-    Return a list of node ids sorted by order of execution.
+    Attach an edge log writer to the destination of each recorded edge.
 
-    Execution order is not fully specified by
-    a breadth-first forwards traversal of the data
-    flow graph, since nodes at the same 'depth'
-    in the graph can be executed in arbitrary order.
+    Logs are written to the dirpath_record
+    directory of the host, or to the current
+    working directory if none is configured.
 
-    To give us the freedom to decide amongst
-    those possible orderings later, we return
-    a list of sets, where each entry in the
-    list is comprised of the set of nodes at
-    the same 'depth' in the graph.
+    """
+    dirpath = runtime['proc'].get('dirpath_record', None) or os.getcwd()
+    for cfg_edge in iter_cfg_edge:
+
+        if not cfg_edge.get('record', False):
+            continue
+        if id_process not in cfg_edge['list_id_process']:
+            continue
+        if cfg_edge['id_node_dst'] not in map_node:
+            continue
+
+        node             = map_node[cfg_edge['id_node_dst']]
+        relpath_dst      = tuple(cfg_edge['relpath_dst'])
+        relpath_recorder = relpath_dst[1:]
+        node.recorders[relpath_recorder] = pl.stableflow.record.EdgeLogWriter(
+                                            dirpath = dirpath,
+                                            id_edge = cfg_edge['id_edge'])
+
+
+# -----------------------------------------------------------------------------
+def _configure_tracing(id_process, iter_cfg_edge, map_node, runtime):
+    """
+    Wrap both ends of each traced queue edge with a TracedQueue.
+
+    Both ends are configured from the same
+    edge list, so the producer and consumer
+    always agree on whether trace headers are
+    attached. Intra process edges are not
+    traced, as they carry no messages.
+
+    """
+    runtime['proc']['trace'] = None
+    for cfg_edge in iter_cfg_edge:
+
+        if not cfg_edge.get('trace', False):
+            continue
+        if id_process not in cfg_edge['list_id_process']:
+            continue
+        if cfg_edge['ipc_type'] == 'intra_process':
+            continue
+
+        collector = runtime['proc']['trace']
+        if collector is None:
+            collector = pl.stableflow.trace.TraceCollector(
+                                        id_host = runtime['id']['id_host'])
+            runtime['proc']['trace'] = collector
+
+        for (key_node, key_relpath, attr) in (
+                        ('id_node_src', 'relpath_src', 'output_queues'),
+                        ('id_node_dst', 'relpath_dst', 'input_queues')):
+            if cfg_edge[key_node] not in map_node:
+                continue
+            node = map_node[cfg_edge[key_node]]
+            if node.trace_context is None:
+                node.trace_context = pl.stableflow.trace.NodeTraceContext()
+            map_queue = getattr(node, attr)
+            relpath   = tuple(cfg_edge[key_relpath])[1:]
+            map_queue[relpath] = pl.stableflow.trace.TracedQueue(
+                                        queue     = map_queue[relpath],
+                                        id_edge   = cfg_edge['id_edge'],
+                                        collector = collector,
+                                        context   = node.trace_context)
 
-    Graphs must be acyclic. If we want to handle
-    feedback loops, this algorithm must be
-    changed to deal with them in an intelligent
-    manner.
 
+# -----------------------------------------------------------------------------
+def _configure_watchdog(id_system,
+                        id_process,
+                        map_cfg_node,
+                        iter_cfg_edge,
+                        iter_node,
+                        watchdog):
     """
-    (map_forward, map_backward) = local_acyclic_data_flow(
-                                            iter_cfg_edge = iter_cfg_edge,
-                                            id_process    = id_process)
+    Wrap each input queue with a WatchedQueue and return true iff any.
+
+    Each wrapper records the node, process and
+    host at the source end of its edge, so that
+    a stall can be attributed to its peer.
+    Edges between threads of this process are
+    not watched, as their peer is the process
+    itself.
 
-    list_tranches = fl.util.alg.topological_sort(map_forward, map_backward)
+    """
+    map_node   = dict((node.id_node, node) for node in iter_node)
+    is_watched = False
+    for cfg_edge in iter_cfg_edge:
 
-    list_id_node  = list(_specify_detailed_execution_order(list_tranches))
+        if id_process not in cfg_edge['list_id_process']:
+            continue
+        if cfg_edge['ipc_type'] in ('intra_process', 'inter_thread'):
+            continue
+        if cfg_edge['id_node_dst'] not in map_node:
+            continue
 
-    list_id_node.extend(sorted(_get_list_id_node_unscheduled(
-                                                        map_cfg_node,
-                                                        list_id_node,
-                                                        id_process)))
-    return list_id_node
+        id_node_src = cfg_edge['id_node_src']
+        id_proc_src = map_cfg_node[id_node_src]['process']
+        id_host_src = cfg_edge['id_host_src']
+        peer        = {'id_node':    id_node_src,
+                       'id_process': id_proc_src,
+                       'id_host':    id_host_src,
+                       'name':       '{sys}.{host}.{proc}'.format(
+                                            sys  = id_system,
+                                            host = id_host_src,
+                                            proc = id_proc_src)}
+
+        node        = map_node[cfg_edge['id_node_dst']]
+        relpath     = tuple(cfg_edge['relpath_dst'])[1:]
+        node.input_queues[relpath] = pl.stableflow.proc.watchdog.WatchedQueue(
+                                        queue    = node.input_queues[relpath],
+                                        watchdog = watchdog,
+                                        id_node  = node.id_node,
+                                        id_edge  = cfg_edge['id_edge'],
+                                        peer     = peer)
+        is_watched  = True
+
+    return is_watched
+
+
+# -----------------------------------------------------------------------------
+def _point(node, path, memory):
+    """
+    Make the specified node and path point to the specified memory.
+
+    """
+    ref = node.__dict__
+    for name in path[:-1]:
+        ref = ref[name]
+
+    if isinstance(ref, pl.stableflow.util.RestrictedWriteDict):
+        ref._stableflow_framework_internal_setitem(path[-1], memory)
+    else:
+        ref[path[-1]] = memory
+
+
+# -----------------------------------------------------------------------------
+def _get_list_node_in_runorder(id_process, graph, map_node):
+    """
+    Return a list of node objects sorted by order of execution.
+
+    Execution order is given by a breadth-first
+    topological sort of the local data flow graph,
+    which is maintained by the graph index. Nodes
+    at the same 'depth' in the graph are executed
+    in order of id_node, and nodes with no local
+    edges are executed last.
+
+    Feedback edges are reversed in the local
+    data flow graph. Nodes on any other cycle
+    cannot be ordered, so also run last.
+
+    """
+    return list(map_node[id_node]
+                    for id_node in graph.list_id_node_in_runorder(id_process))
 
 
 # -----------------------------------------------------------------------------
@@ -292,35 +751,3 @@ def local_acyclic_data_flow(iter_cfg_edge, id_process):
                 map_forward[id_node_dst].add(id_node_src)
 
     return (map_forward, map_backward)
-
-
-# -----------------------------------------------------------------------------
-def _specify_detailed_execution_order(list_tranches):
-    """
-    Yield each node in final execution order.
-
-    Within each tranche, execution order
-    is determined by sorting on the id_node,
-    just to give us a predictable, deterministic
-    execution ordering.
-
-    """
-    for tranche in list_tranches:
-        for id_node in sorted(tranche):
-            yield id_node
-
-
-# -----------------------------------------------------------------------------
-def _get_list_id_node_unscheduled(map_cfg_node, list_id_node, id_process):
-    """
-    Retirm a list of unscheduled node ids in the specified process.
-
-    """
-    set_id_node              = set(list_id_node)
-    list_id_node_unscheduled = list()
-    for (id_node, cfg_node) in map_cfg_node.items():
-        is_in_process = id_process == cfg_node['process']
-        is_scheduled  = (id_node in set_id_node)
-        if is_in_process and (not is_scheduled):
-            list_id_node_unscheduled.append(id_node)
-    return list_id_node_unscheduled
@@ -3,3 +3,590 @@
 Functional specification for the pl.stableflow.proc package.
 
 """
+
+
+# =============================================================================
+class SpecifyStableflowProcBatch:
+    """
+    Spec for batched execution in pl.stableflow.proc.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_rejects_nodes_that_see_batched_data_without_opting_in(self):
+        """
+        Nodes touching numpy data must set is_vectorized in batched mode.
+
+        """
+        import pytest                       # pylint: disable=C0415
+        import fl.stableflow.cfg.data       # pylint: disable=C0415
+        import pl.stableflow.exception      # pylint: disable=C0415
+        import pl.stableflow.proc           # pylint: disable=C0415
+
+        cfg_data = fl.stableflow.cfg.data.denormalize(
+                        {'data': {'sample': [{'value': 'float32'}]}})['data']
+        map_cfg_node = {'a': {'process':       'main',
+                              'state_type':    'sample',
+                              'is_vectorized': True},
+                        'b': {'process':       'main',
+                              'state_type':    None}}
+
+        pl.stableflow.proc._check_vectorized(  # pylint: disable=W0212
+                    'main', map_cfg_node, [], cfg_data)
+
+        map_cfg_node['b']['state_type'] = 'sample'
+        with pytest.raises(pl.stableflow.exception.NonRecoverableError):
+            pl.stableflow.proc._check_vectorized(  # pylint: disable=W0212
+                    'main', map_cfg_node, [], cfg_data)
+
+
+# =============================================================================
+class SpecifyStableflowProcProfile:
+    """
+    Spec for the pl.stableflow.proc.profile sampling profiler.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_attributes_samples_to_the_node_being_stepped(self, tmp_path):
+        """
+        Stack samples are attributed to the active node and written out.
+
+        """
+        import json                        # pylint: disable=C0415
+        import pl.stableflow.node          # pylint: disable=C0415
+        import pl.stableflow.proc.profile  # pylint: disable=C0415
+
+        node     = pl.stableflow.node.Node(id_node  = 'busy',
+                                           cfg_node = _cfg_node_busy(),
+                                           runtime  = {'id': {}, 'proc': {}})
+        profiler = pl.stableflow.proc.profile.Profiler(
+                                            dirpath       = str(tmp_path),
+                                            name          = 'sys.host.proc',
+                                            interval_secs = 0.001)
+        profiler.toggle()
+        for _ in range(4):
+            node.step()
+        profiler.toggle()
+
+        text_collapsed = (tmp_path / 'sys.host.proc.collapsed').read_text()
+        assert text_collapsed.startswith('node:busy;')
+        document = json.loads(
+                    (tmp_path / 'sys.host.proc.speedscope.json').read_text())
+        assert document['profiles'][0]['type'] == 'sampled'
+
+    # -------------------------------------------------------------------------
+    def it_samples_nodes_running_on_other_threads(self, tmp_path):
+        """
+        Nodes stepped off the main thread are sampled while it is blocked.
+
+        """
+        import threading                   # pylint: disable=C0415
+        import pl.stableflow.node          # pylint: disable=C0415
+        import pl.stableflow.proc.profile  # pylint: disable=C0415
+
+        node     = pl.stableflow.node.Node(id_node  = 'blocked',
+                                           cfg_node = _cfg_node_blocked(),
+                                           runtime  = {'id': {}, 'proc': {}})
+        node.reset()
+        profiler = pl.stableflow.proc.profile.Profiler(
+                                            dirpath       = str(tmp_path),
+                                            name          = 'sys.host.proc',
+                                            interval_secs = 0.001)
+        thread   = threading.Thread(target = node.step)
+        thread.start()
+        node.state['entered'].wait()
+
+        profiler._sample()  # pylint: disable=W0212
+        node.state['release'].set()
+        thread.join()
+        profiler.write()
+
+        text_collapsed = (tmp_path / 'sys.host.proc.collapsed').read_text()
+        assert 'node:blocked;' in text_collapsed
+
+    # -------------------------------------------------------------------------
+    def it_samples_from_a_thread_of_its_own(self, tmp_path):
+        """
+        Samples are taken while the main thread is blocked in a join.
+
+        """
+        import threading                   # pylint: disable=C0415
+        import pl.stableflow.node          # pylint: disable=C0415
+        import pl.stableflow.proc.profile  # pylint: disable=C0415
+
+        node     = pl.stableflow.node.Node(id_node  = 'blocked',
+                                           cfg_node = _cfg_node_blocked(),
+                                           runtime  = {'id': {}, 'proc': {}})
+        node.reset()
+        profiler = pl.stableflow.proc.profile.Profiler(
+                                            dirpath       = str(tmp_path),
+                                            name          = 'sys.host.proc',
+                                            interval_secs = 0.001)
+        thread   = threading.Thread(target = node.step)
+        releaser = threading.Thread(target = _release_once_sampled,
+                                    args   = (node, profiler))
+        profiler.toggle()
+        thread.start()
+        releaser.start()
+        thread.join()
+        releaser.join()
+        profiler.toggle()
+
+        text_collapsed = (tmp_path / 'sys.host.proc.collapsed').read_text()
+        assert 'node:blocked;' in text_collapsed
+
+
+# =============================================================================
+class SpecifyStableflowProcMemory:
+    """
+    Spec for the pl.stableflow.proc.memory instrumentation.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_counts_shared_objects_only_once(self):
+        """
+        deep_sizeof follows containers and counts each object once.
+
+        """
+        import pl.stableflow.proc.memory  # pylint: disable=C0415
+
+        payload = list(range(1000))
+        size_1  = pl.stableflow.proc.memory.deep_sizeof({'a': payload})
+        size_2  = pl.stableflow.proc.memory.deep_sizeof({'a': payload,
+                                                         'b': payload})
+        assert size_1 > pl.stableflow.proc.memory.deep_sizeof(payload[:10])
+        assert size_2 - size_1 < 100
+
+    # -------------------------------------------------------------------------
+    def it_reports_each_node_and_tracemalloc_growth(self):
+        """
+        Each node gets a report line, and later reports show growth.
+
+        """
+        import tracemalloc                # pylint: disable=C0415
+        import pl.stableflow.node         # pylint: disable=C0415
+        import pl.stableflow.proc.memory  # pylint: disable=C0415
+
+        cfg_node = {'functionality': {'py_src': {
+                        'reset': 'def reset(runtime, config, inputs, state, '
+                                 'outputs):\n'
+                                 '    state["list"] = list()\n',
+                        'step': 'def step(inputs, state, outputs):\n'
+                                '    state["list"].append(bytes(1000))\n'}}}
+        node     = pl.stableflow.node.Node(id_node  = 'leaky',
+                                           cfg_node = cfg_node,
+                                           runtime  = {'id': {}, 'proc': {}})
+        node.reset()
+        reporter = pl.stableflow.proc.memory.MemoryReporter(
+                                                        do_tracemalloc = True)
+        try:
+            list_first = reporter.report((node,))
+            for _ in range(100):
+                node.step()
+            list_second = reporter.report((node,))
+        finally:
+            tracemalloc.stop()
+
+        assert list_first[0].startswith('memory leaky state=')
+        assert list_first[-1] == 'tracemalloc baseline taken'
+        assert any(line.startswith('tracemalloc ') and '+' in line
+                                                for line in list_second[1:])
+
+
+# =============================================================================
+class SpecifyStableflowProcWatchdog:
+    """
+    Spec for the pl.stableflow.proc.watchdog stall detector.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_reports_a_read_blocked_past_the_threshold(self, tmp_path):
+        """
+        A blocked read is reported with its node, edge and peer.
+
+        """
+        import threading                    # pylint: disable=C0415
+        import pl.stableflow.proc.watchdog  # pylint: disable=C0415
+
+        watchdog = pl.stableflow.proc.watchdog.Watchdog(
+                                            name       = 'sys.host.proc_b',
+                                            dirpath    = str(tmp_path),
+                                            stall_secs = 5.0)
+        queue    = _GatedQueue()
+        peer     = {'id_node': 'node_a', 'id_process': 'proc_a',
+                    'id_host': 'host',   'name':       'sys.host.proc_a'}
+        watched  = pl.stableflow.proc.watchdog.WatchedQueue(
+                                            queue    = queue,
+                                            watchdog = watchdog,
+                                            id_node  = 'node_b',
+                                            id_edge  = 'node_a->node_b',
+                                            peer     = peer)
+        thread   = threading.Thread(target = watched.blocking_read)
+        thread.start()
+        while not watchdog.map_blocked:
+            pass
+
+        (time_start, *_) = watchdog.map_blocked[thread.ident]
+        status = watchdog.check(time_start + 1.0)
+        assert not status['list_blocked'][0]['is_stalled']
+        status = watchdog.check(time_start + 6.0)
+        assert status['list_blocked'][0]['is_stalled']
+        assert status['list_blocked'][0]['peer']['name'] == 'sys.host.proc_a'
+
+        queue.event.set()
+        thread.join()
+        assert watchdog.check()['list_blocked'] == []
+        assert watchdog.map_wait_secs['node_a->node_b'] > 0.0
+
+    # -------------------------------------------------------------------------
+    def it_tracks_concurrent_reads_in_each_thread(self, tmp_path):
+        """
+        Reads blocked in different threads do not hide each other.
+
+        """
+        import threading                    # pylint: disable=C0415
+        import pl.stableflow.proc.watchdog  # pylint: disable=C0415
+
+        watchdog    = pl.stableflow.proc.watchdog.Watchdog(
+                                            name       = 'sys.host.proc_c',
+                                            dirpath    = str(tmp_path),
+                                            stall_secs = 5.0)
+        list_queue  = [_GatedQueue(), _GatedQueue()]
+        list_thread = list()
+        for (idx, queue) in enumerate(list_queue):
+            watched = pl.stableflow.proc.watchdog.WatchedQueue(
+                        queue    = queue,
+                        watchdog = watchdog,
+                        id_node  = 'node_c',
+                        id_edge  = 'edge_{idx}'.format(idx = idx),
+                        peer     = {'id_node':    'node_a',
+                                    'id_process': 'proc_a',
+                                    'id_host':    'host',
+                                    'name':       'sys.host.proc_a'})
+            thread  = threading.Thread(target = watched.blocking_read)
+            thread.start()
+            list_thread.append(thread)
+        while len(watchdog.map_blocked) < 2:
+            pass
+
+        list_queue[0].event.set()
+        list_thread[0].join()
+        status = watchdog.check()
+        assert [blocked['id_edge'] for blocked in status['list_blocked']] == [
+                                                                    'edge_1']
+        list_queue[1].event.set()
+        list_thread[1].join()
+        assert watchdog.check()['list_blocked'] == []
+
+    # -------------------------------------------------------------------------
+    def it_ignores_status_left_by_exited_processes(self, tmp_path):
+        """
+        Status files for processes that are not running are ignored.
+
+        """
+        import json                         # pylint: disable=C0415
+        import os                           # pylint: disable=C0415
+        import subprocess                   # pylint: disable=C0415
+        import sys                          # pylint: disable=C0415
+        import pl.stableflow.proc.watchdog  # pylint: disable=C0415
+
+        with subprocess.Popen([sys.executable, '-c', 'pass']) as proc:
+            proc.wait()
+        for (name, pid) in (('s.h.live',  os.getpid()),
+                            ('s.h.dead',  proc.pid),
+                            ('s.h.stale', os.getpid())):
+            filepath = tmp_path / (name + '.wait.json')
+            filepath.write_text(json.dumps({'name': name, 'pid': pid}))
+        os.utime(tmp_path / 's.h.stale.wait.json', (0, 0))
+
+        list_status = pl.stableflow.proc.watchdog.read_status(
+                                                    dirpath = str(tmp_path),
+                                                    prefix  = 's.h.')
+        assert [status['name'] for status in list_status] == ['s.h.live']
+
+    # -------------------------------------------------------------------------
+    def it_finds_deadlocks_as_cycles_in_the_wait_for_graph(self):
+        """
+        Stalled processes waiting on each other in a cycle are a deadlock.
+
+        """
+        import pl.stableflow.proc.watchdog  # pylint: disable=C0415
+
+        def status(name, *list_name_peer):
+            return {'name':         name,
+                    'list_blocked': [{'is_stalled': True,
+                                      'peer':       {'name': name_peer}}
+                                            for name_peer in list_name_peer]}
+
+        list_status = [status('s.h.a', 's.h.b'),
+                       status('s.h.b', 's.h.a'),
+                       status('s.h.c', 's.h.a'),
+                       status('s.h.d')]
+        (map_wait, list_cycle) = pl.stableflow.proc.watchdog.wait_for_graph(
+                                                                list_status)
+        assert map_wait['s.h.c'] == ['s.h.a']
+        assert list_cycle == [['s.h.a', 's.h.b']]
+
+        # Threads of one process may wait on
+        # different peers at the same time.
+        #
+        list_status = [status('s.h.a', 's.h.d'),
+                       status('s.h.b', 's.h.a'),
+                       status('s.h.c', 's.h.b'),
+                       status('s.h.d', 's.h.c', 's.h.e')]
+        (map_wait, list_cycle) = pl.stableflow.proc.watchdog.wait_for_graph(
+                                                                list_status)
+        assert list_cycle == [['s.h.a', 's.h.d', 's.h.c', 's.h.b']]
+
+
+# -----------------------------------------------------------------------------
+def _cfg_node_busy():
+    """
+    Return the config of a node whose step burns 50ms of CPU time.
+
+    """
+    return {'functionality': {'py_src': {
+                'reset': 'def reset(runtime, config, inputs, state, '
+                         'outputs):\n'
+                         '    pass\n',
+                'step':  'def step(inputs, state, outputs):\n'
+                         '    import time\n'
+                         '    time_end = time.process_time() + 0.05\n'
+                         '    while time.process_time() < time_end:\n'
+                         '        pass\n'}}}
+
+
+# -----------------------------------------------------------------------------
+def _cfg_node_blocked():
+    """
+    Return the config of a node whose step waits for state['release'].
+
+    """
+    return {'functionality': {'py_src': {
+                'reset': 'def reset(runtime, config, inputs, state, '
+                         'outputs):\n'
+                         '    import threading\n'
+                         '    state["entered"] = threading.Event()\n'
+                         '    state["release"] = threading.Event()\n',
+                'step':  'def step(inputs, state, outputs):\n'
+                         '    state["entered"].set()\n'
+                         '    state["release"].wait()\n'}}}
+
+
+# -----------------------------------------------------------------------------
+def _release_once_sampled(node, profiler, timeout_secs = 10.0):
+    """
+    Release the blocked node once the profiler has a sample of it.
+
+    """
+    import time  # pylint: disable=C0415
+
+    map_count = profiler._map_count  # pylint: disable=W0212
+    time_end  = time.monotonic() + timeout_secs
+    while time.monotonic() < time_end:
+        if any(id_node == node.id_node for (id_node, _) in tuple(map_count)):
+            break
+        time.sleep(0.001)
+    node.state['release'].set()
+
+
+# -----------------------------------------------------------------------------
+class _GatedQueue:
+    """
+    Queue whose blocking read waits until its event is set.
+
+    """
+    owner     = 'node_a'
+    direction = 'feedforward'
+
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        """
+        Return a _GatedQueue with its event clear.
+
+        """
+        import threading  # pylint: disable=C0415
+        self.event = threading.Event()
+
+    # -------------------------------------------------------------------------
+    def blocking_read(self):
+        """
+        Wait for the event and return a message.
+
+        """
+        self.event.wait()
+        return 'msg'
+
+
+_RESET_NOOP = '''
+def reset(runtime, config, inputs, state, outputs):
+    import threading
+    state['count'] = 0
+    state['ident'] = threading.get_ident()
+    state['event'] = config.get('event', None)
+'''
+
+_STEP_PRODUCER = '''
+def step(inputs, state, outputs):
+    state['count'] += 1
+    outputs['output']['count'] = state['count']
+'''
+
+_STEP_STOPPER = '''
+def step(inputs, state, outputs):
+    import pl.stableflow.signal
+    return (pl.stableflow.signal.exit_ok_controlled,)
+'''
+
+_STEP_BLOCKED = '''
+def step(inputs, state, outputs):
+    state['event'].wait()
+'''
+
+_STEP_CONSUMER = '''
+def step(inputs, state, outputs):
+    import pl.stableflow.signal
+    state['count'] = inputs['input']['count']
+    if state['count'] >= 50:
+        return (pl.stableflow.signal.exit_ok_controlled,)
+'''
+
+
+# =============================================================================
+class SpecifyStableflowProcThreads:
+    """
+    Spec for running nodes on separate threads within one process.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_runs_threads_connected_by_inter_thread_edges(self):
+        """
+        Nodes on different threads communicate over inter_thread queues.
+
+        """
+        import pl.stableflow.proc  # pylint: disable=C0415
+
+        cfg = _cfg_threads()
+        assert cfg['edge'][0]['ipc_type'] == 'inter_thread'
+
+        retval   = pl.stableflow.proc.start(cfg, 'main', 'localhost', dict())
+        map_node = dict((node.id_node, node)
+                            for node in cfg['runtime']['proc']['list_node'])
+        assert retval == 0
+        assert map_node['consumer'].state['count'] == 50
+        assert map_node['producer'].state['count'] >= 50
+
+    # -------------------------------------------------------------------------
+    def it_delivers_batched_ticks_in_order(self):
+        """
+        A batched edge delivers every tick, in order, in frames of ticks.
+
+        """
+        import pl.stableflow.proc         # pylint: disable=C0415
+        import pl.stableflow.queue.batch  # pylint: disable=C0415
+
+        cfg = _cfg_threads(batch = {'ticks': 5})
+
+        retval   = pl.stableflow.proc.start(cfg, 'main', 'localhost', dict())
+        map_node = dict((node.id_node, node)
+                            for node in cfg['runtime']['proc']['list_node'])
+        queue    = map_node['consumer'].input_queues[('input',)]
+        assert retval == 0
+        assert isinstance(queue, pl.stableflow.queue.batch.BatchReader)
+        assert map_node['consumer'].state['count'] == 50
+
+    # -------------------------------------------------------------------------
+    def it_keeps_one_thread_of_nodes_on_the_main_thread(self):
+        """
+        If every node has a thread, one runs on the main thread for signals.
+
+        """
+        import threading           # pylint: disable=C0415
+        import pl.stableflow.proc  # pylint: disable=C0415
+
+        cfg = _cfg_threads(thread_consumer = 'work')
+
+        retval   = pl.stableflow.proc.start(cfg, 'main', 'localhost', dict())
+        map_node = dict((node.id_node, node)
+                            for node in cfg['runtime']['proc']['list_node'])
+        assert retval == 0
+        assert map_node['consumer'].state['count'] == 50
+        assert threading.get_ident() in (map_node['producer'].state['ident'],
+                                         map_node['consumer'].state['ident'])
+
+    # -------------------------------------------------------------------------
+    def it_stops_waiting_for_threads_that_do_not_stop(self, monkeypatch):
+        """
+        A thread still blocked after the join timeout is left behind.
+
+        """
+        import threading             # pylint: disable=C0415
+        import pl.stableflow.node    # pylint: disable=C0415
+        import pl.stableflow.proc    # pylint: disable=C0415
+        import pl.stableflow.signal  # pylint: disable=C0415
+
+        monkeypatch.setattr(pl.stableflow.proc, 'JOIN_TIMEOUT_SECS', 0.1)
+        event   = threading.Event()
+        stopper = pl.stableflow.node.Node(
+                        id_node  = 'stopper',
+                        cfg_node = {'functionality': {'py_src': {
+                            'reset': _RESET_NOOP,
+                            'step':  _STEP_STOPPER}}},
+                        runtime  = {'id': {}, 'proc': {}})
+        blocked = pl.stableflow.node.Node(
+                        id_node  = 'blocked',
+                        cfg_node = {'thread':        'io',
+                                    'config':        {'event': event},
+                                    'functionality': {'py_src': {
+                                        'reset': _RESET_NOOP,
+                                        'step':  _STEP_BLOCKED}}},
+                        runtime  = {'id': {}, 'proc': {}})
+        try:
+            sig = pl.stableflow.proc._run_threads(  # pylint: disable=W0212
+                                        list_node   = [stopper, blocked],
+                                        list_signal = list(),
+                                        tup_queue   = ())
+        finally:
+            event.set()
+        assert sig == pl.stableflow.signal.exit_ok_controlled
+
+
+# -----------------------------------------------------------------------------
+def _cfg_threads(thread_consumer = None, **kwargs_edge):
+    """
+    Return a denormalized producer/consumer cfg with a node on a thread.
+
+    """
+    import fl.stableflow.cfg  # pylint: disable=C0415
+
+    def cfg_node(step, **kwargs):
+        return dict(process       = 'main',
+                    state_type    = 'python_dict',
+                    functionality = {'requirement': 'some_requirement',
+                                     'py_src': {'reset': _RESET_NOOP,
+                                                'step':  step}},
+                    **kwargs)
+
+    map_cfg = {
+        'system':  {'id_system': 'stableflow_thread_test'},
+        'host':    {'localhost': {'hostname':       '127.0.0.1',
+                                  'acct_run':       'stableflow',
+                                  'acct_provision': 'stableflow'}},
+        'process': {'main': {'host': 'localhost'}},
+        'node':    {'producer': cfg_node(_STEP_PRODUCER, thread = 'io'),
+                    'consumer': cfg_node(_STEP_CONSUMER)},
+        'edge':    [dict(owner = 'producer',
+                         data  = 'python_dict',
+                         src   = 'producer.outputs.output',
+                         dst   = 'consumer.inputs.input',
+                         **kwargs_edge)],
+        'requirement': {'some_requirement': {'how_to_install'}},
+        'data':    {'python_dict': 'py_dict'}}
+    if thread_consumer is not None:
+        map_cfg['node']['consumer']['thread'] = thread_consumer
+    cfg = fl.stableflow.cfg.prepare(map_cfg = map_cfg)
+    return fl.stableflow.cfg.denormalize(cfg)
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Module supporting on-demand memory instrumentation of a stableflow process.
+
+On request, the approximate deep size of the
+state, inputs and outputs of every node in
+the process is reported, together with the
+backlog of each of its queues, so that the
+node that owns a growing data structure can
+be identified without restarting the system.
+
+Optionally, tracemalloc snapshots are taken
+on successive requests, and the allocation
+sites that grew the most between the two
+most recent requests are reported as well.
+
+Sizes are approximate: shared objects are
+only counted once within each of state,
+inputs and outputs, but edge memory that is
+shared between nodes appears in the outputs
+of one node and the inputs of another.
+
+"""
+
+
+import collections.abc
+import sys
+import tracemalloc
+
+import pl.stableflow.log
+
+
+NUM_TRACEMALLOC_FRAMES = 10
+NUM_TRACEMALLOC_TOP    = 10
+
+
+# =============================================================================
+class MemoryReporter():
+    """
+    Report node memory usage and, optionally, tracemalloc differences.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, do_tracemalloc = False):
+        """
+        Return a MemoryReporter.
+
+        """
+        self.do_tracemalloc = do_tracemalloc
+        self._snapshot      = None
+
+    # -------------------------------------------------------------------------
+    def report(self, tup_node):
+        """
+        Log a memory report for the specified nodes and return it.
+
+        The report is a list of lines. The first
+        request starts tracemalloc if enabled;
+        each later request adds the top allocation
+        differences since the previous request.
+
+        """
+        list_line = [node_summary(node) for node in tup_node]
+
+        if self.do_tracemalloc or tracemalloc.is_tracing():
+            list_line.extend(self._tracemalloc_diff())
+
+        for line in list_line:
+            pl.stableflow.log.logger.info(line)
+        return list_line
+
+    # -------------------------------------------------------------------------
+    def _tracemalloc_diff(self):
+        """
+        Return lines describing allocation growth since the last snapshot.
+
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(NUM_TRACEMALLOC_FRAMES)
+
+        snapshot_prev  = self._snapshot
+        self._snapshot = tracemalloc.take_snapshot()
+        if snapshot_prev is None:
+            return ['tracemalloc baseline taken']
+
+        list_stat = self._snapshot.compare_to(snapshot_prev, 'lineno')
+        return ['tracemalloc {stat}'.format(stat = stat)
+                                for stat in list_stat[:NUM_TRACEMALLOC_TOP]]
+
+
+# -----------------------------------------------------------------------------
+def node_summary(node):
+    """
+    Return a one line summary of the memory used by the specified node.
+
+    """
+    list_queue = list()
+    for (prefix, map_queue) in (('in',  node.input_queues),
+                                ('out', node.output_queues)):
+        for (path, queue) in map_queue.items():
+            list_queue.append('{dirn}:{path}={size}'.format(
+                                        dirn = prefix,
+                                        path = '.'.join(path),
+                                        size = _approx_backlog(queue)))
+
+    return ('memory {id_node} state={state} inputs={inputs} '
+            'outputs={outputs} queues=[{queues}]').format(
+                                    id_node = node.id_node,
+                                    state   = deep_sizeof(node.state),
+                                    inputs  = deep_sizeof(node.inputs),
+                                    outputs = deep_sizeof(node.outputs),
+                                    queues  = ' '.join(list_queue))
+
+
+# -----------------------------------------------------------------------------
+def deep_sizeof(obj):
+    """
+    Return the approximate size in bytes of obj and everything it refers to.
+
+    Containers, mappings and the attribute
+    dicts and slots of objects are followed.
+    Each object is counted once. Modules,
+    classes and functions are not followed.
+
+    """
+    set_id_seen = set()
+    list_stack  = [obj]
+    num_bytes   = 0
+
+    while list_stack:
+
+        item = list_stack.pop()
+        if id(item) in set_id_seen or _is_shared(item):
+            continue
+        set_id_seen.add(id(item))
+        num_bytes += sys.getsizeof(item, 0)
+
+        if isinstance(item, (str, bytes, bytearray)):
+            continue
+
+        if isinstance(item, collections.abc.Mapping):
+            for (key, value) in item.items():
+                list_stack.append(key)
+                list_stack.append(value)
+        elif isinstance(item, (list, tuple, set, frozenset,
+                               collections.deque)):
+            list_stack.extend(item)
+
+        if hasattr(item, '__dict__'):
+            list_stack.append(vars(item))
+        for name in getattr(type(item), '__slots__', ()):
+            if hasattr(item, name):
+                list_stack.append(getattr(item, name))
+
+    return num_bytes
+
+
+# -----------------------------------------------------------------------------
+def _is_shared(item):
+    """
+    Return true iff item is module or type level, so not owned by a node.
+
+    """
+    return isinstance(item, (type,
+                             type(sys),
+                             type(deep_sizeof),
+                             type(len)))
+
+
+# -----------------------------------------------------------------------------
+def _approx_backlog(queue):
+    """
+    Return the approximate number of messages in the queue, or '?'.
+
+    """
+    try:
+        return queue.approx_size()
+    except (NotImplementedError, AttributeError):
+        return '?'
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Module supporting low overhead sampling profiling of a stableflow process.
+
+A daemon thread wakes up periodically (in
+wall clock time) and samples the stack of
+every other thread. Each sample is
+attributed to the node that was being
+stepped, reset or finalized at the time,
+which is found by walking the stack back to
+the corresponding Node method, so nothing is
+added to the hot path of the mainloop itself.
+
+A signal based timer is not used, as signal
+handlers only run on the main thread, and
+not at all while it is blocked (e.g. joining
+node threads or waiting on a queue), so node
+threads would go unsampled.
+
+The stack of the main thread is sampled
+whatever it is doing. The stacks of other
+threads are only sampled while they are
+inside a node, so that threads which are
+idle, or which belong to the framework (e.g.
+the watchdog), do not add samples. A node
+thread that blocks inside its step is still
+sampled.
+
+When profiling is stopped, the aggregated
+samples are written to the profiling
+directory in both collapsed-stack format
+(for flamegraph.pl and similar tools) and
+speedscope JSON format.
+
+"""
+
+
+import json
+import os
+import os.path
+import sys
+import threading
+
+import pl.stableflow.log
+import pl.stableflow.node
+
+
+INTERVAL_SECS_DEFAULT = 0.005
+NAME_FRAMEWORK        = '[stableflow]'
+
+
+# =============================================================================
+class Profiler():
+    """
+    Sampling profiler attributing stack samples to stableflow nodes.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 dirpath,
+                 name,
+                 interval_secs = INTERVAL_SECS_DEFAULT):
+        """
+        Return a Profiler that writes <name>.* output files to dirpath.
+
+        """
+        self.dirpath       = dirpath
+        self.name          = name
+        self.interval_secs = interval_secs
+        self.is_running    = False
+        self._map_count    = dict()
+        self._thread       = None
+        self._event_stop   = threading.Event()
+        self._set_code_node = frozenset((
+                                pl.stableflow.node.Node.step.__code__,
+                                pl.stableflow.node.Node.reset.__code__,
+                                pl.stableflow.node.Node.finalize.__code__))
+
+    # -------------------------------------------------------------------------
+    def toggle(self):
+        """
+        Start profiling if stopped, otherwise stop and write the output.
+
+        """
+        if self.is_running:
+            self.stop()
+        else:
+            self.start()
+
+    # -------------------------------------------------------------------------
+    def start(self):
+        """
+        Start sampling, discarding any previously collected samples.
+
+        """
+        self._map_count.clear()
+        self._event_stop.clear()
+        self._thread = threading.Thread(target = self._run,
+                                        name   = 'stableflow_profiler',
+                                        daemon = True)
+        self._thread.start()
+        self.is_running = True
+        pl.stableflow.log.logger.info('Profiling started')
+
+    # -------------------------------------------------------------------------
+    def stop(self):
+        """
+        Stop sampling and write the collected samples to disk.
+
+        """
+        self._event_stop.set()
+        self._thread.join()
+        self._thread    = None
+        self.is_running = False
+        self.write()
+        pl.stableflow.log.logger.info(
+            'Profiling stopped: {num} samples written to "{dirpath}"',
+            num     = sum(self._map_count.values()),
+            dirpath = self.dirpath)
+
+    # -------------------------------------------------------------------------
+    def write(self):
+        """
+        Write collapsed-stack and speedscope files for the samples so far.
+
+        """
+        os.makedirs(self.dirpath, exist_ok = True)
+        filepath = os.path.join(self.dirpath, self.name)
+        with open(filepath + '.collapsed', 'w', encoding = 'utf-8') as file:
+            file.write(collapsed(self._map_count))
+        with open(filepath + '.speedscope.json', 'w',
+                  encoding = 'utf-8') as file:
+            json.dump(speedscope(self._map_count, self.name), file)
+
+    # -------------------------------------------------------------------------
+    def _run(self):
+        """
+        Take a sample every interval_secs until stopped.
+
+        """
+        while not self._event_stop.wait(self.interval_secs):
+            self._sample()
+
+    # -------------------------------------------------------------------------
+    def _sample(self):
+        """
+        Record one sample of the stack of each thread but the current one.
+
+        """
+        ident_self = threading.get_ident()
+        ident_main = threading.main_thread().ident
+        map_frame  = sys._current_frames()  # pylint: disable=W0212
+        for (ident, frame) in map_frame.items():
+            if ident != ident_self:
+                self._record(frame, is_required = ident == ident_main)
+
+    # -------------------------------------------------------------------------
+    def _record(self, frame, is_required):
+        """
+        Record a sample of the stack, unless outside a node and not required.
+
+        """
+        list_code = list()
+        id_node   = None
+        while frame is not None:
+            code = frame.f_code
+            if code in self._set_code_node:
+                id_node = getattr(frame.f_locals.get('self'), 'id_node', None)
+                break
+            list_code.append(code)
+            frame = frame.f_back
+
+        if id_node is None and not is_required:
+            return
+        key = (id_node, tuple(reversed(list_code)))
+        self._map_count[key] = self._map_count.get(key, 0) + 1
+
+
+# -----------------------------------------------------------------------------
+def collapsed(map_count):
+    """
+    Return samples in collapsed-stack format, one stack per line.
+
+    """
+    list_line = list()
+    for ((id_node, tup_code), count) in sorted(
+                                        map_count.items(),
+                                        key = lambda item: -item[1]):
+        list_name = [_node_frame_name(id_node)]
+        list_name.extend(_code_frame_name(code) for code in tup_code)
+        list_line.append('{stack} {count}\n'.format(
+                                                stack = ';'.join(list_name),
+                                                count = count))
+    return ''.join(list_line)
+
+
+# -----------------------------------------------------------------------------
+def speedscope(map_count, name):
+    """
+    Return samples as a speedscope sampled profile document.
+
+    """
+    list_frame = list()
+    map_idx    = dict()
+
+    def idx_frame(key, frame):
+        if key not in map_idx:
+            map_idx[key] = len(list_frame)
+            list_frame.append(frame)
+        return map_idx[key]
+
+    list_sample = list()
+    list_weight = list()
+    for ((id_node, tup_code), count) in map_count.items():
+        sample = [idx_frame(('node', id_node),
+                            {'name': _node_frame_name(id_node)})]
+        for code in tup_code:
+            sample.append(idx_frame(code, {'name': code.co_name,
+                                           'file': code.co_filename,
+                                           'line': code.co_firstlineno}))
+        list_sample.append(sample)
+        list_weight.append(count)
+
+    return {
+        '$schema':  'https://www.speedscope.app/file-format-schema.json',
+        'name':     name,
+        'exporter': 'stableflow',
+        'shared':   {'frames': list_frame},
+        'profiles': [{'type':       'sampled',
+                      'name':       name,
+                      'unit':       'none',
+                      'startValue': 0,
+                      'endValue':   sum(list_weight),
+                      'samples':    list_sample,
+                      'weights':    list_weight}]
+    }
+
+
+# -----------------------------------------------------------------------------
+def _node_frame_name(id_node):
+    """
+    Return the name of the root frame representing a node.
+
+    """
+    if id_node is None:
+        return NAME_FRAMEWORK
+    return 'node:{id}'.format(id = id_node)
+
+
+# -----------------------------------------------------------------------------
+def _code_frame_name(code):
+    """
+    Return a collapsed-stack frame name for the specified code object.
+
+    """
+    return '{name} ({file}:{line})'.format(
+                                    name = code.co_name,
+                                    file = code.co_filename,
+                                    line = code.co_firstlineno).replace(';', ':')
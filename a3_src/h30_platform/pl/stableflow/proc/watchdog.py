@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+Module supporting stall and deadlock detection in a stableflow process.
+
+Every blocking read on an input queue is
+timed, so that the total time each edge has
+spent waiting is known, and the read that
+each thread of the process is currently
+blocked in (if any) is recorded together with
+the node, process and host at the other end
+of the edge.
+
+A background thread checks the current reads
+periodically. When one has been blocked for
+longer than the configured threshold, the
+stall is logged, once, along with the peer
+that is expected to supply the message.
+
+The thread also writes a small status file
+for the process, which the host level view
+reads to build a wait-for graph between the
+processes on the host, in which a cycle of
+stalled processes indicates a deadlock.
+Status files that were left behind by a
+process that has since exited are ignored.
+
+"""
+
+
+import json
+import os
+import os.path
+import tempfile
+import threading
+import time
+
+import pl.stableflow.log
+
+
+STALL_SECS_DEFAULT = 10.0
+STALE_SECS_STATUS  = 10.0
+SUFFIX_STATUS      = '.wait.json'
+
+
+# -----------------------------------------------------------------------------
+def dirpath_status(cfg_host):
+    """
+    Return the directory that process status files are written to.
+
+    """
+    dirpath = cfg_host.get('dirpath_status', None) if cfg_host else None
+    if not dirpath:
+        dirpath = os.path.join(tempfile.gettempdir(), 'stableflow', 'status')
+    return dirpath
+
+
+# =============================================================================
+class Watchdog():  # pylint: disable=R0902
+    """
+    Wait time accounting and stall detection for a single process.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, name, dirpath, stall_secs = STALL_SECS_DEFAULT):
+        """
+        Return a Watchdog for the process with the fully qualified name.
+
+        """
+        self.name          = name
+        self.filepath      = os.path.join(dirpath, name + SUFFIX_STATUS)
+        self.stall_secs    = stall_secs
+        self.interval_secs = min(1.0, stall_secs / 2.0)
+        self.map_wait_secs = dict()
+        self.map_blocked   = dict()  # ident -> (time_start, id_node, ...)
+        self._set_reported = set()   # (ident, time_start) of logged stalls
+        self._event_stop   = threading.Event()
+        self._thread       = None
+
+    # -------------------------------------------------------------------------
+    def start(self):
+        """
+        Start the background watchdog thread.
+
+        """
+        os.makedirs(os.path.dirname(self.filepath), exist_ok = True)
+        self._thread = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+    # -------------------------------------------------------------------------
+    def stop(self):
+        """
+        Stop the background thread and remove the status file.
+
+        """
+        self._event_stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            os.remove(self.filepath)
+        except FileNotFoundError:
+            pass
+
+    # -------------------------------------------------------------------------
+    def check(self, time_now = None):
+        """
+        Log a stall if any current read has waited too long; return status.
+
+        The list_blocked entry of the status holds
+        one item for each thread that is blocked
+        in a read, longest waiting first.
+
+        """
+        if time_now is None:
+            time_now = time.monotonic()
+        status = {'name':          self.name,
+                  'pid':           os.getpid(),
+                  'stall_secs':    self.stall_secs,
+                  'list_blocked':  list(),
+                  'map_wait_secs': dict(self.map_wait_secs)}
+
+        set_reported = set()
+        for (ident, blocked) in sorted(tuple(self.map_blocked.items()),
+                                       key = lambda item: item[1][0]):
+            (time_start, id_node, id_edge, peer) = blocked
+            wait_secs  = time_now - time_start
+            is_stalled = wait_secs >= self.stall_secs
+            status['list_blocked'].append({'id_node':    id_node,
+                                           'id_edge':    id_edge,
+                                           'wait_secs':  wait_secs,
+                                           'is_stalled': is_stalled,
+                                           'peer':       peer})
+            if not is_stalled:
+                continue
+            key = (ident, time_start)
+            set_reported.add(key)
+            if key not in self._set_reported:
+                pl.stableflow.log.logger.warning(
+                    'Stall in {name}: node "{id_node}" has waited '
+                    '{secs:.1f}s on edge "{id_edge}" for node "{id_peer}" '
+                    'in process "{proc_peer}" on host "{host_peer}"',
+                    name      = self.name,
+                    id_node   = id_node,
+                    secs      = wait_secs,
+                    id_edge   = id_edge,
+                    id_peer   = peer['id_node'],
+                    proc_peer = peer['id_process'],
+                    host_peer = peer['id_host'])
+
+        if self._set_reported - set_reported:
+            pl.stableflow.log.logger.warning(
+                'Stall cleared in {name}', name = self.name)
+        self._set_reported = set_reported
+        return status
+
+    # -------------------------------------------------------------------------
+    def _run(self):
+        """
+        Check for stalls and write the status file until stopped.
+
+        """
+        while not self._event_stop.wait(self.interval_secs):
+            status       = self.check()
+            filepath_tmp = self.filepath + '.tmp'
+            try:
+                with open(filepath_tmp, 'w', encoding = 'utf-8') as file:
+                    json.dump(status, file)
+                os.replace(filepath_tmp, self.filepath)
+            except OSError:
+                pass
+
+
+# =============================================================================
+class WatchedQueue():
+    """
+    Queue wrapper that accounts for the time spent in blocking reads.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self,  # pylint: disable=R0913
+                 queue,
+                 watchdog,
+                 id_node,
+                 id_edge,
+                 peer):
+        """
+        Return a WatchedQueue wrapping the specified queue.
+
+        """
+        self.owner     = queue.owner
+        self.direction = queue.direction
+        self.queue     = queue
+        self.watchdog  = watchdog
+        self.id_node   = id_node
+        self.id_edge   = id_edge
+        self.peer      = peer
+        watchdog.map_wait_secs.setdefault(id_edge, 0.0)
+
+    # -------------------------------------------------------------------------
+    def blocking_read(self):
+        """
+        Return the next item from the wrapped queue, timing the wait.
+
+        Each thread has its own entry in the
+        watchdog, so that concurrent reads in
+        different threads are all seen.
+
+        """
+        watchdog   = self.watchdog
+        ident      = threading.get_ident()
+        time_start = time.monotonic()
+        watchdog.map_blocked[ident] = (time_start,
+                                       self.id_node,
+                                       self.id_edge,
+                                       self.peer)
+        try:
+            return self.queue.blocking_read()
+        finally:
+            del watchdog.map_blocked[ident]
+            watchdog.map_wait_secs[self.id_edge] += (time.monotonic()
+                                                                - time_start)
+
+    # -------------------------------------------------------------------------
+    def non_blocking_write(self, msg):
+        """
+        Write to the wrapped queue.
+
+        """
+        return self.queue.non_blocking_write(msg)
+
+    # -------------------------------------------------------------------------
+    def approx_size(self):
+        """
+        Return the approximate size of the wrapped queue.
+
+        """
+        return self.queue.approx_size()
+
+
+# -----------------------------------------------------------------------------
+def read_status(dirpath, prefix):
+    """
+    Return the status of each process with the specified name prefix.
+
+    Status files that have not been updated
+    for STALE_SECS_STATUS, or whose process
+    is no longer running, are left behind by
+    a process that did not exit cleanly, and
+    are ignored.
+
+    """
+    list_status = list()
+    try:
+        list_filename = sorted(os.listdir(dirpath))
+    except FileNotFoundError:
+        return list_status
+    time_now = time.time()
+    for filename in list_filename:
+        if not (filename.startswith(prefix)
+                and filename.endswith(SUFFIX_STATUS)):
+            continue
+        filepath = os.path.join(dirpath, filename)
+        try:
+            if time_now - os.path.getmtime(filepath) > STALE_SECS_STATUS:
+                continue
+            with open(filepath, encoding = 'utf-8') as file:
+                status = json.load(file)
+        except (OSError, ValueError):
+            continue
+        if _is_running(status.get('pid', None)):
+            list_status.append(status)
+    return list_status
+
+
+# -----------------------------------------------------------------------------
+def wait_for_graph(list_status):
+    """
+    Return the wait-for graph of stalled processes and any deadlocks in it.
+
+    The graph maps the name of each stalled
+    process to a sorted list of the names of
+    the processes that it is waiting on. A
+    process with several threads may wait on
+    more than one at a time. Each deadlock is
+    a set of processes that all wait on each
+    other, returned as a list of names in the
+    order in which the waits reach them.
+
+    """
+    map_wait = dict()
+    for status in list_status:
+        set_name = set(blocked['peer']['name']
+                            for blocked in status.get('list_blocked', ())
+                                if blocked['is_stalled'])
+        if set_name:
+            map_wait[status['name']] = sorted(set_name)
+
+    list_cycle = list()
+    set_done   = set()
+    for name_start in sorted(map_wait):
+        if name_start in set_done:
+            continue
+        list_reach = _list_reachable(name_start, map_wait)
+        if name_start not in list_reach:
+            continue
+        list_name = [name_start] + [
+                name for name in list_reach
+                    if name != name_start
+                        and name_start in _list_reachable(name, map_wait)]
+        set_done.update(list_name)
+        list_cycle.append(list_name)
+
+    return (map_wait, list_cycle)
+
+
+# -----------------------------------------------------------------------------
+def _list_reachable(name_start, map_wait):
+    """
+    Return the names reachable by waits from name_start, in order of visit.
+
+    """
+    list_name = list()
+    set_seen  = set()
+    stack     = list(reversed(map_wait.get(name_start, ())))
+    while stack:
+        name = stack.pop()
+        if name in set_seen:
+            continue
+        set_seen.add(name)
+        list_name.append(name)
+        stack.extend(reversed(map_wait.get(name, ())))
+    return list_name
+
+
+# -----------------------------------------------------------------------------
+def _is_running(pid):
+    """
+    Return true if a process with the specified pid is running.
+
+    """
+    if not isinstance(pid, int):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -3,3 +3,198 @@
 Functional specification for the pl.stableflow.queue package.
 
 """
+
+
+# =============================================================================
+class SpecifyStableflowQueueSpsc:
+    """
+    Spec for the pl.stableflow.queue.spsc inter thread queue.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_passes_snapshots_in_order_between_threads(self):
+        """
+        Messages arrive in order, as snapshots, despite a small buffer.
+
+        """
+        import threading                 # pylint: disable=C0415
+        import pl.stableflow.queue.spsc  # pylint: disable=C0415
+
+        cfg_edge = {'owner': 'a', 'dirn': 'feedforward'}
+        queue    = pl.stableflow.queue.spsc.Queue(cfg      = None,
+                                                  cfg_edge = cfg_edge,
+                                                  id_host  = 'localhost',
+                                                  capacity = 4)
+        msg      = {'count': None}
+
+        def produce():
+            for idx in range(1000):
+                msg['count'] = idx
+                queue.non_blocking_write(msg)
+
+        thread = threading.Thread(target = produce)
+        thread.start()
+        list_count = [queue.blocking_read()['count'] for _ in range(1000)]
+        thread.join()
+
+        assert list_count == list(range(1000))
+        assert queue.approx_size() == 0
+
+    # -------------------------------------------------------------------------
+    def it_drains_then_raises_once_closed(self):
+        """
+        A closed queue yields remaining messages, then raises QueueClosed.
+
+        """
+        import pytest                    # pylint: disable=C0415
+        import pl.stableflow.queue.spsc  # pylint: disable=C0415
+
+        cfg_edge = {'owner': 'a', 'dirn': 'feedforward'}
+        queue    = pl.stableflow.queue.spsc.Queue(cfg      = None,
+                                                  cfg_edge = cfg_edge,
+                                                  id_host  = 'localhost')
+        queue.non_blocking_write('last')
+        queue.close()
+
+        assert queue.blocking_read() == 'last'
+        with pytest.raises(pl.stableflow.queue.spsc.QueueClosed):
+            queue.blocking_read()
+        with pytest.raises(pl.stableflow.queue.spsc.QueueClosed):
+            queue.non_blocking_write('more')
+
+
+# =============================================================================
+class SpecifyStableflowQueueBatch:
+    """
+    Spec for the pl.stableflow.queue.batch edge batching wrappers.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_coalesces_edges_and_ticks_into_frames(self):
+        """
+        Two edges over three ticks are sent as one frame and demultiplexed.
+
+        """
+        import pl.stableflow.queue.batch  # pylint: disable=C0415
+        import pl.stableflow.queue.spsc   # pylint: disable=C0415
+
+        cfg_edge    = {'owner': 'a', 'dirn': 'feedforward'}
+        carrier     = pl.stableflow.queue.spsc.Queue(cfg      = None,
+                                                     cfg_edge = cfg_edge,
+                                                     id_host  = 'localhost')
+        tup_id_edge = ('a.outputs.x:b.inputs.x', 'a.outputs.y:b.inputs.y')
+        group       = pl.stableflow.queue.batch.BatchGroup(
+                                                carrier     = carrier,
+                                                tup_id_edge = tup_id_edge,
+                                                num_tick    = 3)
+        demux       = pl.stableflow.queue.batch.BatchDemux(
+                                                carrier     = carrier,
+                                                tup_id_edge = tup_id_edge)
+        tup_writer  = tuple(pl.stableflow.queue.batch.BatchWriter(
+                                group, id_edge, carrier)
+                                                for id_edge in tup_id_edge)
+        tup_reader  = tuple(pl.stableflow.queue.batch.BatchReader(
+                                demux, id_edge, carrier)
+                                                for id_edge in tup_id_edge)
+        msg         = {'count': None}
+
+        for idx in range(3):
+            msg['count'] = idx
+            for writer in tup_writer:
+                writer.non_blocking_write(msg)
+            assert carrier.approx_size() == (1 if idx == 2 else 0)
+
+        list_x = [tup_reader[0].blocking_read()['count'] for _ in range(3)]
+        list_y = [tup_reader[1].blocking_read()['count'] for _ in range(3)]
+
+        assert list_x == [0, 1, 2]
+        assert list_y == [0, 1, 2]
+        assert carrier.approx_size() == 0
+
+    # -------------------------------------------------------------------------
+    def it_sends_early_when_the_delay_is_exceeded(self):
+        """
+        A frame is sent before it is full once max_delay_secs has passed.
+
+        """
+        import pl.stableflow.queue.batch  # pylint: disable=C0415
+        import pl.stableflow.queue.spsc   # pylint: disable=C0415
+
+        cfg_edge = {'owner': 'a', 'dirn': 'feedforward'}
+        carrier  = pl.stableflow.queue.spsc.Queue(cfg      = None,
+                                                  cfg_edge = cfg_edge,
+                                                  id_host  = 'localhost')
+        group    = pl.stableflow.queue.batch.BatchGroup(
+                                                carrier        = carrier,
+                                                tup_id_edge    = ('e',),
+                                                num_tick       = 100,
+                                                max_delay_secs = 0.0)
+        group.write('e', 'first')
+
+        assert carrier.blocking_read() == [{'e': 'first'}]
+
+        group.num_tick       = 2
+        group.max_delay_secs = None
+        group.write('e', 'held')
+        assert carrier.approx_size() == 0
+        group.flush()
+        assert carrier.blocking_read() == [{'e': 'held'}]
+
+
+# =============================================================================
+class SpecifyStableflowQueueCodec:
+    """
+    Spec for the pl.stableflow.queue.codec inter host compression.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_compresses_only_messages_over_the_threshold(self):
+        """
+        Large messages are compressed, small ones sent raw, both decode.
+
+        """
+        import pl.stableflow.queue.codec  # pylint: disable=C0415
+
+        cfg_edge = {'id_edge':  'a.outputs.text:b.inputs.text',
+                    'compress': {'codec': 'zlib', 'level': 6,
+                                 'min_bytes': 256}}
+        encoder  = pl.stableflow.queue.codec.from_cfg_edge(cfg_edge)
+        decoder  = pl.stableflow.queue.codec.from_cfg_edge(cfg_edge)
+        msg_big  = {'ena': True, 'list': ['the same words again'] * 200}
+        msg_tiny = {'ena': False, 'list': []}
+
+        frame_big  = encoder.encode(msg_big)
+        frame_tiny = encoder.encode(msg_tiny)
+
+        assert frame_big[:1]  == pl.stableflow.queue.codec.TAG_ZLIB
+        assert frame_tiny[:1] == pl.stableflow.queue.codec.TAG_RAW
+        assert decoder.decode(frame_big)  == msg_big
+        assert decoder.decode(frame_tiny) == msg_tiny
+        assert encoder.num_compressed == 1
+        assert encoder.ratio() > 2
+        assert pl.stableflow.queue.codec.from_cfg_edge({}) is None
+
+    # -------------------------------------------------------------------------
+    def it_refuses_a_codec_that_is_missing(self):
+        """
+        A codec whose package is not installed is an error, not replaced.
+
+        """
+        import pytest                     # pylint: disable=C0415
+        import pl.stableflow.exception    # pylint: disable=C0415
+        import pl.stableflow.queue.codec  # pylint: disable=C0415
+
+        for name in ('lz4', 'zstd'):
+            if not pl.stableflow.queue.codec.is_available(name):
+                with pytest.raises(
+                            pl.stableflow.exception.NonRecoverableError):
+                    pl.stableflow.queue.codec.Codec(id_edge = 'e',
+                                                    name    = name)
+                continue
+            codec = pl.stableflow.queue.codec.Codec(id_edge   = 'e',
+                                                    name      = name,
+                                                    min_bytes = 0)
+            assert codec.decode(codec.encode(b'x' * 1000)) == b'x' * 1000
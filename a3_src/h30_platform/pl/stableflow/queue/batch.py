@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Message batching and coalescing for queue edges.
+
+Queue edges that are configured for batching
+and that run from the same source node to the
+same destination process are grouped, and the
+messages for every edge in the group are sent
+together, as a single frame, over the queue of
+one edge in the group (the carrier).
+
+A frame holds the messages for one or more
+ticks, as a list with one {id_edge: msg} dict
+per tick. The number of ticks per frame trades
+latency for throughput: each frame is sent as
+soon as it holds the configured number of
+ticks. The configured delay is checked only
+as each tick is written, so a frame whose
+oldest tick is overdue is sent early with the
+next tick, not on a timer. It does not bound
+the delay if the source stops ticking.
+
+At the destination, a demultiplexer reads
+frames from the carrier as they are needed
+and hands each edge its own messages in tick
+order.
+
+Holding ticks back on an edge that lies on a
+cycle of the graph would deadlock the cycle,
+as the source would wait for input that
+depends on output it has not yet sent. So
+feedback edges cannot be batched, and config
+validation rejects batches of more than one
+tick on any edge whose destination can reach
+its source, by feedforward or feedback edges.
+
+"""
+
+
+import collections
+import copy
+import time
+
+
+# =============================================================================
+class BatchGroup():
+    """
+    Writer end of a group of batched edges sharing a carrier queue.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, carrier, tup_id_edge, num_tick, max_delay_secs = None):
+        """
+        Return a BatchGroup writing frames of num_tick ticks to carrier.
+
+        """
+        self.carrier        = carrier
+        self.tup_id_edge    = tup_id_edge
+        self.num_tick       = num_tick
+        self.max_delay_secs = max_delay_secs
+        self._map_msg       = dict()
+        self._list_tick     = list()
+        self._time_first    = None
+
+    # -------------------------------------------------------------------------
+    def write(self, id_edge, msg):
+        """
+        Add the message for id_edge on this tick, sending a frame if due.
+
+        Messages are snapshotted if they may be
+        held past the current tick, as edge
+        memory is reused on the next tick.
+
+        A frame is due once it is full, or once
+        its oldest tick has been held for at
+        least max_delay_secs when a later tick
+        completes.
+
+        """
+        if self.num_tick > 1:
+            msg = copy.deepcopy(msg)
+        self._map_msg[id_edge] = msg
+        if len(self._map_msg) < len(self.tup_id_edge):
+            return
+
+        if not self._list_tick:
+            self._time_first = time.monotonic()
+        self._list_tick.append(self._map_msg)
+        self._map_msg = dict()
+
+        is_full    = len(self._list_tick) >= self.num_tick
+        is_overdue = (self.max_delay_secs is not None
+                        and time.monotonic() - self._time_first
+                                                    >= self.max_delay_secs)
+        if is_full or is_overdue:
+            self.flush()
+
+    # -------------------------------------------------------------------------
+    def flush(self):
+        """
+        Send any complete ticks that are being held.
+
+        """
+        if self._list_tick:
+            list_tick       = self._list_tick
+            self._list_tick = list()
+            self.carrier.non_blocking_write(list_tick)
+
+
+# =============================================================================
+class BatchWriter():
+    """
+    Queue facade for the writer end of one edge in a BatchGroup.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, group, id_edge, queue):
+        """
+        Return a BatchWriter for id_edge, replacing the specified queue.
+
+        """
+        self.owner     = queue.owner
+        self.direction = queue.direction
+        self.group     = group
+        self.id_edge   = id_edge
+
+    # -------------------------------------------------------------------------
+    def non_blocking_write(self, msg):
+        """
+        Add msg to the current frame of the group.
+
+        """
+        self.group.write(self.id_edge, msg)
+
+    # -------------------------------------------------------------------------
+    def approx_size(self):
+        """
+        Return the approximate number of frames in the carrier queue.
+
+        """
+        return self.group.carrier.approx_size()
+
+
+# =============================================================================
+class BatchDemux():
+    """
+    Reader end of a group of batched edges sharing a carrier queue.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, carrier, tup_id_edge):
+        """
+        Return a BatchDemux reading frames from carrier.
+
+        """
+        self.carrier     = carrier
+        self._map_buffer = dict((id_edge, collections.deque())
+                                                for id_edge in tup_id_edge)
+
+    # -------------------------------------------------------------------------
+    def read(self, id_edge):
+        """
+        Return the next message for id_edge, reading frames as needed.
+
+        """
+        buffer = self._map_buffer[id_edge]
+        while not buffer:
+            for map_msg in self.carrier.blocking_read():
+                for (id_edge_msg, msg) in map_msg.items():
+                    self._map_buffer[id_edge_msg].append(msg)
+        return buffer.popleft()
+
+
+# =============================================================================
+class BatchReader():
+    """
+    Queue facade for the reader end of one edge in a BatchDemux.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, demux, id_edge, queue):
+        """
+        Return a BatchReader for id_edge, replacing the specified queue.
+
+        """
+        self.owner     = queue.owner
+        self.direction = queue.direction
+        self.demux     = demux
+        self.id_edge   = id_edge
+
+    # -------------------------------------------------------------------------
+    def blocking_read(self):
+        """
+        Return the next message for this edge.
+
+        """
+        return self.demux.read(self.id_edge)
+
+    # -------------------------------------------------------------------------
+    def approx_size(self):
+        """
+        Return the approximate number of frames in the carrier queue.
+
+        """
+        return self.demux.carrier.approx_size()
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Message compression for inter host queues.
+
+Inter host edges that are configured with a
+compress option have each message pickled
+and, if the pickle is at least min_bytes
+long, compressed with the selected codec
+(zlib, lz4 or zstd) at the selected level.
+
+Each frame starts with a one byte tag that
+names the codec used, so that small messages
+can be sent uncompressed.
+
+The lz4 and zstd codecs need the lz4 and
+zstandard packages. Both ends of an edge
+must be able to decode what the other sends,
+so a process fails to start if the codec of
+any of its compressed edges is not available
+on its host, rather than falling back to a
+codec that its peer does not expect.
+
+The number of messages and bytes before and
+after compression, and the CPU time spent
+encoding and decoding, are logged for each
+edge periodically.
+
+"""
+
+
+import pickle
+import time
+import zlib
+
+try:
+    import lz4.frame
+except ModuleNotFoundError:
+    lz4 = None  # pylint: disable=C0103
+
+try:
+    import zstandard
+except ModuleNotFoundError:
+    zstandard = None  # pylint: disable=C0103
+
+import pl.stableflow.exception
+import pl.stableflow.log
+
+
+MIN_BYTES_DEFAULT    = 1024
+INTERVAL_REPORT_SECS = 60.0
+
+TAG_RAW  = b'\x00'
+TAG_ZLIB = b'\x01'
+TAG_LZ4  = b'\x02'
+TAG_ZSTD = b'\x03'
+
+
+# -----------------------------------------------------------------------------
+def from_cfg_edge(cfg_edge):
+    """
+    Return a Codec for the specified edge, or None if not compressed.
+
+    """
+    cfg_compress = cfg_edge.get('compress', None)
+    if not cfg_compress:
+        return None
+    return Codec(id_edge   = cfg_edge['id_edge'],
+                 name      = cfg_compress.get('codec', 'zlib'),
+                 level     = cfg_compress.get('level', None),
+                 min_bytes = cfg_compress.get('min_bytes', MIN_BYTES_DEFAULT))
+
+
+# -----------------------------------------------------------------------------
+def is_available(name):
+    """
+    Return true if the named codec can be used in this environment.
+
+    """
+    return ((name == 'zlib')
+                or (name == 'lz4'  and lz4 is not None)
+                or (name == 'zstd' and zstandard is not None))
+
+
+# =============================================================================
+class Codec():  # pylint: disable=R0902
+    """
+    Pickle and compress messages for one end of an inter host edge.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 id_edge,
+                 name                 = 'zlib',
+                 level                = None,
+                 min_bytes            = MIN_BYTES_DEFAULT,
+                 interval_report_secs = INTERVAL_REPORT_SECS):
+        """
+        Return a Codec using the named codec.
+
+        Raises a NonRecoverableError if the codec
+        is not available in this environment.
+
+        """
+        if not is_available(name):
+            raise pl.stableflow.exception.NonRecoverableError(
+                cause = 'Codec {name} not available for {id_edge}.'.format(
+                                                            name    = name,
+                                                            id_edge = id_edge))
+
+        self.id_edge              = id_edge
+        self.name                 = name
+        self.level                = level
+        self.min_bytes            = min_bytes
+        self.interval_report_secs = interval_report_secs
+        self.num_msg              = 0
+        self.num_compressed       = 0
+        self.num_bytes_raw        = 0
+        self.num_bytes_wire       = 0
+        self.secs_cpu             = 0.0
+        self._compress            = _compressor(name, level)
+        self._time_report         = time.monotonic()
+
+    # -------------------------------------------------------------------------
+    def encode(self, msg):
+        """
+        Return msg as a tagged, and possibly compressed, frame.
+
+        """
+        time_cpu = time.thread_time()
+        raw      = pickle.dumps(msg, protocol = pickle.HIGHEST_PROTOCOL)
+        if len(raw) >= self.min_bytes:
+            (tag, body) = self._compress(raw)
+            self.num_compressed += 1
+        else:
+            (tag, body) = (TAG_RAW, raw)
+        frame = tag + body
+        self._count(len(raw), len(frame), time.thread_time() - time_cpu)
+        return frame
+
+    # -------------------------------------------------------------------------
+    def decode(self, frame):
+        """
+        Return the message held in the specified frame.
+
+        """
+        time_cpu = time.thread_time()
+        tag      = bytes(frame[:1])
+        raw      = _decompress(tag, memoryview(frame)[1:])
+        msg      = pickle.loads(raw)
+        if tag != TAG_RAW:
+            self.num_compressed += 1
+        self._count(len(raw), len(frame), time.thread_time() - time_cpu)
+        return msg
+
+    # -------------------------------------------------------------------------
+    def ratio(self):
+        """
+        Return the ratio of raw bytes to bytes on the wire so far.
+
+        """
+        if not self.num_bytes_wire:
+            return 1.0
+        return self.num_bytes_raw / self.num_bytes_wire
+
+    # -------------------------------------------------------------------------
+    def report(self):
+        """
+        Log the compression ratio and CPU time for the edge.
+
+        """
+        self._time_report = time.monotonic()
+        pl.stableflow.log.logger.info(
+            'Compress {id_edge} {name}: {num_msg} msgs '
+            '({num_compressed} compressed), {raw} -> {wire} bytes, '
+            'ratio {ratio:.2f}, cpu {secs:.3f}s',
+            id_edge        = self.id_edge,
+            name           = self.name,
+            num_msg        = self.num_msg,
+            num_compressed = self.num_compressed,
+            raw            = self.num_bytes_raw,
+            wire           = self.num_bytes_wire,
+            ratio          = self.ratio(),
+            secs           = self.secs_cpu)
+
+    # -------------------------------------------------------------------------
+    def _count(self, num_bytes_raw, num_bytes_wire, secs_cpu):
+        """
+        Add one message to the running totals, reporting if due.
+
+        """
+        self.num_msg        += 1
+        self.num_bytes_raw  += num_bytes_raw
+        self.num_bytes_wire += num_bytes_wire
+        self.secs_cpu       += secs_cpu
+        if time.monotonic() - self._time_report >= self.interval_report_secs:
+            self.report()
+
+
+# -----------------------------------------------------------------------------
+def _compressor(name, level):
+    """
+    Return a function mapping raw bytes to a (tag, body) tuple.
+
+    """
+    if name == 'lz4':
+        level = 0 if level is None else level
+        return lambda raw: (TAG_LZ4, lz4.frame.compress(
+                                            raw, compression_level = level))
+    if name == 'zstd':
+        compressor = zstandard.ZstdCompressor(
+                                        level = 3 if level is None else level)
+        return lambda raw: (TAG_ZSTD, compressor.compress(raw))
+    level = -1 if level is None else level
+    return lambda raw: (TAG_ZLIB, zlib.compress(raw, level))
+
+
+# -----------------------------------------------------------------------------
+def _decompress(tag, body):
+    """
+    Return the raw bytes for a frame body with the specified tag.
+
+    """
+    if tag == TAG_RAW:
+        return body
+    if tag == TAG_ZLIB:
+        return zlib.decompress(body)
+    if tag == TAG_LZ4 and lz4 is not None:
+        return lz4.frame.decompress(body)
+    if tag == TAG_ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise RuntimeError(
+                'Cannot decode frame with tag {tag!r}.'.format(tag = tag))
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Single producer single consumer inter thread queue.
+
+Messages are held in a fixed size ring
+buffer. The producer only ever advances the
+tail index and the consumer only ever
+advances the head index, so neither end
+takes a lock to pass a message.
+
+A message is snapshotted (deep copied) when
+it is written, because the edge memory of
+the producer is reused on the next tick, but
+it is never pickled, and the consumer
+receives a reference to the snapshot.
+
+Each end only blocks when the buffer is
+empty (consumer) or full (producer), and
+then waits on an event that the other end
+sets only if it sees that someone is
+waiting.
+
+"""
+
+
+import copy
+import threading
+
+
+CAPACITY_DEFAULT = 64
+
+
+# =============================================================================
+class QueueClosed(Exception):
+    """
+    Raised by a blocked read or write when the queue is closed.
+
+    """
+
+
+# =============================================================================
+class Queue:  # pylint: disable=R0902
+    """
+    Single producer single consumer inter thread queue.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, cfg, cfg_edge, id_host, capacity = CAPACITY_DEFAULT):
+        """
+        Return an instance of a Queue object.
+
+        """
+        self.owner          = cfg_edge['owner']
+        self.direction      = cfg_edge['dirn']
+        self.capacity       = capacity
+        self.is_closed      = False
+        self._buffer        = [None] * capacity
+        self._idx_head      = 0  # Only advanced by the consumer.
+        self._idx_tail      = 0  # Only advanced by the producer.
+        self._is_read_wait  = False
+        self._is_write_wait = False
+        self._event_read    = threading.Event()
+        self._event_write   = threading.Event()
+
+    # -------------------------------------------------------------------------
+    def blocking_read(self):
+        """
+        Return the next item from the FIFO queue, waiting if necessary.
+
+        """
+        idx_head = self._idx_head
+        if idx_head == self._idx_tail:
+            self._wait(lambda: idx_head != self._idx_tail, is_read = True)
+
+        slot               = idx_head % self.capacity
+        item               = self._buffer[slot]
+        self._buffer[slot] = None
+        self._idx_head     = idx_head + 1
+        if self._is_write_wait:
+            self._event_write.set()
+        return item
+
+    # -------------------------------------------------------------------------
+    def non_blocking_write(self, msg):
+        """
+        Write a snapshot of msg to the end of the FIFO queue.
+
+        The write only blocks if the consumer has
+        fallen a full buffer behind, which applies
+        backpressure to the producing thread.
+
+        """
+        if self.is_closed:
+            raise QueueClosed()
+        idx_tail = self._idx_tail
+        if idx_tail - self._idx_head >= self.capacity:
+            self._wait(lambda: idx_tail - self._idx_head < self.capacity,
+                       is_read = False)
+
+        self._buffer[idx_tail % self.capacity] = copy.deepcopy(msg)
+        self._idx_tail = idx_tail + 1
+        if self._is_read_wait:
+            self._event_read.set()
+
+    # -------------------------------------------------------------------------
+    def approx_size(self):
+        """
+        Return the approximate size of the queue.
+
+        """
+        return self._idx_tail - self._idx_head
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """
+        Close the queue, waking any blocked reader or writer.
+
+        Messages already written can still be
+        read, after which reads raise QueueClosed.
+        Writes raise QueueClosed immediately.
+
+        """
+        self.is_closed = True
+        self._event_read.set()
+        self._event_write.set()
+
+    # -------------------------------------------------------------------------
+    def _wait(self, is_ready, is_read):
+        """
+        Wait until is_ready() is true, raising QueueClosed if closed.
+
+        The waiting flag is set before the
+        condition is rechecked, so a message
+        written after the recheck always sees
+        the flag and sets the event.
+
+        """
+        event = self._event_read if is_read else self._event_write
+        while True:
+            if is_read:
+                self._is_read_wait = True
+            else:
+                self._is_write_wait = True
+            event.clear()
+            try:
+                if is_ready():
+                    return
+                if self.is_closed:
+                    raise QueueClosed()
+                event.wait()
+            finally:
+                if is_read:
+                    self._is_read_wait = False
+                else:
+                    self._is_write_wait = False
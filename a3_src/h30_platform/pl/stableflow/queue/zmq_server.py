@@ -7,6 +7,8 @@ ZeroMQ inter host queue server.
 
 import zmq
 
+import pl.stableflow.queue.codec
+
 
 # =============================================================================
 class Queue:
@@ -36,6 +38,7 @@ class Queue:
         self._context = zmq.Context()
         self._socket  = self._context.socket(socket_type)
         self._socket.bind(address)
+        self._codec   = pl.stableflow.queue.codec.from_cfg_edge(cfg_edge)
 
     # -------------------------------------------------------------------------
     def blocking_read(self):
@@ -43,7 +46,9 @@ class Queue:
         Return the next item from the FIFO queue, waiting if necessary.
 
         """
-        return self._socket.recv_pyobj()
+        if self._codec is None:
+            return self._socket.recv_pyobj()
+        return self._codec.decode(self._socket.recv(copy = False).buffer)
 
     # -------------------------------------------------------------------------
     def non_blocking_write(self, msg):
@@ -51,7 +56,10 @@ class Queue:
         Write to the end of the FIFO queue, raising an exception if full.
 
         """
-        self._socket.send_pyobj(item)
+        if self._codec is None:
+            self._socket.send_pyobj(msg)
+        else:
+            self._socket.send(self._codec.encode(msg), copy = False)
 
     # -------------------------------------------------------------------------
     def approx_size(self):
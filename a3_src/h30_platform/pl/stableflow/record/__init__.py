@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Package of classes supporting the record and replay of edge traffic.
+
+Each recorded edge is stored as a pair of
+append-only files: a data log containing
+one pickled message per tick, and an index
+containing a fixed size (idx, offset, length)
+entry for each message, ordered by tick idx.
+
+Tick indices restart at zero on every run,
+so a writer truncates any log left in its
+directory by an earlier run rather than
+appending to it, and a reader rejects an
+index whose ticks are not strictly
+increasing.
+
+Logs are written with ordinary buffered
+appends and read back through memory maps,
+so replay can seek to any tick without
+parsing the messages that precede it.
+
+"""
+
+
+import bisect
+import mmap
+import os
+import os.path
+import pickle
+import struct
+
+
+INDEX_ENTRY = struct.Struct('<qQQ')  # (idx, offset, length)
+
+
+# -----------------------------------------------------------------------------
+def filepaths(dirpath, id_edge):
+    """
+    Return the (data, index) filepaths for the log of the specified edge.
+
+    """
+    name = id_edge.replace(':', '--')
+    return (os.path.join(dirpath, '{name}.log'.format(name = name)),
+            os.path.join(dirpath, '{name}.idx'.format(name = name)))
+
+
+# =============================================================================
+class EdgeLogWriter():
+    """
+    Append-only writer for the log of a single edge.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, dirpath, id_edge):
+        """
+        Return an EdgeLogWriter for a new log for id_edge in dirpath.
+
+        Any existing log for id_edge in dirpath
+        is truncated.
+
+        """
+        os.makedirs(dirpath, exist_ok = True)
+        (filepath_data, filepath_index) = filepaths(dirpath, id_edge)
+        self.id_edge    = id_edge
+        self._offset    = 0
+        self._file_data = open(filepath_data,  'wb')  # pylint: disable=R1732
+        self._file_idx  = open(filepath_index, 'wb')  # pylint: disable=R1732
+
+    # -------------------------------------------------------------------------
+    def append(self, idx, item):
+        """
+        Append the message item for tick idx to the log.
+
+        """
+        data = pickle.dumps(item, protocol = pickle.HIGHEST_PROTOCOL)
+        self._file_data.write(data)
+        self._file_idx.write(INDEX_ENTRY.pack(idx, self._offset, len(data)))
+        self._offset += len(data)
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """
+        Flush and close the log files.
+
+        """
+        self._file_data.close()
+        self._file_idx.close()
+
+
+# =============================================================================
+class EdgeLogReader():
+    """
+    Memory-mapped reader for the log of a single edge.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, dirpath, id_edge):
+        """
+        Return an EdgeLogReader for the log of id_edge in dirpath.
+
+        """
+        (filepath_data, filepath_index) = filepaths(dirpath, id_edge)
+        self.id_edge = id_edge
+        self._data   = _map_readonly(filepath_data)
+        self._index  = _map_readonly(filepath_index)
+
+        # Ignore any trailing entries that were
+        # only partly written, e.g. if the
+        # recording process was killed.
+        #
+        size_data    = len(self._data)
+        num_entry    = len(self._index) // INDEX_ENTRY.size
+        while num_entry > 0:
+            (_, offset, length) = self._entry(num_entry - 1)
+            if offset + length <= size_data:
+                break
+            num_entry -= 1
+        self._num_entry = num_entry
+        self._list_idx  = [self._entry(pos)[0] for pos in range(num_entry)]
+
+        # Replay bisects on tick idx, so an index
+        # that is out of order would silently mix
+        # up messages.
+        #
+        for pos in range(1, num_entry):
+            if self._list_idx[pos] <= self._list_idx[pos - 1]:
+                self.close()
+                raise ValueError(
+                    'Edge log index for {id} is not strictly increasing '
+                    'at position {pos}.'.format(id = id_edge, pos = pos))
+
+    # -------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of recorded messages.
+
+        """
+        return self._num_entry
+
+    # -------------------------------------------------------------------------
+    def read(self, pos):
+        """
+        Return (idx, item) for the message at position pos in the log.
+
+        """
+        if not 0 <= pos < self._num_entry:
+            raise IndexError('Log position out of range.')
+        (idx, offset, length) = self._entry(pos)
+        return (idx, pickle.loads(self._data[offset:offset + length]))
+
+    # -------------------------------------------------------------------------
+    def find(self, idx):
+        """
+        Return the position of the first message at or after tick idx.
+
+        """
+        return bisect.bisect_left(self._list_idx, idx)
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """
+        Release the memory maps.
+
+        """
+        for buffer in (self._data, self._index):
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+    # -------------------------------------------------------------------------
+    def _entry(self, pos):
+        """
+        Return the (idx, offset, length) index entry at position pos.
+
+        """
+        return INDEX_ENTRY.unpack_from(self._index, pos * INDEX_ENTRY.size)
+
+
+# -----------------------------------------------------------------------------
+def _filesize(filepath):
+    """
+    Return the size of the specified file, or zero if it does not exist.
+
+    """
+    try:
+        return os.path.getsize(filepath)
+    except FileNotFoundError:
+        return 0
+
+
+# -----------------------------------------------------------------------------
+def _map_readonly(filepath):
+    """
+    Return a read only memory map of the specified file.
+
+    Empty files cannot be memory mapped, so an
+    empty bytes object is returned instead.
+
+    """
+    if _filesize(filepath) == 0:
+        return b''
+    with open(filepath, 'rb') as file:
+        return mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
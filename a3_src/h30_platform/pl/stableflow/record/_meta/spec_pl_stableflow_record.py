@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Functional specification for the pl.stableflow.record package.
+
+"""
+
+
+_RESET = '''
+def reset(runtime, cfg, inputs, state, outputs):
+    state['count'] = 0
+'''
+
+_STEP_SRC = '''
+def step(inputs, state, outputs):
+    import pl.stableflow.signal
+    state['count'] += 1
+    outputs['output']['ena']   = True
+    outputs['output']['count'] = state['count']
+    if state['count'] >= 3:
+        return (pl.stableflow.signal.exit_ok_controlled,)
+'''
+
+_STEP_DST = '''
+def step(inputs, state, outputs):
+    pass
+'''
+
+
+# =============================================================================
+class SpecifyStableflowRecord:
+    """
+    Spec for pl.stableflow.record package.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_reads_back_appended_messages_by_position_and_tick(self, tmp_path):
+        """
+        Messages appended to an edge log can be read back in order.
+
+        """
+        import pl.stableflow.record  # pylint: disable=C0415
+
+        writer = pl.stableflow.record.EdgeLogWriter(str(tmp_path), 'a:b')
+        for idx in (3, 4, 5):
+            writer.append(idx, {'ena': True, 'idx': idx})
+        writer.close()
+
+        reader = pl.stableflow.record.EdgeLogReader(str(tmp_path), 'a:b')
+        assert len(reader) == 3
+        assert reader.read(0) == (3, {'ena': True, 'idx': 3})
+        assert reader.find(5) == 2
+        assert reader.find(9) == 3
+        reader.close()
+
+    # -------------------------------------------------------------------------
+    def it_ignores_partly_written_trailing_messages(self, tmp_path):
+        """
+        Index entries that point past the end of the data are ignored.
+
+        """
+        import pl.stableflow.record  # pylint: disable=C0415
+
+        writer = pl.stableflow.record.EdgeLogWriter(str(tmp_path), 'a:b')
+        writer.append(0, 'first')
+        writer.append(1, 'second')
+        writer.close()
+
+        (filepath_data, _) = pl.stableflow.record.filepaths(str(tmp_path),
+                                                           'a:b')
+        with open(filepath_data, 'r+b') as file:
+            file.truncate(file.seek(0, 2) - 1)
+
+        reader = pl.stableflow.record.EdgeLogReader(str(tmp_path), 'a:b')
+        assert len(reader) == 1
+        assert reader.read(0) == (0, 'first')
+        reader.close()
+
+    # -------------------------------------------------------------------------
+    def it_replaces_the_log_of_an_earlier_run(self, tmp_path):
+        """
+        A new writer truncates any log already in the directory.
+
+        """
+        import pl.stableflow.record  # pylint: disable=C0415
+
+        for list_item in (['a', 'b', 'c'], ['x', 'y']):
+            writer = pl.stableflow.record.EdgeLogWriter(str(tmp_path), 'a:b')
+            for (idx, item) in enumerate(list_item):
+                writer.append(idx, item)
+            writer.close()
+
+        reader = pl.stableflow.record.EdgeLogReader(str(tmp_path), 'a:b')
+        assert len(reader) == 2
+        assert reader.read(reader.find(1)) == (1, 'y')
+        reader.close()
+
+    # -------------------------------------------------------------------------
+    def it_rejects_an_index_that_is_out_of_order(self, tmp_path):
+        """
+        Ticks in the index must be strictly increasing.
+
+        """
+        import pytest                # pylint: disable=C0415
+        import pl.stableflow.record  # pylint: disable=C0415
+
+        writer = pl.stableflow.record.EdgeLogWriter(str(tmp_path), 'a:b')
+        for idx in (0, 1, 1):
+            writer.append(idx, idx)
+        writer.close()
+
+        with pytest.raises(ValueError):
+            pl.stableflow.record.EdgeLogReader(str(tmp_path), 'a:b')
+
+    # -------------------------------------------------------------------------
+    def it_records_traffic_on_selected_edges(self, tmp_path):
+        """
+        Edges with record set are logged once per tick at the destination.
+
+        """
+        import fl.stableflow.cfg     # pylint: disable=C0415
+        import pl.stableflow.record  # pylint: disable=C0415
+        import pl.stableflow.sys     # pylint: disable=C0415
+
+        cfg = fl.stableflow.cfg.prepare(map_cfg  = _pipeline_cfg(tmp_path),
+                                        is_local = True)
+        assert pl.stableflow.sys.start(cfg) == 0
+
+        reader = pl.stableflow.record.EdgeLogReader(
+                                str(tmp_path),
+                                'src.outputs.output:dst.inputs.input')
+        assert len(reader) == 3
+        assert [reader.read(pos)[0] for pos in range(3)] == [0, 1, 2]
+        assert reader.read(2)[1] == {'ena': True, 'count': 3}
+        reader.close()
+
+
+# -----------------------------------------------------------------------------
+def _pipeline_cfg(dirpath):
+    """
+    Return a config for a two node pipeline with a recorded edge.
+
+    """
+    def node(step):
+        return { 'process':       'main',
+                 'state_type':    'python_dict',
+                 'functionality': { 'requirement': 'some_requirement',
+                                    'py_src':      { 'reset': _RESET,
+                                                     'step':  step } } }
+    return {
+        'system':  { 'id_system': 'stableflow_record_test' },
+        'host':    { 'localhost': { 'hostname':       '127.0.0.1',
+                                    'acct_run':       'stableflow',
+                                    'acct_provision': 'stableflow',
+                                    'dirpath_record': str(dirpath) } },
+        'process': { 'main': { 'host': 'localhost' } },
+        'node':    { 'src': node(_STEP_SRC), 'dst': node(_STEP_DST) },
+        'edge':    [ { 'owner':  'src',
+                       'data':   'python_dict',
+                       'src':    'src.outputs.output',
+                       'dst':    'dst.inputs.input',
+                       'record': True } ],
+        'requirement': { 'some_requirement': { 'how_to_install' } },
+        'data':    { 'python_dict': 'py_dict' }
+    }
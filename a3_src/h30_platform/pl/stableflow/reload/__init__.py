@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Package of classes supporting the hot reload of node functionality.
+
+Nodes loaded from a python module (py_module)
+can be configured to reload that module when
+its source file changes. The modification
+time of the source file is polled between
+ticks, at most once per interval, and when it
+changes, the module is re-imported and the
+node swaps in the new reset, step and
+finalize functions before its next step.
+
+State is preserved across the swap. Nodes
+implemented as coroutines are re-initialized
+by calling the new reset function, as a
+running coroutine cannot be updated in place.
+
+Each module is only re-imported once per
+change, however many nodes use it. If the
+new source fails to import, the error is
+logged and the old functions are kept until
+the file changes again.
+
+"""
+
+
+import importlib
+import os
+import sys
+import threading
+import time
+
+import pl.stableflow.log
+
+
+INTERVAL_POLL_SECS = 1.0
+
+
+_LOCK_RELOAD      = threading.Lock()
+_MAP_MTIME_LOADED = dict()
+
+
+# =============================================================================
+class ModuleReloader():
+    """
+    Polls the source file of a node module and reloads it when it changes.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, spec_module, interval_secs = INTERVAL_POLL_SECS):
+        """
+        Return a ModuleReloader for the specified (imported) module.
+
+        """
+        self.spec_module   = spec_module
+        self.interval_secs = interval_secs
+        self._time_poll    = time.monotonic()
+        self._mtime        = _mtime(sys.modules.get(spec_module, None))
+
+    # -------------------------------------------------------------------------
+    def poll(self):
+        """
+        Return the reloaded module if its source has changed, else None.
+
+        """
+        time_now = time.monotonic()
+        if time_now - self._time_poll < self.interval_secs:
+            return None
+        self._time_poll = time_now
+
+        module = sys.modules.get(self.spec_module, None)
+        mtime  = _mtime(module)
+        if mtime is None or mtime == self._mtime:
+            return None
+        self._mtime = mtime
+
+        with _LOCK_RELOAD:
+            if _MAP_MTIME_LOADED.get(self.spec_module, (None,))[0] != mtime:
+                _MAP_MTIME_LOADED[self.spec_module] = (mtime,
+                                                       _reload(module))
+            (_, is_ok) = _MAP_MTIME_LOADED[self.spec_module]
+
+        return module if is_ok else None
+
+
+# -----------------------------------------------------------------------------
+def _reload(module):
+    """
+    Re-import module in place and return true iff it succeeded.
+
+    """
+    try:
+        importlib.reload(module)
+    except Exception:  # pylint: disable=W0703
+        pl.stableflow.log.logger.exception(
+                    'Reload failed for module "{spec}"',
+                    spec = module.__name__)
+        return False
+    pl.stableflow.log.logger.info(
+                    'Reloaded module "{spec}"', spec = module.__name__)
+    return True
+
+
+# -----------------------------------------------------------------------------
+def _mtime(module):
+    """
+    Return the modification time of the source file of module, or None.
+
+    """
+    filepath = getattr(module, '__file__', None)
+    if not filepath:
+        return None
+    try:
+        return os.stat(filepath).st_mtime_ns
+    except OSError:
+        return None
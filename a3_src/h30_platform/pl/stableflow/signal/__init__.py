@@ -47,6 +47,14 @@ control_pause: cython.int = int(signal.SIGUSR1)
 #
 control_step: cython.int = int(signal.SIGUSR2)
 
+# Start or stop the sampling profiler.
+#
+control_profile: cython.int = int(signal.SIGRTMIN)
+
+# Report node and queue memory usage.
+#
+control_memory: cython.int = int(signal.SIGRTMIN) + 1
+
 exit = (
     exit_ex_immediate,
     exit_ex_controlled,
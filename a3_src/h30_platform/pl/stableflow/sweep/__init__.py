@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Package of functions that support parameter sweeps over stableflow systems.
+
+A parameter sweep takes a base configuration
+and a sequence of override sets, and runs one
+variant of the system for each override set.
+
+Each variant is run in local mode (all nodes
+in a single process) on a pool of worker
+processes sized to the machine, so that many
+variants can be evaluated concurrently.
+
+Named values are read from node state or
+outputs after each run completes, and are
+collected, together with some basic run
+metrics, into a single results table.
+
+"""
+
+
+import collections.abc
+import copy
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+
+import fl.stableflow.cfg
+import pl.stableflow.log
+import pl.stableflow.sys
+
+
+# -----------------------------------------------------------------------------
+def grid(map_axes):
+    """
+    Return a list of override sets covering the cartesian product of map_axes.
+
+    map_axes maps each cfg address to the
+    sequence of values that it should take.
+    Each override set is a dict mapping cfg
+    addresses to a single value.
+
+    """
+    list_address  = list(map_axes.keys())
+    iter_values   = (map_axes[address] for address in list_address)
+    iter_products = itertools.product(*iter_values)
+    return [dict(zip(list_address, tup_value)) for tup_value in iter_products]
+
+
+# -----------------------------------------------------------------------------
+def run(map_cfg,                  # pylint: disable=R0913
+        iter_overrides,
+        iter_addr_result = (),
+        num_workers      = None,
+        delim_cfg_addr   = '.'):
+    """
+    Run one variant of map_cfg per override set and return a results table.
+
+    The results table is a list of rows, one
+    per override set, in the order that the
+    override sets were given. Each row is a
+    dict containing the index of the variant,
+    the override values, the run metrics
+    (id_cfg, retval, duration_secs, error)
+    and the value found at each of the
+    result addresses.
+
+    Result addresses take the form
+    id_node.state.<path> or
+    id_node.outputs.<path>, with the parts
+    separated by delim_cfg_addr.
+
+    """
+    list_overrides = [dict(overrides) for overrides in iter_overrides]
+    tup_addr       = tuple(iter_addr_result)
+    list_task      = [(idx, map_cfg, overrides, tup_addr, delim_cfg_addr)
+                            for (idx, overrides) in enumerate(list_overrides)]
+    if not list_task:
+        return list()
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = max(1, min(num_workers, len(list_task)))
+
+    return _run_in_workers(list_task, num_workers)
+
+
+# -----------------------------------------------------------------------------
+def _run_in_workers(list_task, num_workers):
+    """
+    Run each task in its own worker process and return the list of rows.
+
+    Each worker runs a single variant before
+    exiting, so that module level and signal
+    handler state does not leak from one
+    variant to the next. No more than
+    num_workers workers run at any one time.
+
+    Results are returned over a pipe rather
+    than a multiprocessing queue, so that a
+    worker which dies without replying is
+    detected and reported in its row.
+
+    """
+    list_row    = [None] * len(list_task)
+    iter_task   = iter(list_task)
+    map_running = dict()
+
+    def launch(task):
+        (conn_recv, conn_send) = multiprocessing.Pipe(duplex = False)
+        process = multiprocessing.Process(target = _worker,
+                                          args   = (conn_send, task),
+                                          daemon = True)
+        process.start()
+        conn_send.close()
+        map_running[conn_recv] = (task, process)
+
+    for task in itertools.islice(iter_task, num_workers):
+        launch(task)
+
+    while map_running:
+        for conn in multiprocessing.connection.wait(list(map_running)):
+            (task, process) = map_running.pop(conn)
+            (idx_variant, _, overrides, tup_addr, _) = task
+            try:
+                list_row[idx_variant] = conn.recv()
+            except EOFError:
+                row          = _new_row(idx_variant, overrides, tup_addr)
+                row['error'] = 'Worker exited without a result.'
+                list_row[idx_variant] = row
+            conn.close()
+            process.join()
+            task = next(iter_task, None)
+            if task is not None:
+                launch(task)
+
+    return list_row
+
+
+# -----------------------------------------------------------------------------
+def _worker(conn, task):
+    """
+    Run a single variant in a worker process and send back its row.
+
+    """
+    conn.send(_run_variant(task))
+    conn.close()
+
+
+# -----------------------------------------------------------------------------
+def _new_row(idx_variant, overrides, tup_addr):
+    """
+    Return an empty row in the results table for the specified variant.
+
+    """
+    row = dict()
+    row['idx_variant'] = idx_variant
+    row.update(overrides)
+    row['id_cfg']        = None
+    row['retval']        = None
+    row['duration_secs'] = None
+    row['error']         = None
+    for addr in tup_addr:
+        row[addr] = None
+    return row
+
+
+# -----------------------------------------------------------------------------
+def _run_variant(task):
+    """
+    Run a single variant of the system and return its row in the results table.
+
+    """
+    (idx_variant, map_cfg, overrides, tup_addr, delim_cfg_addr) = task
+
+    row           = _new_row(idx_variant, overrides, tup_addr)
+    tup_overrides = tuple(itertools.chain.from_iterable(overrides.items()))
+    time_start    = time.monotonic()
+    try:
+        cfg = fl.stableflow.cfg.prepare(
+                                map_cfg        = copy.deepcopy(map_cfg),
+                                is_local       = True,
+                                delim_cfg_addr = delim_cfg_addr,
+                                tup_overrides  = tup_overrides)
+        row['id_cfg'] = cfg['runtime']['id']['id_cfg']
+        row['retval'] = pl.stableflow.sys.start(cfg)
+    except Exception as error:  # pylint: disable=W0703
+        pl.stableflow.log.logger.exception(
+                    'Sweep variant {idx} failed', idx = idx_variant)
+        row['error'] = repr(error)
+        return row
+    finally:
+        row['duration_secs'] = time.monotonic() - time_start
+
+    map_node = dict((node.id_node, node)
+                        for node in cfg['runtime']['proc']['list_node'])
+    for addr in tup_addr:
+        row[addr] = _read_result(map_node, addr, delim_cfg_addr)
+
+    return row
+
+
+# -----------------------------------------------------------------------------
+def _read_result(map_node, address, delim_cfg_addr):
+    """
+    Return a plain copy of the value at address, or None if it is not found.
+
+    """
+    (id_node, *list_key) = address.split(delim_cfg_addr)
+    if id_node not in map_node or not list_key:
+        return None
+    if list_key[0] not in ('state', 'outputs'):
+        return None
+
+    value = getattr(map_node[id_node], list_key[0])
+    for key in list_key[1:]:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    return _plain(value)
+
+
+# -----------------------------------------------------------------------------
+def _plain(value):
+    """
+    Return a deep copy of value with mappings converted to plain dicts.
+
+    Node memory may use mapping types that are
+    specific to the runtime, so these are
+    converted to plain dicts before being sent
+    back to the parent process.
+
+    """
+    if isinstance(value, collections.abc.Mapping):
+        return dict((key, _plain(item)) for (key, item) in value.items())
+    return copy.deepcopy(value)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Functional specification for the pl.stableflow.sweep package.
+
+"""
+
+
+_RESET = '''
+def reset(runtime, cfg, inputs, state, outputs):
+    state['limit'] = cfg['limit']
+    state['count'] = 0
+'''
+
+_STEP = '''
+def step(inputs, state, outputs):
+    import pl.stableflow.signal
+    state['count'] += 1
+    if state['count'] >= state['limit']:
+        return (pl.stableflow.signal.exit_ok_controlled,)
+'''
+
+
+# =============================================================================
+class SpecifyStableflowSweep:
+    """
+    Spec for pl.stableflow.sweep package.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_generates_the_cartesian_product_of_override_axes(self):
+        """
+        grid returns one override set per combination of axis values.
+
+        """
+        import pl.stableflow.sweep  # pylint: disable=C0415
+
+        list_overrides = pl.stableflow.sweep.grid({'a': [1, 2], 'b': ['x']})
+        assert list_overrides == [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'x'}]
+
+    # -------------------------------------------------------------------------
+    def it_runs_each_variant_and_collects_results(self):
+        """
+        run returns one row per override set with the named results.
+
+        """
+        import pl.stableflow.sweep  # pylint: disable=C0415
+
+        list_row = pl.stableflow.sweep.run(
+                    map_cfg          = _counter_cfg(),
+                    iter_overrides   = pl.stableflow.sweep.grid(
+                                        {'node.counter.config.limit': [2, 5]}),
+                    iter_addr_result = ['counter.state.count'],
+                    num_workers      = 2)
+
+        assert [row['idx_variant'] for row in list_row]         == [0, 1]
+        assert [row['retval'] for row in list_row]              == [0, 0]
+        assert [row['error'] for row in list_row]               == [None, None]
+        assert [row['counter.state.count'] for row in list_row] == [2, 5]
+
+
+# -----------------------------------------------------------------------------
+def _counter_cfg():
+    """
+    Return a config for a single node that halts after a configured count.
+
+    """
+    return {
+        'system':  { 'id_system': 'stableflow_sweep_test' },
+        'host':    { 'localhost': { 'hostname':       '127.0.0.1',
+                                    'acct_run':       'stableflow',
+                                    'acct_provision': 'stableflow' } },
+        'process': { 'main': { 'host': 'localhost' } },
+        'node':    { 'counter': {
+                        'process':       'main',
+                        'state_type':    'python_dict',
+                        'config':        { 'limit': 1 },
+                        'functionality': {
+                            'requirement': 'some_requirement',
+                            'py_src':      { 'reset': _RESET,
+                                             'step':  _STEP } } } },
+        'edge':    [],
+        'requirement': { 'some_requirement': { 'how_to_install' } },
+        'data':    { 'python_dict': 'py_dict' }
+    }
@@ -3,21 +3,30 @@
 Package of functions that support the operation of the system as a whole.
 
 This package contains functions to start, stop,
-pause/unpause and single-step an stableflow system.
+update, pause/unpause and single-step an
+stableflow system.
+
+The configuration that a system was started
+with is saved on the controlling machine, so
+that a later update can restart only those
+processes that are affected by a change.
 
 """
 
 
+import collections
 import copy
 import os
 import subprocess
 import sys  # pylint: disable=W0406
+import tempfile
 import time
 import uuid
 
 import zmq
 
 import fl.stableflow.cfg
+import fl.stableflow.cfg.diff
 import pl.stableflow.host
 import pl.stableflow.util.serialization
 
@@ -52,18 +61,81 @@ def start(cfg):
     for id_host in _list_id_host(cfg):
         _command(cfg, id_host, 'start-host')
 
+    _save_running_cfg(cfg)
     return 0
 
 
 # -----------------------------------------------------------------------------
-def stop(cfg):
+def stop(cfg, is_blocking = False):
     """
     Stop the system.
 
+    If is_blocking is true, wait until each
+    host has stopped all of its processes.
+
     """
     for id_host in _list_id_host(cfg):
-        _command(cfg, id_host, 'stop-host')
+        _command(cfg, id_host, 'stop-host', is_blocking = is_blocking)
 
+    filepath = _filepath_running_cfg(cfg)
+    if os.path.isfile(filepath):
+        os.remove(filepath)
+    return 0
+
+
+# -----------------------------------------------------------------------------
+def update(cfg):
+    """
+    Update a running system, restarting only the processes that changed.
+
+    The new configuration is compared with the
+    one that the system is running, and each
+    host is told which of its processes to stop
+    and which to start. Other processes keep
+    running. If a change cannot be confined to
+    individual processes, the whole system is
+    restarted.
+
+    """
+    if cfg['runtime']['opt']['is_local']:
+        raise RuntimeError('Not implemented.')
+
+    cfg_running = _load_running_cfg(cfg)
+    if cfg_running is None:
+        raise RuntimeError(
+            'No running configuration found for "{id_system}".'.format(
+                                    id_system = cfg['system']['id_system']))
+
+    # The old system must have fully exited
+    # before the new one starts, as stopping
+    # signals every process in the system by
+    # name, including any that were just
+    # started.
+    #
+    plan = fl.stableflow.cfg.diff.plan(cfg_running, cfg)
+    if plan.is_full_restart:
+        stop(cfg_running, is_blocking = True)
+        return start(cfg)
+
+    cfg['runtime']['id']['id_run'] = cfg_running['runtime']['id']['id_run']
+    cfg['runtime']['id']['ts_run'] = cfg_running['runtime']['id']['ts_run']
+
+    map_update = collections.defaultdict(lambda: {'list_id_process_stop':  [],
+                                                  'list_id_process_start': []})
+    for id_process in sorted(plan.set_id_process_stop):
+        id_host = cfg_running['process'][id_process]['host']
+        map_update[id_host]['list_id_process_stop'].append(id_process)
+    for id_process in sorted(plan.set_id_process_start):
+        id_host = cfg['process'][id_process]['host']
+        map_update[id_host]['list_id_process_start'].append(id_process)
+
+    for (id_host, cfg_update) in sorted(map_update.items()):
+        cfg_host = cfg if id_host in cfg['host'] else cfg_running
+        cfg_host['runtime']['update'] = cfg_update
+        _command(cfg_host, id_host, 'update-host')
+        del cfg_host['runtime']['update']
+
+    _save_running_cfg(cfg)
     return 0
 
 
@@ -97,6 +169,36 @@ def step(cfg):
     return 0
 
 
+# -----------------------------------------------------------------------------
+def profile(cfg):
+    """
+    Start or stop the sampling profiler in each process of the system.
+
+    """
+    if cfg['runtime']['opt']['is_local']:
+        raise RuntimeError('Not implemented.')
+
+    for id_host in _list_id_host(cfg):
+        _command(cfg, id_host, 'profile-host')
+
+    return 0
+
+
+# -----------------------------------------------------------------------------
+def memory(cfg):
+    """
+    Request a node and queue memory report from each process of the system.
+
+    """
+    if cfg['runtime']['opt']['is_local']:
+        raise RuntimeError('Not implemented.')
+
+    for id_host in _list_id_host(cfg):
+        _command(cfg, id_host, 'memory-host')
+
+    return 0
+
+
 # -----------------------------------------------------------------------------
 def print_process_status(cfg):
     """
@@ -112,6 +214,21 @@ def print_process_status(cfg):
     return 0
 
 
+# -----------------------------------------------------------------------------
+def print_wait_for_graph(cfg):
+    """
+    Print blocked reads and the wait-for graph for each host of the system.
+
+    """
+    if cfg['runtime']['opt']['is_local']:
+        raise RuntimeError('Not implemented.')
+
+    for id_host in _list_id_host(cfg):
+        _command(cfg, id_host, 'stalls-host')
+
+    return 0
+
+
 # -----------------------------------------------------------------------------
 def _list_id_host(cfg):
     """
@@ -125,10 +242,51 @@ def _list_id_host(cfg):
 
 
 # -----------------------------------------------------------------------------
-def _command(cfg, id_host, command):
+def _filepath_running_cfg(cfg):
+    """
+    Return the path of the file that records the running configuration.
+
+    """
+    return os.path.join(tempfile.gettempdir(),
+                        'stableflow',
+                        'running',
+                        cfg['system']['id_system'] + '.cfg')
+
+
+# -----------------------------------------------------------------------------
+def _save_running_cfg(cfg):
+    """
+    Record the configuration that the system is now running.
+
+    """
+    filepath = _filepath_running_cfg(cfg)
+    os.makedirs(os.path.dirname(filepath), exist_ok = True)
+    with open(filepath, 'wt', encoding = 'utf-8') as file:
+        file.write(pl.stableflow.util.serialization.serialize(cfg))
+
+
+# -----------------------------------------------------------------------------
+def _load_running_cfg(cfg):
+    """
+    Return the configuration that the system is running, or None.
+
+    """
+    filepath = _filepath_running_cfg(cfg)
+    if not os.path.isfile(filepath):
+        return None
+    with open(filepath, 'rt', encoding = 'utf-8') as file:
+        return pl.stableflow.util.serialization.deserialize(file.read())
+
+
+# -----------------------------------------------------------------------------
+def _command(cfg, id_host, command, is_blocking = False):
     """
     Give the specified host a command.
 
+    Commands to a remote host always block.
+    Commands to the local host only block if
+    is_blocking is true.
+
     """
     cfg_copy        = copy.deepcopy(cfg)
     cfg_copy['runtime']['id']['id_host'] = id_host
@@ -142,7 +300,9 @@ def _command(cfg, id_host, command):
 
         list_args = launch_cmd.split(' ')
         list_args.extend([command_group, command, cfg_encoded])
-        subprocess.Popen(list_args)
+        proc = subprocess.Popen(list_args)
+        if is_blocking:
+            proc.wait()
 
         # subprocess.Popen(
         #         args   = list_args,
@@ -190,6 +350,7 @@ def _run_locally(cfg):
 
     for cfg_node in cfg['node'].values():
         cfg_node['process'] = id_process_local
+        cfg_node.pop('thread', None)
 
     cfg = fl.stableflow.cfg.denormalize(cfg)
 
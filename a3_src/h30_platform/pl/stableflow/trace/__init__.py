@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+Package of classes supporting end-to-end latency tracing across edges.
+
+Queue edges that are configured with trace
+enabled have each message wrapped, at the
+producer, with a small trace header holding
+the producer tick, the producing host, the
+send time (both monotonic and wall clock)
+and the origin time and path of the oldest
+traced input that the producer consumed on
+the same tick.
+
+At the consumer, the header is removed
+before the message reaches input memory, and
+the latency of the message is added to a
+histogram for the edge (send to receive)
+and to a histogram for the path (origin to
+receive), where a path is the sequence of
+traced edges the data has travelled along.
+
+Within a host, latencies are measured with
+the shared monotonic clock. Between hosts,
+wall clock times are compared after
+correcting for an estimated clock offset for
+the sending host. The estimate is the
+smallest one way delay seen from that host,
+so cross host latencies measure the delay
+in excess of the fastest observed transfer,
+which is where queueing shows up.
+
+Origins are only carried through a node by
+its traced queue inputs and outputs, so a
+path restarts after an intra process edge.
+
+"""
+
+
+import collections
+import time
+
+import pl.stableflow.log
+
+
+INTERVAL_REPORT_SECS = 60.0
+NUM_SAMPLE_OFFSET    = 1000
+
+TraceHeader = collections.namedtuple(
+                    'TraceHeader', ('idx',
+                                    'id_host',
+                                    'time_mono',
+                                    'time_wall',
+                                    'id_host_origin',
+                                    'time_mono_origin',
+                                    'time_wall_origin',
+                                    'tup_id_edge'))
+
+
+# =============================================================================
+class LatencyHistogram():
+    """
+    Histogram of latencies with power of two microsecond buckets.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        """
+        Return an empty LatencyHistogram.
+
+        """
+        self.count       = 0
+        self.total_secs  = 0.0
+        self.min_secs    = None
+        self.max_secs    = None
+        self.list_bucket = list()
+
+    # -------------------------------------------------------------------------
+    def add(self, secs):
+        """
+        Add a single latency sample, in seconds.
+
+        Negative samples, which can arise from
+        clock offset estimation error, are
+        counted in the lowest bucket.
+
+        """
+        secs    = max(0.0, secs)
+        idx     = int(secs * 1e6).bit_length()
+        missing = idx + 1 - len(self.list_bucket)
+        if missing > 0:
+            self.list_bucket.extend([0] * missing)
+        self.list_bucket[idx] += 1
+        self.count            += 1
+        self.total_secs       += secs
+        if self.min_secs is None or secs < self.min_secs:
+            self.min_secs = secs
+        if self.max_secs is None or secs > self.max_secs:
+            self.max_secs = secs
+
+    # -------------------------------------------------------------------------
+    def quantile(self, fraction):
+        """
+        Return an upper bound on the specified quantile, in seconds.
+
+        """
+        if self.count == 0:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for (idx, count) in enumerate(self.list_bucket):
+            seen += count
+            if seen >= rank:
+                return min((1 << idx) * 1e-6, self.max_secs)
+        return self.max_secs
+
+    # -------------------------------------------------------------------------
+    def summary(self):
+        """
+        Return a one line summary of the histogram.
+
+        """
+        if self.count == 0:
+            return 'n=0'
+        return ('n={n} mean={mean:.6f} p50<={p50:.6f} p99<={p99:.6f} '
+                'max={max:.6f}').format(n    = self.count,
+                                        mean = self.total_secs / self.count,
+                                        p50  = self.quantile(0.5),
+                                        p99  = self.quantile(0.99),
+                                        max  = self.max_secs)
+
+
+# =============================================================================
+class ClockOffsetEstimator():
+    """
+    Estimate the wall clock offset of each remote host.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, num_sample = NUM_SAMPLE_OFFSET):
+        """
+        Return a ClockOffsetEstimator using windows of num_sample messages.
+
+        The minimum one way delay over the
+        current and previous windows is used,
+        so that the estimate tracks clock drift.
+
+        """
+        self.num_sample = num_sample
+        self._map_state = dict()
+
+    # -------------------------------------------------------------------------
+    def update(self, id_host, delay_secs):
+        """
+        Add an observed one way wall clock delay from id_host.
+
+        """
+        state = self._map_state.setdefault(id_host, [None, None, 0])
+        (min_prev, min_curr, count) = state
+        if min_curr is None or delay_secs < min_curr:
+            min_curr = delay_secs
+        count += 1
+        if count >= self.num_sample:
+            (min_prev, min_curr, count) = (min_curr, None, 0)
+        state[:] = (min_prev, min_curr, count)
+
+    # -------------------------------------------------------------------------
+    def offset(self, id_host):
+        """
+        Return the estimated clock offset of id_host, in seconds.
+
+        """
+        state = self._map_state.get(id_host, None)
+        if state is None:
+            return 0.0
+        list_min = [value for value in state[:2] if value is not None]
+        return min(list_min) if list_min else 0.0
+
+
+# =============================================================================
+class TraceCollector():
+    """
+    Per process collection of edge and path latency histograms.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, id_host, interval_report_secs = INTERVAL_REPORT_SECS):
+        """
+        Return a TraceCollector for a process on the specified host.
+
+        """
+        self.id_host              = id_host
+        self.interval_report_secs = interval_report_secs
+        self.clock                = ClockOffsetEstimator()
+        self.map_hist_edge        = dict()
+        self.map_hist_path        = dict()
+        self._time_report         = time.monotonic()
+
+    # -------------------------------------------------------------------------
+    def latency(self, id_host_src, time_mono_src, time_wall_src,
+                time_mono_now, time_wall_now):
+        """
+        Return the latency of a message sent at the specified times.
+
+        """
+        if id_host_src == self.id_host:
+            return time_mono_now - time_mono_src
+        return time_wall_now - time_wall_src - self.clock.offset(id_host_src)
+
+    # -------------------------------------------------------------------------
+    def add(self, id_edge, header):
+        """
+        Add latency samples for a message received on id_edge.
+
+        """
+        time_mono = time.monotonic()
+        time_wall = time.time()
+        if header.id_host != self.id_host:
+            self.clock.update(header.id_host, time_wall - header.time_wall)
+
+        _hist(self.map_hist_edge, id_edge).add(self.latency(
+                                        header.id_host,
+                                        header.time_mono,
+                                        header.time_wall,
+                                        time_mono,
+                                        time_wall))
+        _hist(self.map_hist_path, header.tup_id_edge).add(self.latency(
+                                        header.id_host_origin,
+                                        header.time_mono_origin,
+                                        header.time_wall_origin,
+                                        time_mono,
+                                        time_wall))
+
+        if time_mono - self._time_report >= self.interval_report_secs:
+            self.report()
+
+    # -------------------------------------------------------------------------
+    def report(self):
+        """
+        Log a summary of every edge and path histogram and return it.
+
+        """
+        self._time_report = time.monotonic()
+        list_line = list()
+        for (id_edge, hist) in sorted(self.map_hist_edge.items()):
+            list_line.append('latency edge {id} {summary}'.format(
+                                                    id      = id_edge,
+                                                    summary = hist.summary()))
+        for (tup_id_edge, hist) in sorted(self.map_hist_path.items()):
+            if len(tup_id_edge) < 2:
+                continue
+            list_line.append('latency path {path} {summary}'.format(
+                                            path    = ' > '.join(tup_id_edge),
+                                            summary = hist.summary()))
+        for line in list_line:
+            pl.stableflow.log.logger.info(line)
+        return list_line
+
+
+# =============================================================================
+class NodeTraceContext():
+    """
+    Oldest traced origin among the inputs consumed by a node on this tick.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        """
+        Return an empty NodeTraceContext.
+
+        """
+        self.origin     = None
+        self.is_writing = False
+
+    # -------------------------------------------------------------------------
+    def on_read(self, header):
+        """
+        Note the origin of a traced input message.
+
+        """
+        if self.is_writing:
+            self.origin     = None
+            self.is_writing = False
+        if self.origin is None or header.time_wall_origin < self.origin[2]:
+            self.origin = (header.id_host_origin,
+                           header.time_mono_origin,
+                           header.time_wall_origin,
+                           header.tup_id_edge)
+
+    # -------------------------------------------------------------------------
+    def on_write(self):
+        """
+        Return the origin to attach to an output, or None for a new origin.
+
+        """
+        self.is_writing = True
+        return self.origin
+
+
+# =============================================================================
+class TracedQueue():
+    """
+    Queue wrapper that attaches and strips trace headers.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, queue, id_edge, collector, context):
+        """
+        Return a TracedQueue wrapping the specified queue.
+
+        """
+        self.owner      = queue.owner
+        self.direction  = queue.direction
+        self.queue      = queue
+        self.id_edge    = id_edge
+        self.collector  = collector
+        self.context    = context
+        self._idx_write = 0
+
+    # -------------------------------------------------------------------------
+    def blocking_read(self):
+        """
+        Return the next message, recording its latency.
+
+        """
+        (msg, header) = self.queue.blocking_read()
+        self.collector.add(self.id_edge, header)
+        self.context.on_read(header)
+        return msg
+
+    # -------------------------------------------------------------------------
+    def non_blocking_write(self, msg):
+        """
+        Write the message with a trace header attached.
+
+        """
+        time_mono = time.monotonic()
+        time_wall = time.time()
+        id_host   = self.collector.id_host
+        origin    = self.context.on_write()
+        if origin is None:
+            origin = (id_host, time_mono, time_wall, ())
+        header = TraceHeader(idx              = self._idx_write,
+                             id_host          = id_host,
+                             time_mono        = time_mono,
+                             time_wall        = time_wall,
+                             id_host_origin   = origin[0],
+                             time_mono_origin = origin[1],
+                             time_wall_origin = origin[2],
+                             tup_id_edge      = origin[3] + (self.id_edge,))
+        self._idx_write += 1
+        return self.queue.non_blocking_write((msg, header))
+
+    # -------------------------------------------------------------------------
+    def approx_size(self):
+        """
+        Return the approximate size of the wrapped queue.
+
+        """
+        return self.queue.approx_size()
+
+
+# -----------------------------------------------------------------------------
+def _hist(map_hist, key):
+    """
+    Return the histogram for key, creating it if necessary.
+
+    """
+    hist = map_hist.get(key, None)
+    if hist is None:
+        hist = map_hist[key] = LatencyHistogram()
+    return hist
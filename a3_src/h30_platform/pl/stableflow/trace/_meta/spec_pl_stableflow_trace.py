@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Functional specification for the pl.stableflow.trace package.
+
+"""
+
+
+# =============================================================================
+class _ListQueue:
+    """
+    Minimal in-memory FIFO queue standing in for an inter process queue.
+
+    """
+
+    owner     = 'node_a'
+    direction = 'forward'
+
+    def __init__(self):
+        self.list_item = list()
+
+    def blocking_read(self):
+        return self.list_item.pop(0)
+
+    def non_blocking_write(self, msg):
+        self.list_item.append(msg)
+
+    def approx_size(self):
+        return len(self.list_item)
+
+
+# =============================================================================
+class SpecifyStableflowTrace:
+    """
+    Spec for the pl.stableflow.trace package.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_bounds_quantiles_with_power_of_two_buckets(self):
+        """
+        LatencyHistogram quantiles are upper bounds within a factor of two.
+
+        """
+        import pl.stableflow.trace  # pylint: disable=C0415
+
+        hist = pl.stableflow.trace.LatencyHistogram()
+        for _ in range(99):
+            hist.add(0.000100)
+        hist.add(0.010)
+
+        assert hist.count == 100
+        assert 0.000100 <= hist.quantile(0.5) < 0.000200
+        assert hist.quantile(1.0) == 0.010
+        assert hist.summary().startswith('n=100 ')
+
+    # -------------------------------------------------------------------------
+    def it_measures_edge_and_path_latency_across_hops(self):
+        """
+        Messages keep their origin and path through traced nodes.
+
+        """
+        import pl.stableflow.trace  # pylint: disable=C0415
+
+        collector = pl.stableflow.trace.TraceCollector(id_host = 'localhost')
+        queue_ab  = _ListQueue()
+        queue_bc  = _ListQueue()
+        ctx_a     = pl.stableflow.trace.NodeTraceContext()
+        ctx_b     = pl.stableflow.trace.NodeTraceContext()
+        ctx_c     = pl.stableflow.trace.NodeTraceContext()
+        a_out     = pl.stableflow.trace.TracedQueue(queue_ab, 'a->b',
+                                                    collector, ctx_a)
+        b_in      = pl.stableflow.trace.TracedQueue(queue_ab, 'a->b',
+                                                    collector, ctx_b)
+        b_out     = pl.stableflow.trace.TracedQueue(queue_bc, 'b->c',
+                                                    collector, ctx_b)
+        c_in      = pl.stableflow.trace.TracedQueue(queue_bc, 'b->c',
+                                                    collector, ctx_c)
+
+        for idx in range(3):
+            a_out.non_blocking_write({'count': idx})
+            b_out.non_blocking_write(b_in.blocking_read())
+            assert c_in.blocking_read() == {'count': idx}
+
+        assert queue_bc.list_item == list()
+        assert collector.map_hist_edge['a->b'].count == 3
+        assert collector.map_hist_edge['b->c'].count == 3
+        assert collector.map_hist_path[('a->b', 'b->c')].count == 3
+        assert any(line.startswith('latency path a->b > b->c ')
+                                        for line in collector.report())
+
+    # -------------------------------------------------------------------------
+    def it_corrects_remote_latency_for_clock_offset(self):
+        """
+        Remote latency is measured relative to the fastest observed delay.
+
+        """
+        import pl.stableflow.trace  # pylint: disable=C0415
+
+        collector = pl.stableflow.trace.TraceCollector(id_host = 'local')
+        collector.clock.update('remote', 5.001)
+        collector.clock.update('remote', 5.004)
+
+        latency = collector.latency('remote', 0.0, 100.0, 0.0, 105.003)
+        assert abs(latency - 0.002) < 1e-9
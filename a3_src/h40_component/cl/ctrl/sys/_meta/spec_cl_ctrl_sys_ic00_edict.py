@@ -23,3 +23,37 @@ class SpecifyClCtrlSysIc00_edict:
         """
         import cl.ctrl.sys.ic00_edict
 
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_advances_a_deterministic_virtual_clock(self):
+        """
+        In virtual time mode, the clock advances one period per step.
+
+        """
+        import time
+        import cl.ctrl.sys.ic00_edict  # pylint: disable=C0415
+
+        cfg     = { 'is_virtual_time':         True,
+                    'frequency_hz':            0.001,
+                    'virtual_unix_time_start': 1700000000 }
+        state   = dict()
+        outputs = { 'ctrl': dict() }
+        cl.ctrl.sys.ic00_edict.reset(
+                    runtime = None, cfg = cfg, inputs = dict(),
+                    state = state, outputs = outputs)
+
+        time_start = time.monotonic()
+        list_ts    = list()
+        for _ in range(3):
+            cl.ctrl.sys.ic00_edict.step(
+                    inputs = dict(), state = state, outputs = outputs)
+            list_ts.append(dict(outputs['ctrl']['ts']))
+        assert time.monotonic() - time_start < 1.0
+
+        assert [ts['ts_rel_us'] for ts in list_ts] == [0, 1000000000,
+                                                       2000000000]
+        assert [ts['unix_time'] for ts in list_ts] == [1700000000,
+                                                       1700001000,
+                                                       1700002000]
+        assert list_ts[0]['id_year'] == 2023
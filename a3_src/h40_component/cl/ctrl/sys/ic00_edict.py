@@ -44,7 +44,6 @@ license:
 """
 
 
-import calendar
 import datetime
 import time
 
@@ -67,6 +66,25 @@ def reset(runtime, cfg, inputs, state, outputs):
         state['time_start_us'] = _time_us()
         state['time_prev_us']  = state['time_start_us']
 
+    # Virtual time control. When enabled, a
+    # simulated clock is advanced by exactly
+    # one period per step, with no sleeping,
+    # starting from a configurable unix time.
+    # This gives deterministic timestamps and
+    # lets offline runs go as fast as the CPU
+    # allows. The period defaults to one second
+    # if no frequency_hz is configured.
+    #
+    state['is_virtual_time'] = cfg.get('is_virtual_time', False)
+    if state['is_virtual_time']:
+        if state['period_us'] is None:
+            state['period_us'] = _int_microseconds(1.0)
+        state['time_start_us']        = 0
+        state['time_prev_us']         = 0
+        state['virtual_unix_time_us'] = _int_microseconds(
+                                    cfg.get('virtual_unix_time_start', 0))
+    state['tup_time_cached'] = (None, None)
+
     # Degraded mode control.
     #
     state['degraded_enter_maxq'] = cfg.get('dmode_enter_maxq', 20)
@@ -113,7 +131,7 @@ def step(inputs, state, outputs):
     """
     (time_us, load_rel) = _execution_rate_control(inputs, state)
     (do_halt, retval)   = _halt_signal_control(inputs, state, time_us)
-    tup_time            = _time_codes()
+    tup_time            = _time_codes(state, _unix_time(state, time_us))
     (id_year, id_day, id_hour, id_min, id_sec, unix_time, weekday) = tup_time
 
     map_ts = dict()
@@ -172,7 +190,11 @@ def _execution_rate_control(inputs, state):
 
     load_rel = 1.0
     is_rate_limited = state['period_us'] is not None
-    if is_rate_limited:
+    if state['is_virtual_time']:
+
+        time_us = _time_target_us(state, is_fixed_rate = True)
+
+    elif is_rate_limited:
 
         target_us = _time_target_us(state, is_fixed_rate = True)
         delta_us  = target_us - _time_us()  # +ve iff before target time.
@@ -191,7 +213,8 @@ def _execution_rate_control(inputs, state):
             time.sleep(delta_secs)
 
     # MUST be measured AFTER the call to time.sleep()
-    time_us = _time_us()
+    if not state['is_virtual_time']:
+        time_us = _time_us()
     state['time_prev_us'] = time_us
 
     # Load based degraded-mode initiation
@@ -254,20 +277,46 @@ def _halt_signal_control(inputs, state, time_us):
 
 
 # -----------------------------------------------------------------------------
-def _time_codes():
+def _unix_time(state, time_us):
+    """
+    Return the current unix time in whole seconds.
+
+    In virtual time mode, this is derived from
+    the simulated clock rather than the system
+    clock.
+
+    """
+    if state['is_virtual_time']:
+        unix_time_us = state['virtual_unix_time_us'] + time_us
+        return unix_time_us // 1000000
+    return int(time.time())
+
+
+# -----------------------------------------------------------------------------
+def _time_codes(state, unix_time):
     """
     Return temporal aggregation codes.
 
+    The codes only change once per second, so
+    they are cached in state and recomputed only
+    when the unix time ticks over.
+
     """
-    gmt       = time.gmtime()
-    unix_time = calendar.timegm(gmt)
+    (unix_time_cached, tup_time) = state['tup_time_cached']
+    if unix_time == unix_time_cached:
+        return tup_time
+
+    gmt       = time.gmtime(unix_time)
     weekday   = gmt.tm_wday
     id_year   = gmt.tm_year
     id_day    = (id_year * 1000) + gmt.tm_yday
     id_hour   = (id_day  *  100) + gmt.tm_hour  # pylint: disable=E222
     id_min    = (id_hour *  100) + gmt.tm_min   # pylint: disable=E222
     id_sec    = (id_min  *  100) + gmt.tm_sec   # pylint: disable=E222
-    return (id_year, id_day, id_hour, id_min, id_sec, unix_time, weekday)
+    tup_time  = (id_year, id_day, id_hour, id_min, id_sec, unix_time, weekday)
+
+    state['tup_time_cached'] = (unix_time, tup_time)
+    return tup_time
 
 
 # -----------------------------------------------------------------------------
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Functional specification for cl.util.replay.ic00_edict.
+
+"""
+
+import pytest
+
+
+# =============================================================================
+class SpecifyClUtilReplayIc00_edict:
+    """
+    Spec for the cl.util.replay.ic00_edict component.
+
+    """
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_can_be_imported(self):
+        """
+        cl.util.replay.ic00_edict can be imported.
+
+        """
+        import cl.util.replay.ic00_edict
+
+    # -------------------------------------------------------------------------
+    @pytest.mark.e002_general_research
+    def it_replays_recorded_messages_then_halts(self, tmp_path):
+        """
+        Recorded messages are replayed in place, then a halt is signalled.
+
+        """
+        import cl.util.replay.ic00_edict  # pylint: disable=C0415
+        import pl.stableflow.record       # pylint: disable=C0415
+        import pl.stableflow.signal       # pylint: disable=C0415
+
+        writer = pl.stableflow.record.EdgeLogWriter(str(tmp_path), 'a:b')
+        for idx in range(3):
+            writer.append(idx, {'ena': True, 'list': [idx]})
+        writer.close()
+
+        output  = dict()
+        outputs = {'output': output}
+        cfg     = {'dirpath':   str(tmp_path),
+                   'idx_start': 1,
+                   'map_edge':  {'output': 'a:b'}}
+        coro    = cl.util.replay.ic00_edict.coro(
+                                        runtime = None, cfg = cfg,
+                                        inputs = dict(), state = dict(),
+                                        outputs = outputs)
+        coro.send(None)
+
+        (_, signal) = coro.send(dict())
+        assert outputs['output'] is output
+        assert output == {'ena': True, 'list': [1]}
+        (_, signal) = coro.send(dict())
+        assert output == {'ena': True, 'list': [2]}
+        assert signal is None
+        (_, signal) = coro.send(dict())
+        assert output['ena'] is False
+        assert signal == (pl.stableflow.signal.exit_ok_controlled,)
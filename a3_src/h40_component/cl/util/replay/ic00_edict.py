@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+---
+
+title:
+    "Edge traffic replay stableflow-edict component."
+
+description:
+    "Replays recorded edge traffic from memory-mapped edge logs."
+
+id:
+    "651c4003-61a4-49b7-abc8-9b39805d7f5e"
+
+type:
+    dt004_python_stableflow_edict_component
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_general
+
+copyright:
+    "Copyright 2023 William Payne"
+
+license:
+    "Licensed under the Apache License, Version
+    2.0 (the License); you may not use this file
+    except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed
+    to in writing, software distributed under
+    the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+    either express or implied. See the License
+    for the specific language governing
+    permissions and limitations under the
+    License."
+
+...
+"""
+
+
+import collections.abc
+import os
+
+import pl.stableflow.record
+import pl.stableflow.signal
+
+
+# -----------------------------------------------------------------------------
+def coro(runtime, cfg, inputs, state, outputs):  # pylint: disable=W0613
+    """
+    Edge traffic replay component coroutine.
+
+    Each output named in cfg['map_edge'] is fed
+    from the log of the corresponding recorded
+    edge, one message per step, as fast as the
+    downstream subgraph can consume them.
+
+    Replay starts at the first message at or
+    after cfg['idx_start'] (default 0). Once
+    every log is exhausted, the component
+    signals a controlled exit, unless
+    cfg['do_halt_at_end'] is false, in which
+    case its outputs are disabled instead.
+
+    """
+    signal         = None
+    dirpath        = cfg.get('dirpath', None) or os.getcwd()
+    idx_start      = cfg.get('idx_start', 0)
+    do_halt_at_end = cfg.get('do_halt_at_end', True)
+
+    map_reader = dict()
+    map_pos    = dict()
+    for (id_out, id_edge) in cfg['map_edge'].items():
+        if id_out not in outputs:
+            raise RuntimeError(
+                'No output named "{id}" to replay into.'.format(id = id_out))
+        reader              = pl.stableflow.record.EdgeLogReader(dirpath,
+                                                                 id_edge)
+        map_reader[id_out]  = reader
+        map_pos[id_out]     = reader.find(idx_start)
+
+    try:
+        while True:
+
+            inputs   = yield (outputs, signal)
+            is_ended = True
+
+            for (id_out, reader) in map_reader.items():
+                pos = map_pos[id_out]
+                if pos >= len(reader):
+                    _disable(outputs[id_out])
+                    continue
+                (_, item) = reader.read(pos)
+                _copy_into(outputs[id_out], item)
+                map_pos[id_out] = pos + 1
+                is_ended        = False
+
+            if is_ended and do_halt_at_end:
+                signal = (pl.stableflow.signal.exit_ok_controlled,)
+
+    finally:
+        for reader in map_reader.values():
+            reader.close()
+
+
+# -----------------------------------------------------------------------------
+def _copy_into(memory, item):
+    """
+    Copy a recorded message into existing output memory in place.
+
+    Output memory may be aliased by downstream
+    nodes on shared memory edges, so it must
+    be updated in place rather than replaced.
+
+    """
+    if isinstance(memory, collections.abc.MutableMapping):
+        memory.clear()
+        memory.update(item)
+    elif hasattr(memory, 'shape'):
+        memory[...] = item
+    else:
+        raise RuntimeError(
+            'Cannot replay into output memory of type "{type}".'.format(
+                                            type = type(memory).__name__))
+
+
+# -----------------------------------------------------------------------------
+def _disable(memory):
+    """
+    Clear the 'ena' flag on an edict output packet, if it has one.
+
+    """
+    if isinstance(memory, collections.abc.MutableMapping) and 'ena' in memory:
+        memory['ena'] = False
@@ -61,6 +61,13 @@ import fl.util
 import pl.stableview
 import pl.stableflow.sys
 
+
+# The layout is kept between updates so that
+# edits only move the nodes near each edit.
+#
+_LAYOUT = fl.stableflow.cfg.layout.LayeredLayout()
+
+
 # -----------------------------------------------------------------------------
 def coro(ctx):
     """
@@ -226,7 +233,8 @@ def _update_from_application_model(ctx, tup_cmd):
                                             node_size_x     = WIDTH_NODE,
                                             node_size_y     = 70,
                                             node_margin_x   = 40,
-                                            node_margin_y   = 40)
+                                            node_margin_y   = 40,
+                                            layout          = _LAYOUT)
 
     # Add nodes to the view model.
     #